@@ -238,12 +238,20 @@ class TestAnimationCommands:
                     "rate": "<Rate 0.9 -> 1>",
                 },
                 "started": mock.ANY,
+                "frames": mock.ANY,
             }
 
+            frames = info["animations"][identity]["current_animation"]["frames"]
+            assert frames["target_fps"] == 3.33
+            assert set(frames) == {"fps", "target_fps", "frames", "late", "skipped", "dropped_by_semaphore", "render", "send"}
+            assert "inflight" in info["animations"][identity]
+
             assert info["animations"][identity]["options"]["combined"]
             assert "unlocked" in info["animations"][identity]["options"]["pauser"]
             assert info["animations"][identity]["options"]["noisy_network"] == 0
 
             specific = await server.assertCommand("/v1/lifx/command", {"command": "animation/info", "args": {"identity": identity}})
             info["animations"][identity]["current_animation"]["started"] = mock.ANY
+            info["animations"][identity]["current_animation"]["frames"] = mock.ANY
+            info["animations"][identity]["inflight"] = mock.ANY
             assert info["animations"][identity] == specific
@@ -8,6 +8,8 @@ from photons_transport.targets import LanTarget
 from photons_app import helpers as hp
 from photons_app.mimic.device import Device
 from photons_app.mimic.event import Events
+from photons_app.mimic.fleet import parse_fleet
+from photons_app.mimic.operator import SharedIncoming
 from photons_app.mimic.transport import MemoryTarget
 
 this_dir = os.path.dirname(__file__)
@@ -211,9 +213,17 @@ class Store:
 
 
 class DeviceCollection:
+    """
+    A collection of fake devices for tests.
+
+    For many devices, ``record_limit`` is passed onto the ``MemoryTarget`` to
+    limit how many sent messages it remembers, and ``shared_incoming`` makes
+    every device process messages on one task.
+    """
+
     Events = Events
 
-    def __init__(self, has_udp=False, has_memory=True):
+    def __init__(self, has_udp=False, has_memory=True, record_limit=None, shared_incoming=False):
         self.devices = {}
         self.stores = {}
         self.serial_seq = iter(Serials())
@@ -221,6 +231,9 @@ class DeviceCollection:
         self.has_udp = has_udp
         self.has_memory = has_memory
 
+        self.record_limit = record_limit
+        self.shared_incoming = SharedIncoming() if shared_incoming else None
+
     def __iter__(self):
         return iter(self.devices.values())
 
@@ -251,11 +264,7 @@ class DeviceCollection:
                 "make_packet_waiter": True,
             }
 
-            kwargs["value_store"] = {
-                "no_memory_io": not self.has_memory,
-                "no_udp_io": not self.has_udp,
-                **kwargs["value_store"],
-            }
+            kwargs["value_store"] = {**self.value_store, **kwargs["value_store"]}
 
             device = Device(serial, *args, **kwargs)
             store.device = device
@@ -264,6 +273,41 @@ class DeviceCollection:
 
         return adder
 
+    @property
+    def value_store(self):
+        value_store = {"no_memory_io": not self.has_memory, "no_udp_io": not self.has_udp}
+        if self.shared_incoming is not None:
+            value_store["shared_incoming"] = self.shared_incoming
+        return value_store
+
+    def add_fleet(self, description, **value_store):
+        """
+        Add devices from a description like ``"200 A19, 40 strips, 20 tile chains"``
+
+        These devices don't print to the console and are labelled by their
+        serial. Like with ``add``, their events are recorded in a store we can
+        get with ``store(device)``.
+        """
+        made = []
+        for count, kind in parse_fleet(description):
+            for _ in range(count):
+                serial = next(self.serial_seq)
+                store = Store()
+                self.stores[serial] = store
+                options = {
+                    **self.value_store,
+                    "console_output": False,
+                    **kind.value_store,
+                    **value_store,
+                    "record_events_store": store,
+                    "make_packet_waiter": True,
+                }
+                device = Device(serial, kind.product, kind.firmware, value_store=options)
+                store.device = device
+                self.devices[serial] = device
+                made.append(device)
+        return made
+
     def store(self, device):
         device = self[device]
         return self.stores[device.serial]
@@ -293,6 +337,9 @@ class DeviceCollection:
         async with hp.TaskHolder(final_future, name="DeviceCollection::for_test") as ts:
             sessions = [device.session(final_future) for device in self.devices.values()]
             try:
+                if self.shared_incoming is not None:
+                    await self.shared_incoming.start(final_future)
+
                 tt = []
                 for session in sessions:
                     tt.append(ts.add(session.start()))
@@ -307,7 +354,7 @@ class DeviceCollection:
                 if udp:
                     target = LanTarget.create(configuration)
                 else:
-                    target = MemoryTarget.create(configuration)
+                    target = MemoryTarget.create({**configuration, "record_limit": self.record_limit})
 
                 async with target.session() as sender:
                     if udp:
@@ -329,5 +376,8 @@ class DeviceCollection:
                     ends.append(ts.add(session.finish(exc_typ=exc_typ, exc=exc, tb=tb)))
                 await hp.wait_for_all_futures(*ends, name="DeviceCollection::for_test[wait_for_session_ends]")
 
+                if self.shared_incoming is not None:
+                    await self.shared_incoming.finish()
+
 
 __all__ = ["Device", "DeviceCollection"]
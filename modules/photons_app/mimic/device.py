@@ -1,11 +1,13 @@
 import asyncio
 import logging
 
+from delfick_project.norms import dictobj
+
 from photons_app import helpers as hp
 from photons_app.errors import PhotonsAppError
 from photons_app.mimic.attrs import Attrs
 from photons_app.mimic.event import Events
-from photons_app.mimic.operator import IO, register
+from photons_app.mimic.operator import IO, Operator, register
 
 
 class ExpectedMessages(PhotonsAppError):
@@ -100,6 +102,7 @@ class Device:
         self.options = list(options)
         self.firmware = firmware.clone()
         self.applied_options = False
+        self._dispatch = None
 
         self._product = product
 
@@ -160,19 +163,20 @@ class Device:
 
         async def response():
             yield
-            for group in (self.viewers, self.io.values(), self.operators):
-                if getattr(event, "_viewers_only", False) and group is not self.viewers:
+            viewers_only = getattr(event, "_viewers_only", False)
+            exclude_viewers = getattr(event, "_exclude_viewers", False)
+
+            for group, op in self.responders_for(event):
+                if viewers_only and group is not self.viewers:
                     continue
 
-                if getattr(event, "_exclude_viewers", False) and group is self.viewers:
+                if exclude_viewers and group is self.viewers:
                     continue
 
-                for op in group:
-                    if hasattr(op, "respond"):
-                        async with self.annotate_error(executing=event):
-                            if group is not self.operators or not getattr(event, "handled", False):
-                                await op.respond(event)
-                        yield
+                async with self.annotate_error(executing=event):
+                    if group is not self.operators or not getattr(event, "handled", False):
+                        await op.respond(event)
+                yield
 
         async with self.annotate_error(executing=event):
             async for _ in response():
@@ -181,6 +185,55 @@ class Device:
 
         return event
 
+    def responders_for(self, event):
+        """
+        Return ``(group, operator)`` for everything that wants to respond to
+        this event, in the order they should be given the event.
+
+        These are remembered for each type of event, and for each type of
+        message in incoming events.
+        """
+        if self._dispatch is None or self._dispatch_counts != self.operator_counts:
+            self.make_dispatch()
+
+        pkt_type = None
+        if event | Events.INCOMING:
+            pkt_type = (event.pkt.protocol, event.pkt.pkt_type)
+
+        key = (type(event), pkt_type)
+        if key not in self._dispatch:
+            self._dispatch[key] = [(group, op) for group, op in self._responders if op.responds_to(*key)]
+        return self._dispatch[key]
+
+    @property
+    def operator_counts(self):
+        return (len(self.viewers), len(self.io), len(self.operators))
+
+    def make_dispatch(self):
+        """
+        Make the table used to find what responds to each event. The messages
+        that operators say they handle are put in the table now and everything
+        else is added to the table as it's needed.
+
+        Operators that don't override ``respond`` are left out of the table.
+        """
+        self._responders = []
+        for group in (self.viewers, self.io.values(), self.operators):
+            for op in group:
+                respond = getattr(type(op), "respond", None)
+                if respond is not None and respond is not Operator.respond:
+                    self._responders.append((group, op))
+
+        self._dispatch = {}
+        self._dispatch_counts = self.operator_counts
+
+        for _, op in self._responders:
+            for want in getattr(op, "handles", None) or ():
+                if issubclass(want, dictobj.PacketSpec):
+                    key = (Events.INCOMING, (want.Payload.Meta.protocol, want.Payload.message_type))
+                    if key not in self._dispatch:
+                        self._dispatch[key] = [(g, o) for g, o in self._responders if o.responds_to(*key)]
+
     @property
     def product(self):
         return self._product
@@ -221,6 +274,7 @@ class Device:
         self.io = {}
         self.viewers = []
         self.operators = []
+        self._dispatch = None
 
         options = list(self.options)
         if self.search_for_operators:
@@ -237,6 +291,7 @@ class Device:
                     continue
                 await option.apply()
 
+        self.make_dispatch()
         self.applied_options = True
 
     async def reset(self, zerod=False):
@@ -258,6 +313,7 @@ class Device:
             del self.viewers
         if hasattr(self, "operators"):
             del self.operators
+        self._dispatch = None
         self.applied_options = False
 
     async def annotate(self, level, message, **details):
@@ -0,0 +1,76 @@
+"""
+Make many fake devices from a short description of a fleet.
+
+A description is a comma separated list of ``<count> <kind>``. For example
+``"200 A19, 40 strips, 20 tile chains"``. The kind may be one of the names in
+``FleetKinds`` or the name of a product, like ``LCM3_TILE``.
+"""
+
+import re
+
+from photons_products import Products
+
+from photons_app import helpers as hp
+from photons_app.errors import PhotonsAppError
+
+
+class BadFleetDescription(PhotonsAppError):
+    desc = "Couldn't understand fleet description"
+
+
+class FleetKind:
+    def __init__(self, product, firmware, value_store=None):
+        self.product = product
+        self.firmware = firmware
+        self.value_store = {} if value_store is None else value_store
+
+    def __repr__(self):
+        return f"<FleetKind {self.product.name}:{self.firmware}:{self.value_store}>"
+
+
+FleetKinds = {
+    "a19": FleetKind(Products.LCM3_A19, hp.Firmware(3, 70)),
+    "bulb": FleetKind(Products.LCM3_A19, hp.Firmware(3, 70)),
+    "candle": FleetKind(Products.LCM3_CANDLE, hp.Firmware(3, 70), {"chain_length": 1}),
+    "strip": FleetKind(Products.LCM2_Z, hp.Firmware(2, 80), {"zones_count": 16}),
+    "beam": FleetKind(Products.LCM2_BEAM, hp.Firmware(2, 80), {"zones_count": 60}),
+    "tile": FleetKind(Products.LCM3_TILE, hp.Firmware(3, 50), {"chain_length": 5}),
+    "tile chain": FleetKind(Products.LCM3_TILE, hp.Firmware(3, 50), {"chain_length": 5}),
+}
+
+regexes = {"part": re.compile(r"^(\d+)\s+(.+)$")}
+
+
+def kind_for(name):
+    """Return the FleetKind for this name from a fleet description"""
+    wanted = " ".join(name.lower().split())
+
+    for option in (wanted, wanted[:-1] if wanted.endswith("s") else None):
+        if option in FleetKinds:
+            return FleetKinds[option]
+
+    product = getattr(Products, name.strip().upper(), None)
+    if product is None:
+        raise BadFleetDescription("Unknown kind of device", kind=name, available=sorted(FleetKinds))
+
+    firmware = hp.Firmware(3, 70) if product.name.startswith("LCM3") else hp.Firmware(2, 80)
+    return FleetKind(product, firmware)
+
+
+def parse_fleet(description):
+    """
+    Return a list of ``(count, FleetKind)`` from a description of a fleet
+    """
+    fleet = []
+    for part in description.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        m = regexes["part"].match(part)
+        if m is None:
+            raise BadFleetDescription("Expected '<count> <kind>'", got=part)
+
+        fleet.append((int(m.group(1)), kind_for(m.group(2))))
+
+    return fleet
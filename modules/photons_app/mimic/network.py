@@ -0,0 +1,162 @@
+"""
+Make fake devices behave like they are on a real network.
+
+An IO operator on a device with ``network`` in it's value_store will delay,
+lose, duplicate and reorder the messages it receives and the replies it sends.
+The value may be:
+
+* The name of one of the ``presets``
+* A dictionary of the options in ``NetworkOptions``
+* A ``Network`` object, so that many devices share the same conditions and
+  bandwidth, like devices on the same access point
+
+For example::
+
+    devices.add_fleet("50 A19", network={"latency": 0.01, "jitter": 0.02, "loss": 0.05, "seed": 1})
+
+When a seed is given, each device gets the same conditions every time.
+"""
+
+import random
+import time
+
+from delfick_project.norms import Meta, dictobj, sb
+
+from photons_app.errors import PhotonsAppError
+
+
+class NetworkOptions(dictobj.Spec):
+    latency = dictobj.Field(sb.float_spec, default=0, help="Seconds every message is delayed by")
+
+    jitter = dictobj.Field(sb.float_spec, default=0, help="Extra delay that changes for each message")
+
+    distribution = dictobj.Field(
+        sb.string_choice_spec(["uniform", "normal", "exponential"]),
+        default="uniform",
+        help="""
+            How the jitter is chosen. ``uniform`` is between 0 and jitter,
+            ``normal`` and ``exponential`` have jitter as their deviation and mean
+        """,
+    )
+
+    loss = dictobj.Field(sb.float_spec, default=0, help="Chance between 0 and 1 of a message being lost")
+
+    duplicate = dictobj.Field(sb.float_spec, default=0, help="Chance between 0 and 1 of a message arriving twice")
+
+    reorder = dictobj.Field(sb.float_spec, default=0, help="Chance between 0 and 1 of a message being held back")
+
+    reorder_delay = dictobj.Field(sb.float_spec, default=0.05, help="Seconds a message that is held back is delayed by")
+
+    bandwidth = dictobj.NullableField(sb.integer_spec, help="Bytes per second that may be sent")
+
+    seed = dictobj.NullableField(sb.any_spec, help="Used to make the same choices every time")
+
+
+presets = {
+    "wifi": {
+        "latency": 0.004,
+        "jitter": 0.006,
+        "distribution": "normal",
+        "loss": 0.005,
+        "duplicate": 0.001,
+        "reorder": 0.005,
+    },
+    "noisy_wifi": {
+        "latency": 0.01,
+        "jitter": 0.04,
+        "distribution": "exponential",
+        "loss": 0.05,
+        "duplicate": 0.01,
+        "reorder": 0.02,
+        "bandwidth": 125000,
+    },
+}
+
+
+class Network:
+    """
+    Decides what happens to each message that goes through it.
+    """
+
+    def __init__(self, options, name=""):
+        self.options = options
+        self.busy_until = 0
+
+        if options.seed is None:
+            self.random = random.Random()
+        else:
+            self.random = random.Random(f"{options.seed}:{name}")
+
+        self.sent = 0
+        self.lost = 0
+        self.duplicated = 0
+        self.reordered = 0
+
+    @classmethod
+    def create(kls, value, name=""):
+        """Return a Network from a preset name, dictionary of options or Network"""
+        if value is None or isinstance(value, Network):
+            return value
+
+        if isinstance(value, str):
+            if value not in presets:
+                raise PhotonsAppError("Unknown network preset", wanted=value, available=sorted(presets))
+            value = presets[value]
+
+        return kls(NetworkOptions.FieldSpec().normalise(Meta.empty(), value), name=name)
+
+    @property
+    def info(self):
+        return {
+            "sent": self.sent,
+            "lost": self.lost,
+            "duplicated": self.duplicated,
+            "reordered": self.reordered,
+        }
+
+    def delays(self, size):
+        """
+        Return a list of delays in seconds for when a message of this many
+        bytes arrives. An empty list means the message is lost and more than
+        one means it was duplicated.
+        """
+        options = self.options
+        self.sent += 1
+
+        if options.loss and self.random.random() < options.loss:
+            self.lost += 1
+            return []
+
+        delay = self.transmit(size) + options.latency + self.jitter()
+
+        if options.reorder and self.random.random() < options.reorder:
+            self.reordered += 1
+            delay += options.reorder_delay
+
+        delays = [delay]
+        if options.duplicate and self.random.random() < options.duplicate:
+            self.duplicated += 1
+            delays.append(delay + options.latency + self.jitter())
+
+        return delays
+
+    def jitter(self):
+        jitter = self.options.jitter
+        if not jitter:
+            return 0
+
+        distribution = self.options.distribution
+        if distribution == "normal":
+            return abs(self.random.gauss(0, jitter))
+        elif distribution == "exponential":
+            return self.random.expovariate(1 / jitter)
+        return self.random.uniform(0, jitter)
+
+    def transmit(self, size):
+        """Return how long until a message of this size has been sent"""
+        if not self.options.bandwidth:
+            return 0
+
+        now = time.time()
+        self.busy_until = max(now, self.busy_until) + size / self.options.bandwidth
+        return self.busy_until - now
@@ -6,6 +6,7 @@ from photons_protocol.messages import Messages
 from photons_app import helpers as hp
 from photons_app.errors import PhotonsAppError, ProgrammerError
 from photons_app.mimic.event import Events
+from photons_app.mimic.network import Network
 from photons_app.mimic.packet_filter import Filter, SendAck, SendReplies, SendUnhandled
 
 register = []
@@ -58,6 +59,11 @@ class Operator:
         A function that takes in an event object and does something. There
         are multiple events that are possible as found in
         photons_app.mimc.event
+
+    handles
+        The event classes and message classes that respond cares about.
+        The device will only give respond events that match one of these. If
+        this is None then respond is given every event.
     """
 
     class Attr:
@@ -66,9 +72,29 @@ class Operator:
 
     attrs = []
 
+    handles = None
+
     class Options(dictobj.Spec):
         pass
 
+    @classmethod
+    def responds_to(kls, event_kls, pkt_type=None):
+        """
+        Return whether respond wants events of this class. ``pkt_type`` is a
+        tuple of ``(protocol, pkt_type)`` for the packet in an incoming event.
+        """
+        if kls.handles is None:
+            return True
+
+        for want in kls.handles:
+            if issubclass(want, dictobj.PacketSpec):
+                if pkt_type == (want.Payload.Meta.protocol, want.Payload.message_type):
+                    return True
+            elif issubclass(event_kls, want):
+                return True
+
+        return False
+
     @classmethod
     def only_io_and_viewer_operators(kls, value_store):
         return bool(value_store.get("only_io_and_viewer_operators"))
@@ -115,10 +141,46 @@ class Viewer(Operator):
         self.device.viewers.append(self)
 
 
+class SharedIncoming:
+    """
+    Processes the messages given to many IO operators with one task rather
+    than each IO having a task of it's own. Messages are processed one at a
+    time in the order they were received.
+
+    Devices use this if it's in their value_store as ``shared_incoming``.
+    """
+
+    async def start(self, final_future):
+        self.final_future = hp.ChildOfFuture(final_future, name="SharedIncoming::start[final_future]")
+        self.incoming = hp.Queue(self.final_future, name="SharedIncoming::start[incoming]")
+        self.task = hp.async_as_background(self.incoming_loop())
+
+    async def finish(self):
+        if not hasattr(self, "final_future"):
+            return
+
+        self.final_future.cancel()
+        await self.incoming.finish()
+        await hp.wait_for_all_futures(self.task, name="SharedIncoming::finish[wait]")
+
+    def received(self, io, bts, give_reply, addr):
+        self.incoming.append((io, bts, give_reply, addr))
+
+    async def incoming_loop(self):
+        async for io, bts, give_reply, addr in self.incoming:
+            if io.final_future is None or io.final_future.done():
+                continue
+
+            t = io.ts.add(io.process_incoming(bts, give_reply, addr))
+            await hp.wait_for_all_futures(t, name="SharedIncoming::incoming_loop[wait]")
+
+
 class IO(Operator):
     def setup(self):
         self.active = False
         self.packet_filter = Filter()
+        self.shared_incoming = None
+        self.network = Network.create(self.device.value_store.get("network"), name=self.device.serial)
 
         self.final_future = None
         self.last_final_future = None
@@ -165,7 +227,10 @@ class IO(Operator):
         )
 
         await self.ts.start()
-        self.ts.add(self.incoming_loop())
+
+        self.shared_incoming = self.device.value_store.get("shared_incoming")
+        if self.shared_incoming is None:
+            self.ts.add(self.incoming_loop())
 
     async def restart_session(self):
         if self.last_final_future is None or self.last_final_future.done():
@@ -194,7 +259,31 @@ class IO(Operator):
             self.final_future = None
 
     def received(self, bts, give_reply, addr):
-        self.incoming.append((bts, give_reply, addr))
+        if self.network is None:
+            self.arrived(bts, give_reply, addr)
+            return
+
+        for delay in self.network.delays(len(bts)):
+            hp.get_event_loop().call_later(delay, self.arrived, bts, give_reply, addr)
+
+    async def through_network(self, size, send):
+        """
+        Send a message of this size through the network conditions for this
+        device. ``send`` is a function that returns a coroutine that sends
+        the message.
+        """
+        if self.network is None:
+            await send()
+            return
+
+        for delay in self.network.delays(size):
+            await self.with_delay(send(), delay)
+
+    def arrived(self, bts, give_reply, addr):
+        if self.shared_incoming is not None:
+            self.shared_incoming.received(self, bts, give_reply, addr)
+        else:
+            self.incoming.append((bts, give_reply, addr))
 
     async def incoming_loop(self):
         async for bts, give_reply, addr in self.incoming:
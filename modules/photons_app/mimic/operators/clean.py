@@ -116,6 +116,15 @@ class Clean(Operator):
 
     attrs = [CleanDetailsAttr()]
 
+    handles = (
+        Events.SHUTTING_DOWN,
+        LightMessages.GetHevCycle,
+        LightMessages.GetHevCycleConfiguration,
+        LightMessages.GetLastHevCycleResult,
+        LightMessages.SetHevCycle,
+        LightMessages.SetHevCycleConfiguration,
+    )
+
     async def respond(self, event):
         if event | Events.SHUTTING_DOWN:
             if self.device.attrs._started:
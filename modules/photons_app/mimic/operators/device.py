@@ -63,6 +63,14 @@ class Device(Operator):
         ),
     ]
 
+    handles = (
+        DeviceMessages.GetLabel,
+        DeviceMessages.GetPower,
+        DeviceMessages.SetLabel,
+        DeviceMessages.SetPower,
+        DeviceMessages.EchoRequest,
+    )
+
     async def respond(self, event):
         if event | DeviceMessages.GetLabel:
             event.add_replies(self.state_for(DeviceMessages.StateLabel))
@@ -113,6 +121,13 @@ class Grouping(Operator):
         ),
     ]
 
+    handles = (
+        DeviceMessages.GetGroup,
+        DeviceMessages.GetLocation,
+        DeviceMessages.SetGroup,
+        DeviceMessages.SetLocation,
+    )
+
     async def respond(self, event):
         if event | DeviceMessages.GetGroup:
             event.add_replies(self.state_for(DeviceMessages.StateGroup))
@@ -165,6 +180,12 @@ class Product(Operator):
         if not kls.only_io_and_viewer_operators(device.value_store):
             return kls(device, device.value_store)
 
+    handles = (
+        DeviceMessages.GetVersion,
+        DeviceMessages.GetHostFirmware,
+        DeviceMessages.GetWifiFirmware,
+    )
+
     async def respond(self, event):
         if event | DeviceMessages.GetVersion:
             event.add_replies(self.state_for(DeviceMessages.StateVersion))
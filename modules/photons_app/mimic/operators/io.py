@@ -47,7 +47,9 @@ class MemoryIO(IO):
                 addr=addr,
                 replying_to=replying_to,
             )
-            await give_reply(bts, addr, replying_to, reply=reply)
+            await self.through_network(len(bts), lambda: give_reply(bts, addr, replying_to, reply=reply))
+
+    handles = (DiscoveryMessages.GetService,)
 
     async def respond(self, event):
         if event | DiscoveryMessages.GetService and event.io is self:
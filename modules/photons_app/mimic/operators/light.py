@@ -62,6 +62,15 @@ class LightState(Operator):
         )
     ]
 
+    handles = (
+        LightMessages.GetColor,
+        LightMessages.GetLightPower,
+        LightMessages.SetLightPower,
+        LightMessages.SetColor,
+        LightMessages.SetWaveform,
+        LightMessages.SetWaveformOptional,
+    )
+
     async def respond(self, event):
         if event | LightMessages.GetColor:
             event.add_replies(self.state_for(LightMessages.LightState))
@@ -128,6 +137,11 @@ class Infrared(Operator):
         )
     ]
 
+    handles = (
+        LightMessages.GetInfrared,
+        LightMessages.SetInfrared,
+    )
+
     async def respond(self, event):
         if event | LightMessages.GetInfrared:
             event.add_replies(self.state_for(LightMessages.StateInfrared))
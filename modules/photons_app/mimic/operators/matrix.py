@@ -23,6 +23,41 @@ class TileChild(dictobj.Spec):
     firmware_build = dictobj.Field(sb.integer_spec, default=0)
     colors = dictobj.Field(sb.listof(color_spec()))
 
+    @property
+    def orientation(self):
+        nearest_orientation = __import__("photons_canvas.orientation").orientation.nearest_orientation
+        return nearest_orientation(self.accel_meas_x, self.accel_meas_y, self.accel_meas_z)
+
+    @property
+    def upright_colors(self):
+        """
+        The colors on this tile in the order a person looking at it would see
+        them given how the tile is rotated
+        """
+        reverse_orient = __import__("photons_canvas.orientation").orientation.reverse_orient
+        colors = self.colors[: self.width * self.height]
+        return reverse_orient(colors, self.orientation, self.width, self.height)
+
+    def set_colors(self, colors, x=0, y=0, width=None):
+        """
+        Set colors like a Set64 would, starting at ``(x, y)`` with rows that
+        are ``width`` wide
+        """
+        if width is None:
+            width = self.width
+
+        if x == 0 and y == 0 and width == self.width:
+            self.colors.clear()
+            self.colors.extend(colors)
+            return
+
+        for i, color in enumerate(colors):
+            row, col = y + i // width, x + i % width
+            if row >= self.height:
+                break
+            if col < self.width:
+                self.colors[row * self.width + col] = color
+
 
 class ChainAttr:
     async def __call__(self, event, options):
@@ -112,6 +147,15 @@ class Matrix(Operator):
         ),
     ]
 
+    handles = (
+        TileMessages.GetTileEffect,
+        TileMessages.SetTileEffect,
+        TileMessages.GetDeviceChain,
+        TileMessages.Get64,
+        TileMessages.SetUserPosition,
+        TileMessages.Set64,
+    )
+
     async def respond(self, event):
         if event | TileMessages.GetTileEffect:
             event.add_replies(self.state_for(TileMessages.StateTileEffect))
@@ -172,9 +216,12 @@ class Matrix(Operator):
             for i in range(event.pkt.tile_index, event.pkt.tile_index + event.pkt.length):
                 if i < len(self.device.attrs.chain):
                     # For efficiency, not gonna make events for this
-                    chain = self.device.attrs.chain[i]
-                    chain.colors.clear()
-                    chain.colors.extend([hp.Color(c.hue, c.saturation, c.brightness, c.kelvin) for c in event.pkt.colors])
+                    self.device.attrs.chain[i].set_colors(
+                        [hp.Color(c.hue, c.saturation, c.brightness, c.kelvin) for c in event.pkt.colors],
+                        x=event.pkt.x,
+                        y=event.pkt.y,
+                        width=event.pkt.width,
+                    )
 
     def make_state_for(self, kls, result):
         if kls | TileMessages.StateTileEffect:
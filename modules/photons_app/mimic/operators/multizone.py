@@ -72,6 +72,14 @@ class Multizone(Operator):
         ),
     ]
 
+    handles = (
+        Events.SET_ZONES,
+        MultiZoneMessages.GetMultiZoneEffect,
+        MultiZoneMessages.GetColorZones,
+        MultiZoneMessages.SetMultiZoneEffect,
+        MultiZoneMessages.SetColorZones,
+    )
+
     async def respond(self, event):
         if event | Events.SET_ZONES:
             changes = []
@@ -152,6 +160,11 @@ class ExtendedMultizone(Operator):
         if not kls.only_io_and_viewer_operators(device.value_store) and device.cap.has_multizone:
             return kls(device, device.value_store)
 
+    handles = (
+        MultiZoneMessages.GetExtendedColorZones,
+        MultiZoneMessages.SetExtendedColorZones,
+    )
+
     async def respond(self, event):
         if not self.device.cap.has_extended_multizone:
             return
@@ -65,6 +65,13 @@ class Relays(Operator):
 
     attrs = [RelaysAttr()]
 
+    handles = (
+        RelayMessages.GetRPower,
+        RelayMessages.SetRPower,
+        DeviceMessages.SetPower,
+        SetRelaysPower,
+    )
+
     async def respond(self, event):
         if event | RelayMessages.GetRPower:
             event.add_replies(self.state_for(RelayPowerGetter(event.pkt.relay_index)))
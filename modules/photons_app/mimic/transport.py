@@ -1,4 +1,5 @@
 import time
+from collections import deque
 
 from delfick_project.norms import dictobj, sb
 from photons_messages import protocol_register
@@ -58,9 +59,18 @@ def makeMemorySession(basedon):
     class MemorySession(basedon):
         def setup(self):
             super().setup()
-            self.received = []
+            self.devices = {}
+
+            record_limit = self.transport_target.record_limit
+            if record_limit is None:
+                self.received = []
+            else:
+                self.received = deque(maxlen=record_limit)
 
         def record(self, serial, received_data):
+            if self.transport_target.record_limit == 0:
+                return
+
             try:
                 msg = make_message(received_data)
                 Payload = msg.Payload.__name__
@@ -70,16 +80,20 @@ def makeMemorySession(basedon):
             except Exception as error:
                 self.received.append((time.time(), serial, error))
 
-        async def make_transport(self, serial, service, kwargs):
-            device = None
-            for d in self.transport_target.devices:
-                if d.serial == serial:
-                    device = d
-                    break
+        def device_for(self, serial):
+            device = self.devices.get(serial)
+            if device is None:
+                self.devices = {d.serial: d for d in self.transport_target.devices}
+                device = self.devices.get(serial)
 
             if device is None:
                 raise PhotonsAppError("No such device", want=serial)
 
+            return device
+
+        async def make_transport(self, serial, service, kwargs):
+            device = self.device_for(serial)
+
             async def writer(bts, give_reply, addr):
                 self.record(serial, bts)
                 io_name = self.transport_target.io_service.name
@@ -118,4 +132,8 @@ class MemoryTarget(LanTarget):
     devices = dictobj.Field(sb.listof(sb.any_spec()), wrapper=sb.required)
     default_broadcast = dictobj.Field(sb.defaulted(sb.string_spec(), "255.255.255.255"))
 
+    # None records every message sent to the devices, 0 records nothing and
+    # otherwise only this many of the most recent messages are kept
+    record_limit = dictobj.NullableField(sb.integer_spec)
+
     session_kls = makeMemorySession(NetworkSession)
@@ -28,11 +28,12 @@ Animations
 from photons_canvas import font
 from photons_canvas.points import helpers as point_helpers
 from photons_canvas.points import rearrange
-from photons_canvas.points.canvas import Canvas
+from photons_canvas.points.canvas import Canvas, PartLayer
 from photons_canvas.theme import ApplyTheme
 
 __all__ = [
     "Canvas",
+    "PartLayer",
     "point_helpers",
     "rearrange",
     "ApplyTheme",
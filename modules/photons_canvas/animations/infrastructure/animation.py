@@ -5,6 +5,7 @@ import time
 from photons_app import helpers as hp
 
 from photons_canvas.animations.infrastructure.events import AnimationEvent
+from photons_canvas.animations.infrastructure.stats import FrameStats
 from photons_canvas.points import rearrange
 
 log = logging.getLogger("photons_canvas.animations.infrastructure.animation")
@@ -19,6 +20,12 @@ class Animation:
     random_orientations = False
     skip_next_transition = False
 
+    latest_tick = 0
+
+    # Whether this animation looks the same every time it runs on the same tiles
+    # and so may be worked out before it is played. See pre_render_position
+    pre_renderable = False
+
     align_parts_separate = False
     align_parts_straight = False
     align_parts_vertically = False
@@ -46,7 +53,16 @@ class Animation:
         name = self.__class__.__name__
         if hasattr(self, "__registered_name__"):
             name = self.__registered_name__
-        return {"name": name, "started": self.started, "options": self.options}
+        return {
+            "name": name,
+            "started": self.started,
+            "options": self.options,
+            "frames": self.frame_stats.info,
+        }
+
+    @hp.memoized_property
+    def frame_stats(self):
+        return FrameStats(self)
 
     @hp.memoized_property
     def ticker(self):
@@ -61,11 +77,13 @@ class Animation:
 
     async def stream(self, animation_state):
         self.started = time.time()
+        self.latest_tick = 0
         del self.ticker
 
         async def tick():
             async with self.ticker as ticks:
                 async for result in ticks:
+                    self.latest_tick = result[0]
                     yield result
 
         def errors(e):
@@ -109,6 +127,17 @@ class Animation:
     async def process_event(self, event):
         raise NotImplementedError()
 
+    def pre_render_position(self, state):
+        """
+        Return a hashable value that says where this animation is up to after
+        a frame, given the state from it's events.
+
+        When this animation is worked out before it is played, and it gets back
+        to a position it has been in before, then we know the frames from
+        there on repeat. Return None if the animation doesn't repeat.
+        """
+        return None
+
     async def make_user_events(self, animation_state):
         if False:
             yield
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from functools import partial
 
 from photons_app import helpers as hp
@@ -38,12 +38,29 @@ class Writer:
 class Sem:
     def __init__(self, inflight_limit=None, wait_timeout=1):
         self.results = defaultdict(list)
+        self.latencies = deque(maxlen=50)
         self.wait_timeout = wait_timeout
         self.inflight_limit = inflight_limit
 
+    @property
+    def ack_latency(self):
+        """The mean time it took to get the last few acks, or None if we have none"""
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
     def add(self, serial, result):
         if result:
-            self.results[serial].append((time.time(), result))
+            started = time.time()
+            self.results[serial].append((started, result))
+            result.add_done_callback(partial(self.acked, started))
+
+    def acked(self, started, result):
+        if not result.cancelled() and result.exception() is None:
+            self.latencies.append(time.time() - started)
+
+    def inflight(self, serial):
+        return len([r for t, r in self.results[serial] if not r.done() and time.time() - t < self.wait_timeout])
 
     def should_drop(self, serial):
         if not self.inflight_limit:
@@ -62,6 +79,25 @@ class Cannon:
         self.afr = afr
         self.sem = sem
         self.writers = {}
+        self.sending = defaultdict(int)
+
+    @property
+    def inflight(self):
+        """
+        The number of messages per serial that we are either still sending or
+        are waiting on an acknowledgement for
+        """
+        serials = set(self.sending) | set(self.sem.results)
+        return {serial: self.sending[serial] + self.sem.inflight(serial) for serial in sorted(serials)}
+
+    @hp.memoized_property
+    def source(self):
+        """Each cannon is it's own stream of messages from the sender"""
+        return self.afr.source_for(self)
+
+    def release(self):
+        """Let the sender forget our stream once we are done"""
+        self.afr.release_stream(self)
 
     async def make_messages(self, ts, serial, msgs):
         """
@@ -75,6 +111,10 @@ class Cannon:
         raise NotImplementedError("Don't know how to make messages!")
 
     async def fire(self, ts, serial, msgs):
+        """
+        Send these messages to this serial. Return False if we didn't because
+        the semaphore says the device has too many messages inflight.
+        """
         if serial not in self.writers:
             services = self.afr.found[serial]
             if Services.UDP not in services:
@@ -85,11 +125,20 @@ class Cannon:
             self.writers[serial] = Writer(service)
 
         if self.sem.should_drop(serial):
-            return
+            return False
+
+        remaining = len(msgs)
+        self.sending[serial] += remaining
+        try:
+            async for write, result in self.make_messages(serial, msgs):
+                self.sem.add(serial, result)
+                await write()
+                remaining -= 1
+                self.sending[serial] -= 1
+        finally:
+            self.sending[serial] -= remaining
 
-        async for write, result in self.make_messages(serial, msgs):
-            self.sem.add(serial, result)
-            await write()
+        return True
 
 
 class FastNetworkCannon(Cannon):
@@ -100,7 +149,7 @@ class FastNetworkCannon(Cannon):
 
     async def make_messages(self, serial, msgs):
         for msg in msgs:
-            msg.update({"source": self.afr.source, "sequence": self.afr.seq(serial)})
+            msg.update({"source": self.source, "sequence": self.afr.seq(serial, source=self.source)})
             yield partial(self.writers[serial].write, msg), None
 
 
@@ -118,7 +167,7 @@ class NoisyNetworkCannon(Cannon):
 
     async def make_messages(self, serial, msgs):
         for i, msg in enumerate(msgs):
-            msg.update({"source": self.afr.source, "sequence": self.afr.seq(serial)})
+            msg.update({"source": self.source, "sequence": self.afr.seq(serial, source=self.source)})
             writer = self.writers[serial]
 
             t = await writer.t()
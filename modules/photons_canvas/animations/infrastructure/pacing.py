@@ -0,0 +1,120 @@
+class AdaptiveEvery:
+    """
+    Changes how often an animation ticks based on how well we are keeping up.
+
+    After every ``check_every`` rendered frames we look at what happened since
+    the last check. If frames took too long to render, acks took too long to
+    come back, or frames were dropped, then we tick less often. If there was
+    plenty of room on all of those, then we tick more often. The ``every`` we
+    end up with is always between ``min_every`` and ``max_every``.
+
+    Animations that tick slower than ``max_every`` or faster than
+    ``min_every`` by themselves are left alone. If the animation changes its
+    own ``every`` then we start again from that value.
+    """
+
+    # Frames that take more than this fraction of every to render mean we're behind
+    render_limit = 0.75
+
+    # And frames that take less than this fraction mean we have room to go faster
+    render_room = 0.4
+
+    # The fraction of frames that may be skipped, or of sends to a device that
+    # may be dropped, before we slow down
+    drop_limit = 0.05
+
+    def __init__(self, animation, options, cannon=None):
+        self.animation = animation
+        self.cannon = cannon
+
+        self.step = options.step
+        self.min_every = options.min_every
+        self.max_every = options.max_every
+        self.check_every = options.check_every
+
+        self.changes = 0
+        self.applied = None
+        self.last_check = self.snapshot()
+
+    @property
+    def info(self):
+        return {
+            "every": self.animation.every,
+            "min_every": self.min_every,
+            "max_every": self.max_every,
+            "changes": self.changes,
+        }
+
+    @property
+    def ack_latency(self):
+        if self.cannon is None:
+            return None
+        return self.cannon.sem.ack_latency
+
+    def snapshot(self):
+        stats = self.animation.frame_stats
+        return {
+            "frames": stats.render.count,
+            "render": stats.render.total,
+            "skipped": stats.skipped,
+            "fired": stats.send.count + stats.dropped_by_semaphore,
+            "dropped": stats.dropped_by_semaphore,
+        }
+
+    def frame(self):
+        """
+        Called after each frame is rendered. Returns the new every if we
+        changed it.
+        """
+        now = self.snapshot()
+        frames = now["frames"] - self.last_check["frames"]
+        if frames < self.check_every:
+            return
+
+        render = (now["render"] - self.last_check["render"]) / frames
+        drop_rate = self.drop_rate(now, frames)
+        self.last_check = now
+
+        every = self.animation.every
+        if every != self.applied:
+            # The animation chose a new every for itself
+            self.applied = None
+            if not (self.min_every <= every <= self.max_every):
+                return
+
+        new_every = self.next_every(every, render, drop_rate, self.ack_latency)
+        if new_every == every:
+            return
+
+        self.changes += 1
+        self.applied = self.animation.every = new_every
+        return new_every
+
+    def drop_rate(self, now, frames):
+        """
+        Skipped frames are whole frames, but each frame is sent to every device
+        separately and each of those may be dropped. So we look at what
+        fraction of frames were skipped and what fraction of sends were dropped
+        and use whichever is worse.
+        """
+        skipped = now["skipped"] - self.last_check["skipped"]
+        fired = now["fired"] - self.last_check["fired"]
+        dropped = now["dropped"] - self.last_check["dropped"]
+
+        rate = skipped / (frames + skipped)
+        if fired > 0:
+            rate = max(rate, dropped / fired)
+        return rate
+
+    def next_every(self, every, render, drop_rate, ack_latency):
+        behind = render > every * self.render_limit or drop_rate > self.drop_limit
+        if ack_latency is not None and ack_latency > every:
+            behind = True
+
+        if behind:
+            every = every * (1 + self.step)
+        elif render < every * self.render_room and drop_rate == 0:
+            if ack_latency is None or ack_latency < every / 2:
+                every = every / (1 + self.step)
+
+        return round(min(self.max_every, max(self.min_every, every)), 4)
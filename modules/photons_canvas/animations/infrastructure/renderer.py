@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from photons_app import helpers as hp
+
+
+class Renderer:
+    """
+    Used to render animation frames in worker threads so that evaluating
+    layers and making messages doesn't block the event loop.
+
+    Each animation waits for a frame to render before it ticks again, so more
+    than one worker only helps when animations are run separately. Frames
+    that are out of date by the time we get to them are dropped and counted.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+
+        self.dropped = 0
+        self.rendered = 0
+
+    @hp.memoized_property
+    def executor(self):
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="photons_canvas_renderer")
+
+    @property
+    def info(self):
+        return {
+            "workers": self.workers,
+            "rendered": self.rendered,
+            "dropped": self.dropped,
+        }
+
+    def drop(self):
+        self.dropped += 1
+
+    async def render(self, canvas, layer, **kwargs):
+        """
+        Return the messages for this layer on this canvas. The canvas and it's
+        parts are modified in place, so they must not be used by anything else
+        until this is done.
+        """
+        msgs = await hp.get_event_loop().run_in_executor(self.executor, partial(self.make_msgs, canvas, layer, kwargs))
+        self.rendered += 1
+        return msgs
+
+    def make_msgs(self, canvas, layer, kwargs):
+        return list(canvas.msgs(layer, onto=canvas.points, **kwargs))
+
+    def shutdown(self):
+        if getattr(self, "_executor", None) is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            del self.executor
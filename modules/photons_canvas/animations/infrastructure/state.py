@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import sys
+import time
 from collections import defaultdict
 from contextlib import contextmanager
 
@@ -33,8 +34,14 @@ def catch_finish(reraise_exceptions=True):
 
 
 class State:
-    def __init__(self, final_future):
+    def __init__(self, final_future, canvas_kls=Canvas, renderer=None):
         self.final_future = final_future
+        self.canvas_kls = canvas_kls
+        self.renderer = renderer
+
+        # Held while a frame renders in the renderer's threads so that we
+        # don't change the animation or the parts underneath it
+        self.lock = asyncio.Lock()
 
         self.state = None
         self.by_device = defaultdict(list)
@@ -70,14 +77,15 @@ class State:
                 raise Finish("Unhandled error")
 
     async def add_collected(self, collected):
-        for parts in collected:
-            self.add_parts(parts)
-
-        if self.animation:
-            # Do this after adding all parts so state.canvas has all parts for all devices
+        async with self.lock:
             for parts in collected:
-                parts = [p for p in self.canvas.parts if p in parts]
-                await self.process_event(AnimationEvent.Types.NEW_DEVICE, parts)
+                self.add_parts(parts)
+
+            if self.animation:
+                # Do this after adding all parts so state.canvas has all parts for all devices
+                for parts in collected:
+                    parts = [p for p in self.canvas.parts if p in parts]
+                    await self.process_event(AnimationEvent.Types.NEW_DEVICE, parts)
 
     async def set_animation(self, animation, background):
         if self.animation is not animation:
@@ -85,9 +93,18 @@ class State:
             self.animation = animation
             self.background = background
 
-            self.canvas = Canvas()
+            self.canvas = self.canvas_kls()
             await self.add_collected([[p.clone_real_part() for p in ps] for ps in self.by_device.values()])
 
+    async def restart_animation(self):
+        """
+        Make the animation start again from nothing on the parts we already
+        have. Callers that need ``lock`` must already hold it.
+        """
+        self.state = None
+        if self:
+            await self.process_event(AnimationEvent.Types.NEW_DEVICE, list(self.canvas.parts))
+
     def add_parts(self, parts):
         for part in parts:
             self.by_device[part.device].append(part)
@@ -121,7 +138,11 @@ class State:
                         if result.context is AnimationEvent.Types.TICK:
                             if not self:
                                 continue
-                            async for messages in self.send_canvas(await self.process_event(AnimationEvent.Types.TICK)):
+                            if self.renderer is not None and self.skip_frame(result.value):
+                                continue
+                            started = time.time()
+                            layer = await self.process_event(AnimationEvent.Types.TICK)
+                            async for messages in self.send_canvas(layer, started=started):
                                 yield messages
 
                         else:
@@ -133,21 +154,40 @@ class State:
                     async for messages in self.send_canvas(await self.process_event(AnimationEvent.Types.ENDED, force=True)):
                         yield messages
 
-    async def send_canvas(self, layer):
+    def skip_frame(self, tick):
+        """
+        Return whether we should drop this frame because a newer tick already
+        happened while we were rendering.
+        """
+        iteration, _ = tick
+        if iteration < self.animation.latest_tick:
+            self.renderer.drop()
+            self.animation.frame_stats.skipped += 1
+            return True
+        return False
+
+    async def send_canvas(self, layer, started=None):
         if not layer:
             return
 
-        self.canvas = self.canvas.clone()
-
-        msgs = list(
-            self.canvas.msgs(
-                layer,
-                onto=self.canvas.points,
-                duration=self.animation.duration,
-                acks=self.animation.retries,
-                randomize=self.animation.random_orientations,
-            )
-        )
+        if started is None:
+            started = time.time()
+
+        kwargs = {
+            "duration": self.animation.duration,
+            "acks": self.animation.retries,
+            "randomize": self.animation.random_orientations,
+        }
+
+        if self.renderer is None:
+            self.canvas = self.canvas.clone()
+            msgs = list(self.canvas.msgs(layer, onto=self.canvas.points, **kwargs))
+        else:
+            async with self.lock:
+                self.canvas = self.canvas.clone()
+                msgs = await self.renderer.render(self.canvas, layer, **kwargs)
+
+        self.animation.frame_stats.rendered(time.time() - started)
         yield msgs
 
         if msgs:
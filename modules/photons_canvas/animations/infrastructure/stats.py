@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+
+class Histogram:
+    """
+    Counts how many durations fall into each bucket. A duration goes in the
+    first bucket it is less than or equal to.
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+        for i, bucket in enumerate(self.buckets):
+            if duration <= bucket:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    @property
+    def info(self):
+        buckets = {str(bucket): count for bucket, count in zip(self.buckets, self.counts)}
+        buckets["inf"] = self.counts[-1]
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0,
+            "max": round(self.max, 4),
+            "buckets": buckets,
+        }
+
+
+class FrameStats:
+    """
+    Timings for the frames of an animation so we can see how well it keeps up
+    with how often it wants to tick.
+
+    The achieved fps is worked out from the last ``window`` frames, and
+    ``average_fps`` from every frame since the first one.
+    """
+
+    def __init__(self, animation, window=50):
+        self.animation = animation
+
+        self.late = 0
+        self.skipped = 0
+        self.dropped_by_semaphore = 0
+
+        self.send = Histogram()
+        self.render = Histogram()
+        self.frame_times = deque(maxlen=window)
+        self.first_frame = None
+
+    def rendered(self, duration):
+        self.render.add(duration)
+        self.frame_times.append(time.time())
+        if self.first_frame is None:
+            self.first_frame = self.frame_times[-1]
+        if self.animation.every > 0 and duration > self.animation.every:
+            self.late += 1
+
+    def sent(self, duration):
+        self.send.add(duration)
+
+    @property
+    def fps(self):
+        if len(self.frame_times) < 2:
+            return 0
+        took = self.frame_times[-1] - self.frame_times[0]
+        if took <= 0:
+            return 0
+        return round((len(self.frame_times) - 1) / took, 2)
+
+    @property
+    def average_fps(self):
+        if self.render.count < 2:
+            return 0
+        took = self.frame_times[-1] - self.first_frame
+        if took <= 0:
+            return 0
+        return round((self.render.count - 1) / took, 2)
+
+    @property
+    def info(self):
+        every = self.animation.every
+        return {
+            "fps": self.fps,
+            "target_fps": round(1 / every, 2) if every > 0 else None,
+            "frames": self.render.count,
+            "late": self.late,
+            "skipped": self.skipped,
+            "dropped_by_semaphore": self.dropped_by_semaphore,
+            "render": self.render.info,
+            "send": self.send.info,
+        }
@@ -0,0 +1,358 @@
+"""
+Pre-rendered animations.
+
+An animation that looks the same every time it runs on a particular layout of
+tiles can be worked out once into a :class:`Timeline` and then played back by
+copying bytes into Set64 messages. This costs very little CPU compared to
+working out every frame as the animation runs.
+
+A timeline only holds the Set64 payloads for parts that changed since the
+frame before it, and can be saved to disk so the next run on the same layout
+doesn't have to record it again.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import zlib
+
+from photons_app import helpers as hp
+
+from photons_canvas.animations.infrastructure.events import AnimationEvent
+from photons_canvas.animations.infrastructure.finish import Finish
+from photons_canvas.orientation import reorient_order, reverse_orient
+from photons_canvas.points.simple_messages import Set64
+
+log = logging.getLogger("photons_canvas.animations.infrastructure.timeline")
+
+MAGIC = b"PCTL\x02"
+
+# Everything after the 36 byte header of a Set64 message
+PAYLOAD_SIZE = len(Set64()._bts) - 36
+
+count_packer = struct.Struct("<I")
+entry_packer = struct.Struct("<H")
+
+
+def layout_for(canvas):
+    """Return a description of the parts on this canvas for telling layouts apart"""
+    return [
+        [part.device.serial, part.part_number, part.user_x, part.user_y, part.width, part.height, part.orientation.name]
+        for part in sorted(canvas.parts, key=lambda p: (p.device.serial, p.part_number))
+    ]
+
+
+def key_for(animation, layout):
+    """
+    Return a key for a recording of this animation with these options on this
+    layout.
+    """
+    options = animation.options
+    if hasattr(options, "as_dict"):
+        options = sorted(options.as_dict().items())
+
+    described = {
+        "animation": getattr(animation, "__registered_name__", type(animation).__name__),
+        "options": repr(options),
+        "overrides": [getattr(animation, attr) for attr in animation.overridable],
+        "layout": layout,
+    }
+    return hashlib.sha256(json.dumps(described, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+class Timeline:
+    """
+    The frames of an animation for a particular layout.
+
+    ``parts`` is a list of ``(serial, part_number)`` and each frame is a tuple
+    of ``(index into parts, payload)`` for each part that changed in that
+    frame. The first frame has every part.
+
+    If ``loops`` is True then the animation doesn't finish by itself, and
+    when we get to the end of the timeline we go back to the frame at
+    ``loop_start``, which comes straight after the last frame.
+    """
+
+    def __init__(self, every, parts, frames=None, loops=False, loop_start=0):
+        self.every = every
+        self.parts = parts
+        self.loops = loops
+        self.loop_start = loop_start
+        self.frames = [] if frames is None else frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def dumps(self):
+        meta = json.dumps({"every": self.every, "parts": self.parts, "loops": self.loops, "loop_start": self.loop_start}).encode()
+
+        body = [count_packer.pack(len(self.frames))]
+        for frame in self.frames:
+            body.append(entry_packer.pack(len(frame)))
+            for index, payload in frame:
+                body.append(entry_packer.pack(index))
+                body.append(payload)
+
+        return MAGIC + count_packer.pack(len(meta)) + meta + zlib.compress(b"".join(body))
+
+    @classmethod
+    def loads(cls, bts):
+        if not bts.startswith(MAGIC):
+            raise ValueError("Not a timeline")
+
+        start = len(MAGIC)
+        (size,) = count_packer.unpack_from(bts, start)
+        start += count_packer.size
+
+        meta = json.loads(bts[start : start + size])
+        body = zlib.decompress(bts[start + size :])
+
+        (num_frames,) = count_packer.unpack_from(body, 0)
+        offset = count_packer.size
+
+        frames = []
+        for _ in range(num_frames):
+            (num_changed,) = entry_packer.unpack_from(body, offset)
+            offset += entry_packer.size
+
+            frame = []
+            for _ in range(num_changed):
+                (index,) = entry_packer.unpack_from(body, offset)
+                offset += entry_packer.size
+                frame.append((index, body[offset : offset + PAYLOAD_SIZE]))
+                offset += PAYLOAD_SIZE
+            frames.append(tuple(frame))
+
+        parts = [tuple(part) for part in meta["parts"]]
+        return cls(meta["every"], parts, frames=frames, loops=meta["loops"], loop_start=meta["loop_start"])
+
+
+class TimelineCache:
+    """
+    Keeps timelines in memory and, if we have a ``directory``, on disk.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.timelines = {}
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.timeline")
+
+    def get(self, key):
+        if key in self.timelines:
+            return self.timelines[key]
+
+        if not self.directory:
+            return None
+
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as fle:
+                timeline = Timeline.loads(fle.read())
+        except (OSError, ValueError, KeyError, struct.error, zlib.error) as error:
+            log.warning(hp.lc("Failed to load timeline", path=path, error=error))
+            return None
+
+        self.timelines[key] = timeline
+        return timeline
+
+    def set(self, key, timeline):
+        self.timelines[key] = timeline
+
+        if not self.directory:
+            return
+
+        path = self.path_for(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(f"{path}.tmp", "wb") as fle:
+                fle.write(timeline.dumps())
+            os.replace(f"{path}.tmp", path)
+        except OSError as error:
+            log.warning(hp.lc("Failed to save timeline", path=path, error=error))
+
+
+class Recorder:
+    """
+    Runs an animation as fast as it can against an ``animation.State`` and
+    records the frames it makes.
+
+    An animation that doesn't finish by itself is recorded until it gets back
+    to a position it has already been in, as told by
+    ``animation.pre_render_position``. We then have one full loop of the
+    animation.
+    """
+
+    def __init__(self, state, max_frames=2000):
+        self.state = state
+        self.max_frames = max_frames
+
+        self.parts = sorted(state.canvas.parts, key=lambda p: (p.device.serial, p.part_number))
+        self.messages = [self.set64_for(part) for part in self.parts]
+        self.last = [None] * len(self.parts)
+
+    @classmethod
+    def supports(cls, canvas):
+        """Timelines are made of Set64 messages and so only work for tiles"""
+        return bool(canvas.parts) and all(part.device.cap.has_matrix for part in canvas.parts)
+
+    def set64_for(self, part):
+        return Set64(
+            x=0,
+            y=0,
+            length=1,
+            tile_index=part.part_number,
+            width=part.width,
+            duration=0,
+            ack_required=False,
+            res_required=False,
+            target=part.device.serial,
+        )
+
+    async def record(self):
+        """
+        Return a Timeline for our animation, or None if it didn't finish, loop
+        or reach it's num_seconds within ``max_frames`` frames.
+        """
+        state = self.state
+        animation = state.animation
+
+        # An animation with num_seconds only needs the frames for that long
+        needed = None
+        if animation.num_seconds:
+            needed = math.ceil(animation.num_seconds / animation.every)
+
+        timeline = Timeline(animation.every, [(p.device.serial, p.part_number) for p in self.parts])
+        seen = {}
+
+        try:
+            await state.process_event(AnimationEvent.Types.STARTED)
+
+            for i in range(min(self.max_frames, needed or self.max_frames)):
+                layer = await state.process_event(AnimationEvent.Types.TICK)
+                if layer:
+                    state.canvas = state.canvas.clone()
+                    state.canvas.msgs(layer, onto=state.canvas.points, duration=animation.duration)
+                timeline.frames.append(self.frame(state.canvas, animation))
+
+                position = animation.pre_render_position(state.state)
+                if position is not None:
+                    if position in seen:
+                        # The frames from here on are the frames after the one we saw it at
+                        timeline.loops = True
+                        timeline.loop_start = seen[position] + 1
+                        return timeline
+                    seen[position] = i
+
+                if i % 50 == 49:
+                    # Let everything else on the loop have a go
+                    await asyncio.sleep(0)
+        except Finish:
+            return timeline
+
+        if needed is not None and len(timeline) == needed:
+            return timeline
+
+        return None
+
+    def frame(self, canvas, animation):
+        frame = []
+        for i, (part, msg) in enumerate(zip(self.parts, self.messages)):
+            o = part.random_orientation if animation.random_orientations else part.orientation
+            msg.set_colors([canvas.points.get(point) for point in part.points], reorient_order(o, part.width, part.height))
+            msg.duration = animation.duration
+
+            payload = bytes(msg._bts[36:])
+            if payload != self.last[i]:
+                self.last[i] = payload
+                frame.append((i, payload))
+
+        return tuple(frame)
+
+
+class Player:
+    """
+    Makes the Set64 messages for each frame of a timeline.
+
+    Every ``keyframe_every`` frames we send every part, regardless of whether
+    it changed, so that devices catch up if any messages were lost.
+    """
+
+    def __init__(self, timeline, keyframe_every=None):
+        self.timeline = timeline
+        if keyframe_every is None:
+            keyframe_every = max(1, round(0.5 / timeline.every)) if timeline.every > 0 else 1
+        self.keyframe_every = keyframe_every
+
+        self.position = -1
+        self.played = 0
+        self.payloads = [None] * len(timeline.parts)
+        self.headers = [bytes(Set64(target=serial)._bts[:36]) for serial, _ in timeline.parts]
+
+    @property
+    def finished(self):
+        return not self.timeline.loops and self.position >= len(self.timeline) - 1
+
+    def play(self, index):
+        """
+        Return the messages for the frame at this index. If we skipped frames
+        to get here, then the changes from those frames are included.
+        """
+        frames = self.timeline.frames
+        if not frames:
+            return []
+
+        if index >= len(frames):
+            if self.timeline.loops:
+                start = self.timeline.loop_start
+                index = start + (index - start) % (len(frames) - start)
+            else:
+                index = len(frames) - 1
+
+        if index == self.position:
+            return []
+
+        if index < self.position:
+            # We looped back, and the first frame has every part
+            self.position = -1
+
+        changed = set()
+        for frame in frames[self.position + 1 : index + 1]:
+            for i, payload in frame:
+                self.payloads[i] = payload
+                changed.add(i)
+
+        self.position = index
+        self.played += 1
+        if self.played % self.keyframe_every == 0:
+            changed = range(len(self.payloads))
+
+        return [self.message(i) for i in sorted(changed) if self.payloads[i] is not None]
+
+    def message(self, i):
+        return Set64(bts=bytearray(self.headers[i] + self.payloads[i]))
+
+    def apply_to(self, canvas, randomize=False):
+        """Make the canvas show the last frame we played"""
+        for part in canvas.parts:
+            key = (part.device.serial, part.part_number)
+            if key not in self.timeline.parts:
+                continue
+
+            index = self.timeline.parts.index(key)
+            if self.payloads[index] is None:
+                continue
+
+            o = part.random_orientation if randomize else part.orientation
+            colors = [(c.hue, c.saturation, c.brightness, c.kelvin) for c in self.message(index).colors]
+            colors = reverse_orient(colors, o, part.width, part.height)
+            for point, color in zip(part.points, colors):
+                canvas[point] = color
@@ -5,6 +5,8 @@ from photons_control.colour import make_hsbk
 
 
 class ZeroColor:
+    fixed = True
+
     def __init__(self):
         self.color = None
 
@@ -13,6 +15,8 @@ class ZeroColor:
 
 
 class OneColor:
+    fixed = True
+
     def __init__(self, hue, saturation, brightness, kelvin):
         self.color = (hue, saturation, brightness, kelvin)
 
@@ -34,6 +38,11 @@ class OneColorRange:
     def __repr__(self):
         return str((self.hs, self.ss, self.bb, self.kk))
 
+    @property
+    def fixed(self):
+        """Whether we give the same color every time"""
+        return all(mn == mx for mn, mx in (self.hs, self.ss, self.bb, self.kk))
+
     @property
     def hue(self):
         h = self.hs
@@ -95,6 +104,10 @@ class ManyColor:
     def __repr__(self):
         return f"<ManyColor:{self.colors}>"
 
+    @property
+    def fixed(self):
+        return len(self.colors) == 1 and self.colors[0].fixed
+
     @property
     def color(self):
         return random.choice(self.colors).color
@@ -4,6 +4,7 @@ import uuid
 
 from delfick_project.norms import dictobj, sb
 
+from photons_canvas import PartLayer
 from photons_canvas import point_helpers as php
 from photons_canvas.animations import Animation, an_animation, options
 
@@ -163,14 +164,11 @@ class TileBallsState:
 
         self.balls = [ball for ball in self.balls if ball not in collided]
 
-        def layer(point, canvas):
-            color = by_point.get(point)
-            if color:
-                return color
+        def layer(part, canvas):
+            dimmed = canvas.dim_part(part, self.options.fade_amount)
+            return [by_point.get(point) or color for point, color in zip(part.points, dimmed)]
 
-            return canvas.dim(point, self.options.fade_amount)
-
-        return layer
+        return PartLayer(layer)
 
 
 @an_animation("balls", Options)
@@ -4,6 +4,7 @@ from collections import defaultdict
 
 from delfick_project.norms import dictobj, sb
 
+from photons_canvas import PartLayer
 from photons_canvas import point_helpers as php
 from photons_canvas.animations import Animation, an_animation
 
@@ -56,6 +57,12 @@ class Changer:
     def color(self, point, canvas, event, state):
         raise NotImplementedError()
 
+    def part_colors(self, part, canvas, event, state):
+        """
+        Return colors for every point in the part if they are all the same,
+        otherwise return None and we'll use ``key`` and ``color`` per point.
+        """
+
     def part(self, point, canvas):
         part = self.point_to_part.get(point)
         if part is None:
@@ -128,6 +135,9 @@ class Cycle(Changer):
     def color(self, point, canvas, event, state):
         return self.from_hue(self.i)
 
+    def part_colors(self, part, canvas, event, state):
+        return [self.from_hue(self.i)] * len(part.points)
+
 
 @changer("cycle_parts")
 class CycleParts(Changer):
@@ -155,6 +165,9 @@ class CycleParts(Changer):
     def color(self, point, canvas, event, state):
         return self.from_hue(state[self.part(point, canvas)][0])
 
+    def part_colors(self, part, canvas, event, state):
+        return [self.from_hue(state[part][0])] * len(part.points)
+
 
 @changer("wave")
 class Wave(Changer):
@@ -191,7 +204,7 @@ class Patches(Changer):
         count = 1
         (left_x, right_x), (top_y, bottom_y), (width, height) = event.canvas.bounds
         bounds = (left_x - self.size, right_x), (top_y, bottom_y - self.size), (width, height)
-        for point in php.Points.all_points(bounds):
+        for point in php.Points.all_points(bounds, cache=event.canvas.points_cache):
             col, row = point
             if col % self.size == 0 and row % self.size == 0:
                 self.i = (self.i + math.sin(count * self.i) + random.randrange(0, 360)) % 360
@@ -223,10 +236,16 @@ class Layer:
 
         return c
 
+    def part_layer(self, part, canvas):
+        colors = self.changer.part_colors(part, canvas, self.event, self.event.state["state"])
+        if colors is None:
+            colors = [self.layer(point, canvas) for point in part.points]
+        return colors
+
     def next_layer(self, changer, event):
         self.event = event
         changer.progress(event, event.state["state"])
-        return self.layer
+        return PartLayer(self.part_layer)
 
 
 @an_animation("color_cycle", Options)
@@ -2,7 +2,6 @@ import random
 
 from delfick_project.norms import dictobj
 
-from photons_canvas import point_helpers as php
 from photons_canvas.animations import Animation, Finish, an_animation, options
 
 
@@ -20,7 +19,7 @@ class State:
 
     def add_points(self, parts, canvas):
         for part in parts:
-            for point in php.Points.all_points(part.bounds):
+            for point in part.points:
                 if point not in self.changed:
                     self.start[point] = canvas[point]
                     self.remaining.add(point)
@@ -2,6 +2,7 @@ import random
 
 from delfick_project.norms import dictobj
 
+from photons_canvas import PartLayer
 from photons_canvas import point_helpers as php
 from photons_canvas.animations import Animation, an_animation, options
 from photons_canvas.animations.lines import LineOptions
@@ -90,9 +91,7 @@ class State:
 
         self.done.update(pixels)
 
-        def layer(point, canvas):
-            p1 = pixels.get(point)
-            p2 = canvas.points.get(point)
+        def color(point, p1, p2, dimmed):
             if not p1 and not p2:
                 return
             elif p1 and not p2:
@@ -101,15 +100,18 @@ class State:
                 if point not in self.done:
                     return p2
                 else:
-                    return canvas.dim(point, self.options.fade_amount)
+                    return dimmed
             else:
-                c = canvas.dim(point, self.options.fade_amount)
-                if not c:
+                if not dimmed:
                     return p1
 
-                return php.average_color([p1, c])
+                return php.average_color([p1, dimmed])
 
-        return layer
+        def layer(part, canvas):
+            dimmed = canvas.dim_part(part, self.options.fade_amount)
+            return [color(point, pixels.get(point), canvas[point], d) for point, d in zip(part.points, dimmed)]
+
+        return PartLayer(layer)
 
 
 @an_animation("falling", Options)
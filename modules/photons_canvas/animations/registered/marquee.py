@@ -61,6 +61,11 @@ class State:
     def add_iteration(self):
         self.iteration += 1
 
+    @property
+    def position(self):
+        """Everything that decides what the next frames look like"""
+        return (self.direction, self.left)
+
     @hp.memoized_property
     def color(self):
         return self.options.text_color.color
@@ -150,6 +155,16 @@ class MarqueeAnimation(Animation):
 
     make_state = State
 
+    @property
+    def pre_renderable(self):
+        # A random speed or color would be the same every time a recording is played
+        return self.options.speed.constant is not None and self.options.text_color.fixed
+
+    def pre_render_position(self, state):
+        if state is None or self.options.num_iterations > 0:
+            return None
+        return state.position
+
     async def process_event(self, event):
         if event.state is None:
             event.state = self.make_state(self.options)
@@ -70,6 +70,10 @@ class State(State):
 
         return Characters(self.nyan)
 
+    @property
+    def position(self):
+        return (*super().position, self.nyan, self.num)
+
     @property
     def next_layer(self):
         self.num += 1
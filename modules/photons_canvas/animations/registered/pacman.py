@@ -187,6 +187,11 @@ class State(State):
         del self.characters
         super().add_iteration()
 
+    @property
+    def position(self):
+        # Pacman changes on the next frame if we don't have characters
+        return (*super().position, self.pacman, self.num, hasattr(self, "_characters"))
+
     @property
     def next_layer(self):
         self.num += 1
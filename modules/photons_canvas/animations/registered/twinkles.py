@@ -2,6 +2,7 @@ import random
 
 from delfick_project.norms import dictobj
 
+from photons_canvas import PartLayer
 from photons_canvas import point_helpers as php
 from photons_canvas.animations import Animation, an_animation, options
 
@@ -42,7 +43,7 @@ class Points:
 
     def add_parts(self, parts):
         for part in parts:
-            points = php.Points.all_points(part.bounds)
+            points = part.points
             self.parts[part] = {p: self.dim_rate() for p in points}
 
     def layer(self, event, state):
@@ -54,13 +55,13 @@ class Points:
                     state.ensure_twinkles(ps)
                     del self.parts[part]
 
-        def layer(point, canvas):
-            for part in canvas.point_to_parts[point]:
-                if part in self.parts:
-                    info = self.parts[part]
-                    return canvas.dim(point, info[point])
+        def colors(part, canvas):
+            info = self.parts.get(part)
+            if info is None:
+                return [None] * len(part.points)
+            return [canvas.dim(point, info[point]) for point in part.points]
 
-        return layer
+        return colors
 
 
 class State:
@@ -86,7 +87,7 @@ class State:
         if add_now > len(remaining):
             add_now = from_remaining
 
-        for point in random.sample(remaining, add_now):
+        for point in random.sample(list(remaining), add_now):
             twinkle = Twinkle(
                 self.options.twinkles_color_range.color,
                 self.options.fade_in_speed(),
@@ -98,8 +99,7 @@ class State:
         self.ensure_twinkles(self.points.points)
         points_layer = self.points.layer(event, self)
 
-        def layer(point, canvas):
-            c = points_layer(point, canvas)
+        def color(point, c):
             if c is not None:
                 return c
 
@@ -111,7 +111,10 @@ class State:
 
             return php.Color.ZERO
 
-        return layer
+        def layer(part, canvas):
+            return [color(point, c) for point, c in zip(part.points, points_layer(part, canvas))]
+
+        return PartLayer(layer)
 
 
 @an_animation("twinkles", Options)
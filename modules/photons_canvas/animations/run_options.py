@@ -97,6 +97,49 @@ class TransitionOptions(dictobj.Spec):
     )
 
 
+class AdaptiveOptions(dictobj.Spec):
+    enabled = dictobj.Field(
+        sb.boolean,
+        default=False,
+        help="Whether to change how often animations tick based on how well we keep up",
+    )
+
+    min_every = dictobj.Field(sb.float_spec, default=0.04, help="The fastest we may tick, in seconds between ticks")
+
+    max_every = dictobj.Field(sb.float_spec, default=0.5, help="The slowest we may tick, in seconds between ticks")
+
+    check_every = dictobj.Field(
+        sb.integer_spec,
+        default=20,
+        help="The number of frames to look at before deciding whether to change how often we tick",
+    )
+
+    step = dictobj.Field(
+        sb.float_spec,
+        default=0.2,
+        help="How much to change the time between ticks by each time, as a fraction of that time",
+    )
+
+
+class PreRenderOptions(dictobj.Spec):
+    enabled = dictobj.Field(
+        sb.boolean,
+        default=False,
+        help="Whether to work out animations that support it before playing them",
+    )
+
+    max_frames = dictobj.Field(
+        sb.integer_spec,
+        default=2000,
+        help="The most frames to work out for an animation before we play it as normal instead",
+    )
+
+    cache_dir = dictobj.NullableField(
+        sb.string_spec,
+        help="A folder to save animations we have worked out so they don't need to be worked out again",
+    )
+
+
 class semaphore_spec(sb.Spec):
     def normalise_empty(self, meta):
         return asyncio.Semaphore()
@@ -119,6 +162,47 @@ class RunOptions(dictobj.Spec):
         help="Whether to return the tiles to how they were before the animation",
     )
 
+    array_canvas = dictobj.Field(
+        sb.boolean,
+        default=False,
+        help="""
+        Whether to store the colors for the animation in numpy arrays rather
+        than a dictionary of points.
+
+        This is faster for large numbers of tiles but requires numpy to be
+        installed.
+    """,
+    )
+
+    render_workers = dictobj.Field(
+        sb.integer_spec,
+        default=0,
+        help="""
+        The number of threads used to render animation frames.
+
+        If this is 0 (default) then frames are rendered on the event loop.
+        Each animation renders one frame at a time, so more than one thread
+        only helps when animations are not combined.
+    """,
+    )
+
+    adaptive = dictobj.Field(
+        AdaptiveOptions.FieldSpec,
+        help="""
+        Options for changing how often animations tick based on how long
+        frames take to render, how long acks take to come back and how many
+        frames are dropped
+    """,
+    )
+
+    pre_render = dictobj.Field(
+        PreRenderOptions.FieldSpec,
+        help="""
+        Options for working out animations before they are played, so that
+        playing them needs very little CPU
+    """,
+    )
+
     reinstate_duration = dictobj.Field(sb.float_spec, default=1, help="The duration used when reinstating state")
 
     noisy_network = dictobj.Field(
@@ -11,7 +11,16 @@ from photons_messages import LightMessages
 from photons_canvas import Canvas
 from photons_canvas.animations.infrastructure import cannons
 from photons_canvas.animations.infrastructure.finish import Finish
+from photons_canvas.animations.infrastructure.pacing import AdaptiveEvery
+from photons_canvas.animations.infrastructure.renderer import Renderer
 from photons_canvas.animations.infrastructure.state import State
+from photons_canvas.animations.infrastructure.timeline import (
+    Player,
+    Recorder,
+    TimelineCache,
+    key_for,
+    layout_for,
+)
 from photons_canvas.animations.run_options import make_run_options
 
 log = logging.getLogger("photons_canvas.animations.runner")
@@ -31,6 +40,8 @@ class AnimationRunner(hp.AsyncCMMixin):
         self.animations_ran = 0
         self.current_animation = None
 
+        self.cannon = None
+        self.pacer = None
         self.seen_serials = set()
         self.used_serials = set()
 
@@ -44,19 +55,49 @@ class AnimationRunner(hp.AsyncCMMixin):
         if "animations" in options:
             del options["animations"]
 
-        return {
+        info = {
             "started": self.started,
             "current_animation": current_animation,
             "animations_ran": self.animations_ran,
             "options": options,
         }
 
+        if self.renderer is not None:
+            info["renderer"] = self.renderer.info
+
+        if self.cannon is not None:
+            info["inflight"] = self.cannon.inflight
+
+        if self.pacer is not None:
+            info["adaptive"] = self.pacer.info
+
+        return info
+
+    @hp.memoized_property
+    def canvas_kls(self):
+        if self.run_options.array_canvas:
+            from photons_canvas.points.array_canvas import ArrayCanvas
+
+            return ArrayCanvas
+        return Canvas
+
+    @hp.memoized_property
+    def renderer(self):
+        if self.run_options.render_workers > 0:
+            return Renderer(workers=self.run_options.render_workers)
+
+    @hp.memoized_property
+    def timelines(self):
+        return TimelineCache(self.run_options.pre_render.cache_dir)
+
     async def start(self):
         return self
 
     async def finish(self, exc_typ=None, exc=None, tb=None):
         if hasattr(self, "final_future"):
             self.final_future.cancel()
+        if self.renderer is not None:
+            self.renderer.shutdown()
 
     def make_cannon(self):
         if not self.run_options.noisy_network:
@@ -69,29 +110,32 @@ class AnimationRunner(hp.AsyncCMMixin):
             return cannons.NoisyNetworkCannon(self.sender, sem)
 
     async def run(self):
-        cannon = self.make_cannon()
+        cannon = self.cannon = self.make_cannon()
         self.started = time.time()
 
         animations = self.run_options.animations_iter
-        self.combined_state = State(self.final_future)
+        self.combined_state = State(self.final_future, canvas_kls=self.canvas_kls, renderer=self.renderer)
 
-        async with self.reinstate(), hp.TaskHolder(self.final_future, name="AnimationRunner::run[task_holder]") as ts:
-            self.transfer_error(ts, ts.add(self.animate(ts, cannon, self.combined_state, animations)))
-
-            async for collected in self.collect_parts(ts):
-                try:
-                    if self.run_options.combined:
-                        await self.combined_state.add_collected(collected)
-                    else:
-                        state = State(self.final_future)
-                        await state.add_collected(collected)
-                        self.transfer_error(ts, ts.add(self.animate(ts, cannon, state, animations)))
-                except asyncio.CancelledError:
-                    raise
-                except Finish:
-                    pass
-                except Exception as error:
-                    log.exception(hp.lc("Failed to add device", error=error))
+        try:
+            async with self.reinstate(), hp.TaskHolder(self.final_future, name="AnimationRunner::run[task_holder]") as ts:
+                self.transfer_error(ts, ts.add(self.animate(ts, cannon, self.combined_state, animations)))
+
+                async for collected in self.collect_parts(ts):
+                    try:
+                        if self.run_options.combined:
+                            await self.combined_state.add_collected(collected)
+                        else:
+                            state = State(self.final_future, canvas_kls=self.canvas_kls, renderer=self.renderer)
+                            await state.add_collected(collected)
+                            self.transfer_error(ts, ts.add(self.animate(ts, cannon, state, animations)))
+                    except asyncio.CancelledError:
+                        raise
+                    except Finish:
+                        pass
+                    except Exception as error:
+                        log.exception(hp.lc("Failed to add device", error=error))
+        finally:
+            cannon.release()
 
     def transfer_error(self, ts, t):
         def process(res, fut):
@@ -125,13 +169,10 @@ class AnimationRunner(hp.AsyncCMMixin):
                 try:
                     await state.set_animation(animation, background)
 
-                    async for messages in state.messages():
-                        by_serial = defaultdict(list)
-                        for msg in messages:
-                            by_serial[msg.serial].append(msg)
-
-                        for serial, msgs in by_serial.items():
-                            ts.add(cannon.fire(ts, serial, msgs))
+                    if await self.should_pre_render(state, animation, animation_fut):
+                        await self.play_timeline(ts, cannon, state, animation, animation_fut)
+                    else:
+                        await self.play(ts, cannon, state, animation)
                 except asyncio.CancelledError:
                     raise
                 except Finish:
@@ -139,6 +180,120 @@ class AnimationRunner(hp.AsyncCMMixin):
                 except Exception:
                     log.exception("Unexpected error running animation")
 
+    async def play(self, ts, cannon, state, animation):
+        pacer = None
+        if self.run_options.adaptive.enabled:
+            pacer = self.pacer = AdaptiveEvery(animation, self.run_options.adaptive, cannon=cannon)
+
+        async for messages in state.messages():
+            if pacer is not None:
+                pacer.frame()
+            self.send(ts, cannon, animation, messages)
+
+    async def should_pre_render(self, state, animation, animation_fut):
+        if not self.run_options.pre_render.enabled or not animation.pre_renderable:
+            return False
+
+        # We can only record once we know what tiles we have
+        async with hp.tick(
+            animation.every,
+            final_future=animation_fut,
+            min_wait=False,
+            name="AnimationRunner::should_pre_render[tick]",
+        ) as ticks:
+            async for _ in ticks:
+                if state:
+                    return Recorder.supports(state.canvas)
+
+        return False
+
+    async def play_timeline(self, ts, cannon, state, animation, animation_fut):
+        """
+        Play this animation from a recording, making the recording first if we
+        don't already have one for these tiles.
+
+        If we find more devices while the recording plays then we change to a
+        recording for the new layout. If the animation can't be recorded then
+        we play it as normal instead.
+        """
+        layout, timeline = await self.timeline_for(state, animation)
+        if timeline is None:
+            await self.play(ts, cannon, state, animation)
+            return
+
+        player = Player(timeline)
+        started = time.time()
+
+        async with hp.tick(
+            timeline.every,
+            final_future=animation_fut,
+            max_time=animation.num_seconds,
+            min_wait=False,
+            pauser=animation.pauser,
+            name="AnimationRunner::play_timeline[tick]",
+        ) as ticks:
+            async for _ in ticks:
+                if layout_for(state.canvas) != layout:
+                    layout, timeline = await self.timeline_for(state, animation)
+                    if timeline is None:
+                        break
+
+                    player = Player(timeline)
+                    started = time.time()
+
+                # Work out the frame from the time so we keep up if ticks are late
+                now = time.time()
+                messages = player.play(round((now - started) / timeline.every))
+                animation.frame_stats.rendered(time.time() - now)
+
+                self.send(ts, cannon, animation, messages)
+                if player.finished:
+                    break
+
+        if timeline is None:
+            await self.play(ts, cannon, state, animation)
+        else:
+            player.apply_to(state.canvas, randomize=animation.random_orientations)
+
+    async def timeline_for(self, state, animation):
+        """
+        Return ``(layout, timeline)`` for this animation on the tiles we have
+        now, where timeline is None if this animation can't be recorded.
+        """
+        async with state.lock:
+            layout = layout_for(state.canvas)
+            key = key_for(animation, layout)
+
+            timeline = self.timelines.get(key)
+            if timeline is None:
+                canvas = state.canvas
+                await state.restart_animation()
+                timeline = await Recorder(state, max_frames=self.run_options.pre_render.max_frames).record()
+
+                # Recording moves the animation along, so start again in case we play it as normal
+                state.canvas = canvas
+                await state.restart_animation()
+
+                if timeline is not None:
+                    self.timelines.set(key, timeline)
+
+        return layout, timeline
+
+    def send(self, ts, cannon, animation, messages):
+        by_serial = defaultdict(list)
+        for msg in messages:
+            by_serial[msg.serial].append(msg)
+
+        for serial, msgs in by_serial.items():
+            ts.add(self.fire(ts, cannon, animation.frame_stats, serial, msgs))
+
+    async def fire(self, ts, cannon, stats, serial, msgs):
+        start = time.time()
+        if await cannon.fire(ts, serial, msgs):
+            stats.sent(time.time() - start)
+        else:
+            stats.dropped_by_semaphore += 1
+
     async def collect_parts(self, ts):
         async with hp.tick(
             self.run_options.rediscover_every,
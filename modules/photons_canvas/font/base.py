@@ -34,7 +34,7 @@ class Character:
             (self.width, self.height),
         )
 
-        for point, pixel in zip(php.Points.all_points(bounds), self.pixels):
+        for point, pixel in zip(php.Points.all_points(bounds, cache=False), self.pixels):
             if pixel == "#":
                 pixel = fill_color
             elif pixel in self.colors:
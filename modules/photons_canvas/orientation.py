@@ -1,5 +1,7 @@
 from enum import Enum
 
+ReorientOrders = {}
+
 
 class Orientation(Enum):
     """
@@ -14,34 +16,108 @@ class Orientation(Enum):
     FaceDown = 6
 
 
-def reorient(colors, orientation):
+def reorient(colors, orientation, width=8, height=None):
     """
     Return the colors in the different order given our orientation
+
+    The colors are a ``width`` by ``height`` grid in rows of ``width``. If
+    height isn't given then it is worked out from the number of colors. Note
+    that when the device is rotated the result is in rows of ``height``.
     """
-    if orientation in (Orientation.RightSideUp, Orientation.FaceUp, Orientation.FaceDown):
+    if height is None:
+        height = len(colors) // width
+    return apply_order(colors, reorient_order(orientation, width, height))
+
+
+def reverse_orient(colors, orientation, width=8, height=None):
+    """
+    Undo :func:`reorient` for colors that are a ``width`` by ``height`` grid in
+    the order the device has them.
+    """
+    if height is None:
+        height = len(colors) // width
+    return apply_order(colors, reverse_orient_order(orientation, width, height))
+
+
+def apply_order(colors, order):
+    """
+    Return ``colors`` in the order given by ``order``. Colors past the end of
+    the order are left where they are.
+
+    This works on a list of colors or a numpy array with a row per color.
+    """
+    if order is None:
         return colors
 
-    final = []
-    for i, v in enumerate(colors):
-        final.append((rotated_index(i, orientation), v))
-    return [v for _, v in sorted(final)]
+    if hasattr(colors, "take"):
+        if len(colors) == len(order):
+            return colors.take(order, axis=0)
+        return colors.take(order + tuple(range(len(order), len(colors))), axis=0)
+
+    ordered = [colors[i] for i in order]
+    if len(colors) > len(order):
+        ordered.extend(colors[len(order) :])
+    return ordered
+
+
+def reorient_order(orientation, width=8, height=8):
+    """
+    Return a tuple of indexes such that ``[colors[i] for i in order]`` is the
+    colors reoriented for this orientation, or None if the order doesn't change.
+
+    These are worked out once for each orientation and size of the device.
+    """
+    if orientation in (Orientation.RightSideUp, Orientation.FaceUp, Orientation.FaceDown):
+        return None
+
+    key = (orientation, width, height)
+    order = ReorientOrders.get(key)
+    if order is None:
+        found = [0] * (width * height)
+        for i in range(width * height):
+            found[rotated_index(i, orientation, width, height)] = i
+        order = ReorientOrders[key] = tuple(found)
+    return order
+
+
+def reverse_orient_order(orientation, width=8, height=8):
+    """
+    Return the order that undoes ``reorient_order(orientation, width, height)``
+    """
+    order = reorient_order(orientation, width, height)
+    if order is None:
+        return None
+
+    key = (orientation, width, height, "reverse")
+    reverse = ReorientOrders.get(key)
+    if reverse is None:
+        found = [0] * len(order)
+        for i, j in enumerate(order):
+            found[j] = i
+        reverse = ReorientOrders[key] = tuple(found)
+    return reverse
 
 
-def rotated_index(i, orientation):
+def rotated_index(i, orientation, width=8, height=8):
     """
     Give new index for i given our orientation
+
+    Where the index is for a grid that is ``width`` by ``height`` in rows of
+    ``width``. When the device is rotated left or right the new index is in a
+    grid that is ``height`` wide.
     """
-    x = i % 8
-    y = i // 8
+    x, y = i % width, i // width
+
+    if orientation is Orientation.RotatedLeft:
+        return (height - 1 - y) + (x * height)
+
+    elif orientation is Orientation.RotatedRight:
+        return y + ((width - 1 - x) * height)
 
     if orientation is Orientation.UpsideDown:
-        x, y = 7 - x, 7 - y
-    elif orientation is Orientation.RotatedLeft:
-        x, y = 7 - y, x
-    elif orientation is orientation.RotatedRight:
-        x, y = y, 7 - x
+        x, y = width - 1 - x, height - 1 - y
 
-    return x + (y * 8)
+    return x + (y * width)
 
 
 def nearest_orientation(x, y, z):
@@ -0,0 +1,434 @@
+"""
+A Canvas that keeps colors in contiguous numpy arrays rather than a dictionary
+of tuples.
+
+Every point on the canvas is given an offset into a ``float32`` array of
+``(hue, saturation, brightness)`` and a ``uint16`` array of kelvin. The points
+for each part are given consecutive offsets when the part is added so the
+colors for a part can be read and written as a single slice.
+
+Cloning the canvas only copies the arrays. The mapping of points to offsets
+and parts is shared between clones until one of them needs to change it.
+
+Note that colors read back from this canvas have ``float32`` precision and an
+integer kelvin.
+"""
+
+from collections import defaultdict
+from collections.abc import MutableMapping
+from textwrap import dedent
+
+from delfick_project.norms import sb
+from photons_app.errors import PhotonsAppError
+
+from photons_canvas.points import helpers as php
+from photons_canvas.points.canvas import Canvas, PartLayer
+
+try:
+    import numpy as np
+except ImportError:
+    raise PhotonsAppError(
+        dedent(
+            """
+        The ArrayCanvas only works if you have numpy installed in your environment
+
+        This can be done with::
+
+            > python -m pip install "lifx-photons-core[canvas-arrays]"
+    """
+        )
+    )
+
+ABSENT = 0
+FILLED = 1
+EMPTY = 2
+
+
+def color_tuple(color):
+    if color is None or isinstance(color, tuple):
+        return color
+    return color.hue, color.saturation, color.brightness, color.kelvin
+
+
+class ArrayPoints(MutableMapping):
+    """
+    A dictionary like view of the points on an ArrayCanvas.
+
+    This exists so code that uses ``canvas.points`` works the same regardless
+    of which kind of canvas it has.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def __getitem__(self, point):
+        if point not in self.canvas:
+            raise KeyError(point)
+        return self.canvas[point]
+
+    def __setitem__(self, point, color):
+        self.canvas[point] = color
+
+    def __delitem__(self, point):
+        if point not in self.canvas:
+            raise KeyError(point)
+        del self.canvas[point]
+
+    def __iter__(self):
+        state = self.canvas._state
+        for point, offset in list(self.canvas._index.items()):
+            if state[offset] != ABSENT:
+                yield point
+
+    def __len__(self):
+        return int(np.count_nonzero(self.canvas._state[: self.canvas._used]))
+
+    def __repr__(self):
+        return f"<ArrayPoints {dict(self.items())}>"
+
+
+class Layout:
+    """
+    The mapping of points to offsets and the parts and devices for each point.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.part_offsets = {}
+        self.point_to_parts = defaultdict(set)
+        self.point_to_devices = defaultdict(set)
+
+    def clone(self):
+        new = self.__class__()
+        new.index.update(self.index)
+        new.part_offsets.update(self.part_offsets)
+        for point, parts in self.point_to_parts.items():
+            new.point_to_parts[point] = set(parts)
+        for point, devices in self.point_to_devices.items():
+            new.point_to_devices[point] = set(devices)
+        return new
+
+
+class ArrayCanvas(Canvas):
+    """
+    A drop in replacement for :class:`photons_canvas.Canvas` that stores
+    colors in numpy arrays.
+
+    On top of the normal Canvas api it has ``colors_for(part)``,
+    ``set_colors(part, colors)``, ``fill(color, part=None)`` and
+    ``adjust_all(...)`` for working with many points at once.
+    """
+
+    def __init__(self, capacity=64, points_cache=None):
+        self._parts = {}
+        self._devices = {}
+        self.points_cache = php.PointsCache(256) if points_cache is None else points_cache
+
+        self._used = 0
+        self._layout = Layout()
+        self._layout_shared = False
+
+        self._hsb = np.zeros((capacity, 3), dtype=np.float32)
+        self._kelvin = np.zeros(capacity, dtype=np.uint16)
+        self._state = np.zeros(capacity, dtype=np.uint8)
+
+        self.points = ArrayPoints(self)
+        self._update_bounds(())
+
+    @property
+    def _index(self):
+        return self._layout.index
+
+    @property
+    def point_to_parts(self):
+        return self._layout.point_to_parts
+
+    @property
+    def point_to_devices(self):
+        return self._layout.point_to_devices
+
+    @property
+    def hsb(self):
+        """A ``(n, 3)`` float32 array of hue, saturation and brightness"""
+        return self._hsb[: self._used]
+
+    @property
+    def kelvin(self):
+        """A ``(n,)`` uint16 array of kelvin"""
+        return self._kelvin[: self._used]
+
+    def __contains__(self, point):
+        offset = self._index.get(point)
+        return offset is not None and self._state[offset] != ABSENT
+
+    def __getitem__(self, point):
+        offset = self._index.get(point)
+        if offset is None or self._state[offset] != FILLED:
+            return None
+        h, s, b = self._hsb[offset].tolist()
+        return h, s, b, int(self._kelvin[offset])
+
+    def __setitem__(self, point, color):
+        offset = self._index.get(point)
+        contained = offset is not None and self._state[offset] != ABSENT
+
+        if offset is None:
+            offset = self._allocate([point])[0]
+
+        self._write(offset, color)
+
+        if not contained:
+            self._update_bounds([point])
+
+    def __delitem__(self, point):
+        if point not in self:
+            return
+
+        self._state[self._index[point]] = ABSENT
+        self._update_bounds({})
+        self._update_bounds([p.bounds for p in self._parts] + list(self.points))
+
+    def __bool__(self):
+        return bool(self._parts) or bool(self._state[: self._used].any())
+
+    def __call__(self, point, canvas):
+        return self[point]
+
+    def clone(self):
+        new = self.__class__.__new__(self.__class__)
+        new._parts = dict(self._parts)
+        new._devices = dict(self._devices)
+        new.points_cache = self.points_cache
+
+        new._used = self._used
+        new._layout = self._layout
+        new._layout_shared = self._layout_shared = True
+
+        new._hsb = self._hsb.copy()
+        new._kelvin = self._kelvin.copy()
+        new._state = self._state.copy()
+
+        new.points = ArrayPoints(new)
+        new._update_bounds(())
+        if self.width is not None:
+            new._update_bounds([self.bounds])
+
+        return new
+
+    def colors_for(self, part):
+        """Return a list of colors for the points in this part"""
+        offsets = self._part_offsets(part)
+        state = self._state[offsets].tolist()
+        hsb = self._hsb[offsets].tolist()
+        kelvin = self._kelvin[offsets].tolist()
+        return [(h, s, b, k) if st == FILLED else None for st, (h, s, b), k in zip(state, hsb, kelvin)]
+
+    def set_colors(self, part, colors):
+        """
+        Set the colors for the points in this part.
+
+        ``colors`` is either a list of colors with one for each point, or a
+        ``(n, 4)`` array of hue, saturation, brightness and kelvin.
+        """
+        offsets = self._part_offsets(part)
+
+        if isinstance(colors, np.ndarray):
+            self._hsb[offsets] = colors[:, :3]
+            self._kelvin[offsets] = colors[:, 3]
+            self._state[offsets] = FILLED
+            return
+
+        if isinstance(offsets, slice):
+            offsets = range(self._used)[offsets]
+        else:
+            offsets = offsets.tolist()
+
+        for offset, color in zip(offsets, colors):
+            self._write(offset, color)
+
+    def fill(self, color, part=None):
+        """Set all the points, or all the points in a part, to this color"""
+        offsets = slice(0, self._used) if part is None else self._part_offsets(part)
+        if color is None:
+            self._state[offsets] = EMPTY
+            return
+
+        h, s, b, k = color_tuple(color)
+        self._hsb[offsets] = (h, s, b)
+        self._kelvin[offsets] = int(k)
+        self._state[offsets] = FILLED
+
+    def adjust_all(
+        self,
+        hue_change=None,
+        saturation_change=None,
+        brightness_change=None,
+        kelvin_change=None,
+    ):
+        """
+        Change every filled point on the canvas in the same way as
+        :meth:`photons_canvas.point_helpers.Color.adjust` changes one color
+        """
+        filled = self._state[: self._used] == FILLED
+        hsb = self.hsb
+
+        for i, change, top in (
+            (0, hue_change, 360),
+            (1, saturation_change, 1),
+            (2, brightness_change, 1),
+        ):
+            if change is None:
+                continue
+            if isinstance(change, tuple):
+                hsb[filled, i] = change[0]
+            elif change:
+                hsb[filled, i] += change
+            if change:
+                np.clip(hsb[:, i], 0, top, out=hsb[:, i])
+
+        if kelvin_change is not None:
+            kelvin = self.kelvin
+            if isinstance(kelvin_change, tuple):
+                values = np.full(int(filled.sum()), kelvin_change[0], dtype=np.float64)
+            else:
+                values = kelvin[filled].astype(np.float64) + (kelvin_change or 0)
+            kelvin[filled] = np.clip(values, 0, 0xFFFF).astype(np.uint16)
+
+    def dim_part(self, part, change):
+        offsets = self._part_offsets(part)
+        hsb = self._hsb[offsets]
+
+        brightness = hsb[:, 2] - change
+        alive = (self._state[offsets] == FILLED) & (hsb[:, 2] != 0) & (brightness > 0)
+        np.minimum(brightness, 1, out=brightness)
+
+        return [
+            (h, s, b, k) if a else None
+            for a, (h, s), b, k in zip(
+                alive.tolist(),
+                hsb[:, :2].tolist(),
+                brightness.tolist(),
+                self._kelvin[offsets].tolist(),
+            )
+        ]
+
+    def msgs(self, layer, acks=False, duration=1, randomize=False, onto=None):
+        clone = isinstance(layer, ArrayCanvas) and layer._layout is self._layout
+        if not clone and not isinstance(layer, PartLayer):
+            return super().msgs(layer, acks=acks, duration=duration, randomize=randomize, onto=onto)
+
+        msgs = []
+        for part in self._parts:
+            if clone:
+                # The layer is a clone of this canvas, so we can copy colors by offset
+                colors = cs = layer.colors_for(part)
+            else:
+                # Part layers may give us an array of colors for the part
+                colors = cs = layer.colors(part, self)
+                if isinstance(cs, np.ndarray):
+                    cs = [tuple(c) for c in cs.tolist()]
+
+            if onto is not None:
+                if isinstance(onto, ArrayPoints) and onto.canvas._layout is self._layout:
+                    if clone:
+                        offsets = self._part_offsets(part)
+                        onto.canvas._hsb[offsets] = layer._hsb[offsets]
+                        onto.canvas._kelvin[offsets] = layer._kelvin[offsets]
+                        onto.canvas._state[offsets] = np.where(layer._state[offsets] == FILLED, FILLED, EMPTY)
+                    else:
+                        onto.canvas.set_colors(part, colors)
+                else:
+                    for point, c in zip(part.points, cs):
+                        onto[point] = c
+
+            msgs.extend(part.msgs(cs, acks=acks, duration=duration, randomize=randomize, force=False))
+
+        return msgs
+
+    def add_parts(self, *parts, with_colors=False, zero_color=sb.NotSpecified):
+        self._own_layout()
+
+        for part in parts:
+            colors = None
+
+            if isinstance(part, tuple):
+                part, colors = part
+
+            if not colors and with_colors and part.colors:
+                colors = part.colors
+
+            if colors is None and zero_color is not sb.NotSpecified:
+                colors = [zero_color] * php.Points.count_points(part.bounds)
+
+            self._parts[part] = True
+            self._devices[part.device] = True
+
+            points = part.points
+            self._allocate([point for point in points if point not in self._index])
+
+            if colors:
+                for point, color in zip(part.points, colors):
+                    self[point] = color
+
+            for point in points:
+                self.point_to_parts[point].add(part)
+                self.point_to_devices[point].add(part.device)
+
+        self._update_bounds(self.parts)
+
+    def _part_offsets(self, part):
+        key = (part, part.bounds)
+        offsets = self._layout.part_offsets.get(key)
+        if offsets is None:
+            points = part.points
+            missing = [point for point in points if point not in self._index]
+            if missing:
+                self._allocate(missing)
+
+            found = [self._index[point] for point in points]
+            if found and found == list(range(found[0], found[0] + len(found))):
+                offsets = slice(found[0], found[0] + len(found))
+            else:
+                offsets = np.array(found, dtype=np.intp)
+
+            self._layout.part_offsets[key] = offsets
+        return offsets
+
+    def _own_layout(self):
+        if self._layout_shared:
+            self._layout = self._layout.clone()
+            self._layout_shared = False
+
+    def _allocate(self, points):
+        if not points:
+            return []
+
+        self._own_layout()
+
+        start = self._used
+        needed = start + len(points)
+        if needed > len(self._state):
+            capacity = max(needed, len(self._state) * 2)
+            self._hsb = np.resize(self._hsb, (capacity, 3))
+            self._kelvin = np.resize(self._kelvin, capacity)
+            self._state = np.resize(self._state, capacity)
+            self._hsb[start:] = 0
+            self._kelvin[start:] = 0
+            self._state[start:] = ABSENT
+
+        for i, point in enumerate(points):
+            self._index[point] = start + i
+        self._used = needed
+
+        return list(range(start, needed))
+
+    def _write(self, offset, color):
+        color = color_tuple(color)
+        if color is None:
+            self._state[offset] = EMPTY
+            return
+
+        h, s, b, k = color
+        self._hsb[offset] = (h, s, b)
+        self._kelvin[offset] = int(k)
+        self._state[offset] = FILLED
@@ -5,11 +5,44 @@ from delfick_project.norms import sb
 from photons_canvas.points import helpers as php
 
 
+class PartLayer:
+    """
+    A layer that provides colors for a whole part at a time rather than for
+    one point at a time.
+
+    It wraps a ``func(part, canvas)`` that returns a list of colors in the
+    same order as ``part.points``. ``Canvas.msgs`` will call this once per
+    part instead of calling the layer for every point. When the canvas is an
+    ``ArrayCanvas`` the function may instead return a ``(n, 4)`` numpy array.
+
+    It may also be called like a normal ``layer(point, canvas)`` for code
+    that doesn't know about part layers, in which case the colors for each
+    part are only determined once.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.by_part = {}
+
+    def colors(self, part, canvas):
+        return self.func(part, canvas)
+
+    def __call__(self, point, canvas):
+        for part in canvas.point_to_parts.get(point, ()):
+            colors = self.by_part.get(part)
+            if colors is None:
+                colors = self.by_part[part] = dict(zip(part.points, self.colors(part, canvas)))
+            return colors.get(point)
+
+
 class Canvas:
-    def __init__(self):
+    def __init__(self, points_cache=None):
         self._parts = {}
         self._devices = {}
 
+        # Shared with clones of this canvas
+        self.points_cache = php.PointsCache(256) if points_cache is None else points_cache
+
         self.points = {}
         self._update_bounds(self.points)
 
@@ -56,7 +89,7 @@ class Canvas:
         return (self.left, self.right), (self.top, self.bottom), (self.width, self.height)
 
     def clone(self):
-        new = self.__class__()
+        new = self.__class__(points_cache=self.points_cache)
         new._parts.update(self._parts)
         new._devices.update(self._devices)
         new.points.update(self.points)
@@ -110,6 +143,10 @@ class Canvas:
 
         return current[0], current[1], b, current[3]
 
+    def dim_part(self, part, change):
+        """Return a list of dimmed colors for all the points in this part"""
+        return [self.dim(point, change) for point in part.points]
+
     def adjust(
         self,
         point,
@@ -141,14 +178,21 @@ class Canvas:
         msgs = []
 
         for part in self._parts:
-            cs = []
-
-            for point in php.Points.all_points(part.bounds):
-                c = layer(point, self)
-                cs.append(c)
+            if isinstance(layer, PartLayer):
+                cs = layer.colors(part, self)
 
                 if onto is not None:
-                    onto[point] = c
+                    for point, c in zip(part.points, cs):
+                        onto[point] = c
+            else:
+                cs = []
+
+                for point in part.points:
+                    c = layer(point, self)
+                    cs.append(c)
+
+                    if onto is not None:
+                        onto[point] = c
 
             for msg in part.msgs(cs, acks=acks, duration=duration, randomize=randomize, force=False):
                 msgs.append(msg)
@@ -174,7 +218,7 @@ class Canvas:
                 for point, color in zip(part.points, colors):
                     self[point] = color
 
-            for point in php.Points.all_points(part.bounds):
+            for point in part.points:
                 self.point_to_parts[point].add(part)
                 self.point_to_devices[point].add(part.device)
 
@@ -1,16 +1,39 @@
-import itertools
 import random
 import time
 
 from photons_messages import LightMessages
 
-from photons_canvas.orientation import Orientation, reorient, reverse_orientation
+from photons_canvas.orientation import Orientation, reorient, reorient_order, reverse_orient
 from photons_canvas.points import helpers as php
 from photons_canvas.points.simple_messages import MultizoneMessagesMaker, Set64
 
 NO_MESSAGES = ()
 
 
+def changed_span(colors, previous):
+    """
+    Return ``(start, end)`` such that ``colors[start:end]`` covers every color
+    that is different from previous, or None if nothing changed.
+    """
+    if len(colors) != len(previous):
+        return 0, max(len(colors), len(previous))
+
+    start = None
+    for i, (c1, c2) in enumerate(zip(colors, previous)):
+        if c1 != c2:
+            start = i
+            break
+
+    if start is None:
+        return None
+
+    end = len(colors)
+    while end > start and colors[end - 1] == previous[end - 1]:
+        end -= 1
+
+    return start, end
+
+
 class Part:
     def __init__(
         self,
@@ -38,6 +61,7 @@ class Part:
         self._hash = hash(self._key)
 
         self.last_msgs = []
+        self.last_msgs_partial = False
 
         self._set_64 = Set64(
             x=0,
@@ -52,6 +76,10 @@ class Part:
             target=self.device.serial,
         )
 
+        # A Set64 we encode frames into. We only hand out copies of it, so
+        # whatever the sender does to a message doesn't carry over to the next
+        self._encoder = None
+
         real_part = self.clone() if real_part is None else real_part
         self.real_part = real_part
         self.next_force_send = time.time() - 1
@@ -116,6 +144,7 @@ class Part:
         )
 
     def update(self, user_x, user_y, width, height):
+        self._points = None
         self.width = width
         self.height = height
         self.user_x = user_x
@@ -136,24 +165,36 @@ class Part:
 
     @property
     def points(self):
-        return php.Points.all_points(self.bounds)
+        if self._points is None:
+            left, right, top, bottom = self.left, self.right, self.top, self.bottom
+            self._points = php.Grid(range(left, right), range(top, bottom, -1))
+        return self._points
 
     def reverse_orient(self, colors):
-        o = reverse_orientation(self.orientation)
-        return reorient(colors, o)
+        return reverse_orient(colors, self.orientation, self.width, self.height)
 
     def reorient(self, colors, *, randomize=False):
         o = self.orientation
         if randomize:
             o = self.random_orientation
 
-        return reorient(colors, o)
+        return reorient(colors, o, self.width, self.height)
 
     def msgs(self, colors, *, acks=False, duration=1, randomize=False, force=True):
+        """
+        Return the messages needed to make the device show these colors.
+
+        We only send what has changed since the last colors, except every half
+        a second where we send everything so that the device catches up if
+        any messages were lost.
+        """
+        full = True
         forced = False
+        previous = self.colors
+
         if time.time() > self.next_force_send:
-            if self.colors is not None:
-                diff = any(c1 != c2 for c1, c2 in itertools.zip_longest(colors, self.colors))
+            if previous is not None:
+                diff = changed_span(colors, previous) is not None
                 if not diff:
                     diff = True
                     forced = True
@@ -161,12 +202,13 @@ class Part:
                 diff = True
                 forced = True
 
-        elif self.colors is None or force:
+        elif previous is None or force:
             diff = True
             forced = True
 
         else:
-            diff = any(c1 != c2 for c1, c2 in itertools.zip_longest(colors, self.colors))
+            diff = changed_span(colors, previous) is not None
+            full = False
 
         self.colors = colors
 
@@ -176,27 +218,56 @@ class Part:
         if not diff:
             return NO_MESSAGES
 
-        if (diff and not forced) or not self.last_msgs:
+        if not full:
+            self.last_msgs = self._changed_msgs(colors, previous, acks=acks, duration=duration, randomize=randomize)
+        elif (diff and not forced) or not self.last_msgs or self.last_msgs_partial:
             self.last_msgs = self._msgs(colors, acks=acks, duration=duration, randomize=randomize)
+            self.last_msgs_partial = False
 
         return self.last_msgs
 
+    def _changed_msgs(self, colors, previous, acks=False, duration=1, randomize=False):
+        """
+        Return messages for only the colors that are different from previous.
+
+        Only strips can be given part of their colors. A Set64 always carries
+        64 colors, so tiles get the whole frame.
+        """
+        if self.device.cap.has_multizone and not self.device.cap.has_matrix:
+            span = changed_span(colors, previous)
+            if span is not None and span != (0, len(colors)):
+                start, end = span
+                self.last_msgs_partial = True
+                return tuple(
+                    MultizoneMessagesMaker(
+                        self.device.serial,
+                        self.device.cap,
+                        colors[start:end],
+                        duration=duration,
+                        zone_index=start,
+                    ).msgs
+                )
+
+        self.last_msgs_partial = False
+        return self._msgs(colors, acks=acks, duration=duration, randomize=randomize)
+
     def _msgs(self, colors, acks=False, duration=1, randomize=False):
         if self.device.cap.has_matrix:
-            colors = [c if c is not None else None for c in self.reorient(colors, randomize=randomize)]
+            if self._encoder is None:
+                self._encoder = self._set_64.clone()
+
+            o = self.random_orientation if randomize else self.orientation
+            self._encoder.set_colors(colors, reorient_order(o, self.width, self.height))
+            self._encoder.duration = duration
 
-            kwargs = {"colors": colors}
-            if duration != 0:
-                kwargs["duration"] = duration
+            msg = self._encoder.clone()
             if acks:
-                kwargs["acks"] = acks
+                msg.acks = acks
 
-            msg = self._set_64.clone()
-            msg.update(kwargs)
             return (msg,)
 
         elif self.device.cap.has_multizone:
-            return MultizoneMessagesMaker(self.device.serial, self.device.cap, colors, duration=duration).msgs
+            return tuple(MultizoneMessagesMaker(self.device.serial, self.device.cap, colors, duration=duration).msgs)
 
         elif colors:
             if isinstance(colors[0], tuple):
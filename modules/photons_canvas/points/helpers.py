@@ -1,11 +1,8 @@
 import math
-from collections import defaultdict
-from functools import wraps
+from collections.abc import Sequence
 
 from lru import LRU
 
-BoundCache = defaultdict(lambda: LRU(3000))
-
 
 class Color:
     ZERO = (0, 0, 0, 0)
@@ -141,88 +138,189 @@ def average_color(colors):
     return (hue, saturation, brightness, kelvin)
 
 
-def _points_bound_cache(func):
-    name = func.__name__
+class PointsCache:
+    """
+    A bounded cache of the point structures made by :class:`Points`, that
+    counts how often it could be used.
+
+    Each canvas has its own, so canvases with many different bounds don't push
+    out the entries of every other canvas.
+    """
+
+    def __init__(self, size=3000):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.cache = LRU(size)
+
+    def __len__(self):
+        return len(self.cache)
+
+    @property
+    def info(self):
+        return {"size": self.size, "entries": len(self.cache), "hits": self.hits, "misses": self.misses}
+
+    def get(self, key, make):
+        found = self.cache.get(key)
+        if found is None:
+            self.misses += 1
+            found = self.cache[key] = make()
+        else:
+            self.hits += 1
+        return found
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+BoundCache = PointsCache(3000)
+
+
+def _same_points(one, other):
+    if not isinstance(other, list | tuple | Grid | Lines):
+        return NotImplemented
+    return len(one) == len(other) and all(a == b for a, b in zip(one, other))
+
+
+class Grid(Sequence):
+    """
+    The ``(col, row)`` points in a rectangle, from the top left across each
+    row, going down.
+
+    Only the ranges of columns and rows are stored and points are made as
+    they are asked for.
+    """
+
+    __slots__ = ("cols", "rows")
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.cols) * len(self.rows)
 
-    if name in ("row", "col"):
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
 
-        @wraps(func)
-        def wrapped(kls, *args, **kwargs):
-            key = None
-            if len(args) == 2:
-                key = args
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Grid index out of range")
 
-            cached = None
-            if key is not None:
-                cached = BoundCache[name].get(key)
+        row, col = divmod(index, len(self.cols))
+        return self.cols[col], self.rows[row]
 
-            if cached is None:
-                cached = list(func(kls, *args, **kwargs))
-                if key is not None:
-                    BoundCache[name][key] = cached
+    def __iter__(self):
+        cols = self.cols
+        for row in self.rows:
+            for col in cols:
+                yield col, row
 
-            return cached
+    def __contains__(self, point):
+        return isinstance(point, tuple) and len(point) == 2 and point[0] in self.cols and point[1] in self.rows
 
-    else:
+    def index(self, point, *args):
+        if point not in self:
+            raise ValueError(f"{point} is not in grid")
+        return self.rows.index(point[1]) * len(self.cols) + self.cols.index(point[0])
 
-        @wraps(func)
-        def wrapped(kls, *args, **kwargs):
-            bounds = None
-            if len(args) == 1:
-                bounds = args[0]
+    def __eq__(self, other):
+        if isinstance(other, Grid):
+            return list(self.cols) == list(other.cols) and list(self.rows) == list(other.rows)
+        return _same_points(self, other)
 
-            cached = None
-            if bounds is not None:
-                cached = BoundCache[name].get(bounds)
+    def __hash__(self):
+        return hash((self.cols, self.rows))
 
-            if cached is None:
-                result = func(kls, *args, **kwargs)
-                if name != "count_points":
-                    result = list(result)
-                cached = BoundCache[name][bounds] = result
+    def __repr__(self):
+        return f"<Grid cols={self.cols} rows={self.rows}>"
 
-            return cached
 
-    return wrapped
+class Lines(Sequence):
+    """The rows or the columns of a :class:`Grid` as a sequence of smaller grids"""
+
+    __slots__ = ("grid", "vertical")
+
+    def __init__(self, grid, vertical=False):
+        self.grid = grid
+        self.vertical = vertical
+
+    def __len__(self):
+        return len(self.grid.cols) if self.vertical else len(self.grid.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+
+        if self.vertical:
+            col = self.grid.cols[index]
+            return Grid(range(col, col + 1), self.grid.rows)
+
+        row = self.grid.rows[index]
+        return Grid(self.grid.cols, range(row, row - 1, -1))
+
+    def __eq__(self, other):
+        return _same_points(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<Lines {'cols' if self.vertical else 'rows'} of {self.grid}>"
 
 
 class Points:
+    """
+    Helpers for the points in a bounds.
+
+    These return :class:`Grid` and :class:`Lines` objects rather than lists of
+    points. They are kept in ``cache``, which defaults to a cache shared by
+    everything that doesn't provide its own. Bounds that are only used once,
+    like those for a moving character, can pass ``cache=False``.
+    """
+
     @classmethod
-    @_points_bound_cache
-    def cols(kls, bounds):
-        (left, r), _, _ = bounds
-        for col in range(left, r):
-            yield kls.col(col, bounds)
+    def _cached(kls, cache, key, make):
+        if cache is False:
+            return make()
+        if cache is None:
+            cache = BoundCache
+        return cache.get(key, make)
 
     @classmethod
-    @_points_bound_cache
-    def rows(kls, bounds):
-        _, (t, b), _ = bounds
-        for row in range(t, b, -1):
-            yield kls.row(row, bounds)
+    def grid(kls, bounds, cache=None):
+        (left, r), (t, b), _ = bounds
+        return kls._cached(cache, ("grid", left, r, t, b), lambda: Grid(range(left, r), range(t, b, -1)))
+
+    @classmethod
+    def cols(kls, bounds, cache=None):
+        return Lines(kls.grid(bounds, cache=cache), vertical=True)
+
+    @classmethod
+    def rows(kls, bounds, cache=None):
+        return Lines(kls.grid(bounds, cache=cache))
 
     @classmethod
-    @_points_bound_cache
-    def all_points(kls, bounds):
-        for row in kls.rows(bounds):
-            yield from row
+    def all_points(kls, bounds, cache=None):
+        return kls.grid(bounds, cache=cache)
 
     @classmethod
-    @_points_bound_cache
     def count_points(kls, bounds):
-        return sum(len(row) for row in kls.rows(bounds))
+        (left, r), (t, b), _ = bounds
+        return max(0, r - left) * max(0, t - b)
 
     @classmethod
-    @_points_bound_cache
-    def row(kls, row, bounds):
+    def row(kls, row, bounds, cache=None):
         (left, r), _, _ = bounds
-        return [(col, row) for col in range(left, r)]
+        return kls._cached(cache, ("row", row, left, r), lambda: Grid(range(left, r), range(row, row - 1, -1)))
 
     @classmethod
-    @_points_bound_cache
-    def col(kls, col, bounds):
+    def col(kls, col, bounds, cache=None):
         _, (t, b), _ = bounds
-        return [(col, row) for row in range(t, b, -1)]
+        return kls._cached(cache, ("col", col, t, b), lambda: Grid(range(col, col + 1), range(t, b, -1)))
 
     @classmethod
     def expand(kls, bounds, amount):
@@ -24,7 +24,7 @@ class VerticalAlignment:
 
 
 def rearrange(canvas, rearranger, keep_colors=False):
-    new = Canvas()
+    new = canvas.__class__() if isinstance(canvas, Canvas) else Canvas()
 
     parts = []
 
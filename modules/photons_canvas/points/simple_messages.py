@@ -369,10 +369,26 @@ class Set64:
 
     @colors.setter
     def colors(self, colors):
-        b = b""
-        for color in colors:
-            b += fill(color)
-        self.payload[10 : 10 + len(colors) * 8] = b
+        self.set_colors(colors)
+
+    def set_colors(self, colors, order=None):
+        """
+        Write colors straight into the bytes of this message.
+
+        If ``order`` is provided then it's a sequence of indexes into colors
+        for the order those colors should be written in.
+        """
+        bts = self._bts
+        offset = 46
+
+        if order is None:
+            for color in colors:
+                bts[offset : offset + 8] = fill(color)
+                offset += 8
+        else:
+            for i in order:
+                bts[offset : offset + 8] = fill(colors[i])
+                offset += 8
 
 
 class MultizoneMessagesMaker:
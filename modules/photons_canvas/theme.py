@@ -1,7 +1,8 @@
+import asyncio
+import heapq
 import logging
 import random
 
-import kdtree
 from delfick_project.norms import Meta, dictobj, sb
 from photons_app import helpers as hp
 from photons_control.colour import make_hsbk
@@ -58,43 +59,132 @@ class Options(dictobj.Spec):
         return layer
 
 
+class PointGrid:
+    """
+    Used to find the points closest to a point.
+
+    Points are put into square cells of the grid so that we only need to look
+    at the cells around a point to find what's close to it.
+    """
+
+    def __init__(self, bounds, cell_size=3):
+        (left, right), (top, bottom), _ = bounds
+        self.cell_size = cell_size
+        self.cells = {}
+
+        self.left, self.top = self.cell_for((left, top))
+        self.right, self.bottom = self.cell_for((right, bottom))
+
+    def cell_for(self, point):
+        return point[0] // self.cell_size, point[1] // self.cell_size
+
+    def add(self, point):
+        cell = self.cell_for(point)
+        if cell not in self.cells:
+            self.cells[cell] = []
+        self.cells[cell].append(point)
+
+    def search_knn(self, point, consider):
+        """
+        Return ``[(distance, point), ...]`` for the ``consider`` closest points
+        where distance is the square of the distance between the points
+        """
+        x, y = point
+        col, row = self.cell_for(point)
+
+        furthest = max(col - self.left, self.right - col, row - self.bottom, self.top - row, 0)
+
+        found = []
+        for ring in range(furthest + 1):
+            for cell in self.ring(col, row, ring):
+                for p in self.cells.get(cell, ()):
+                    found.append(((p[0] - x) ** 2 + (p[1] - y) ** 2, p))
+
+            if len(found) >= consider:
+                closest = heapq.nsmallest(consider, found)
+                # Anything in the next ring is at least this far away
+                if closest[-1][0] <= (ring * self.cell_size) ** 2:
+                    return closest
+
+        return heapq.nsmallest(consider, found)
+
+    def ring(self, col, row, ring):
+        if ring == 0:
+            yield col, row
+            return
+
+        for c in range(col - ring, col + ring + 1):
+            yield c, row - ring
+            yield c, row + ring
+
+        for r in range(row - ring + 1, row + ring):
+            yield col - ring, r
+            yield col + ring, r
+
+
 class Applier:
-    def __init__(self, canvas, colors):
+    def __init__(self, canvas, colors, batch_size=64):
         self.canvas = canvas
         self.colors = colors
+        self.batch_size = batch_size
 
     def apply(self):
+        for _ in self.apply_in_batches():
+            pass
+
+    def apply_in_batches(self):
+        """
+        Fill in the canvas, yielding after each batch of points so that the
+        caller can let other things happen in between.
+
+        Points in the same batch are blended from the points that were filled
+        before that batch.
+        """
         if len(self.canvas.points) == 1:
             for point in self.canvas.points:
                 self.canvas[point] = random.choice(self.colors)
             return
 
-        tree = kdtree.create([], dimensions=2)
-
         all_points = set()
         for part in self.canvas.parts:
-            for point in php.Points.all_points(php.Points.expand(part.bounds, 3)):
+            for point in php.Points.all_points(php.Points.expand(part.bounds, 3), cache=self.canvas.points_cache):
                 all_points.add(point)
 
+        if not all_points:
+            return
+
         all_points = list(all_points)
         random.shuffle(all_points)
 
+        grid = PointGrid(self.bounds_for(all_points))
+
         seed_number = int(len(all_points) * 0.3)
         for point in random.choices(all_points, k=seed_number):
             self.canvas[point] = random.choice(self.colors)
-            tree.add(tuple(point))
+            grid.add(point)
+
+        for i in range(0, len(all_points), self.batch_size):
+            filled = list(self.fill_and_blur(all_points[i : i + self.batch_size], grid))
+            for point, color in filled:
+                self.canvas[point] = color
+                grid.add(point)
+            yield
+
+    def bounds_for(self, points):
+        if not points:
+            return (0, 0), (0, 0), (0, 0)
 
-        for point, color in self.fill_and_blur(all_points, tree):
-            self.canvas[point] = color
-            tree.add(tuple(point))
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        return (min(xs), max(xs)), (max(ys), min(ys)), (max(xs) - min(xs), max(ys) - min(ys))
 
-    def fill_and_blur(self, all_points, tree):
+    def fill_and_blur(self, all_points, grid):
         for point in all_points:
-            close_points = self.closest_points(tree, point, 3)
+            close_points = self.closest_points(grid, point, 3)
             yield point, php.average_color(self.weighted_points(close_points))
 
-    def closest_points(self, tree, point, consider):
-        return [(dist, node.data) for node, dist in tree.search_knn(tuple(point), consider)]
+    def closest_points(self, grid, point, consider):
+        return grid.search_knn(point, consider)
 
     def weighted_points(self, points):
         greatest_distance = max(dist for dist, _ in points)
@@ -176,7 +266,9 @@ class ApplyTheme:
                     )
 
             for canvas in canvases:
-                Applier(canvas, options.colors).apply()
+                # Give the event loop a chance to do other things between batches
+                for _ in Applier(canvas, options.colors).apply_in_batches():
+                    await asyncio.sleep(0)
 
                 for msg in canvas.msgs(options.override_layer, duration=options.duration, acks=True):
                     msgs.append(msg)
@@ -1,15 +1,17 @@
 import asyncio
 import time
 import uuid
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from photons_app import helpers as hp
-from photons_app.errors import BadRunWithResults, ProgrammerError, RunErrors
+from photons_app.errors import BadRunWithResults, ProgrammerError, RunErrors, TimedOut
+from photons_messages import DeviceMessages
 from photons_transport import catch_errors
 from photons_transport.errors import FailedToFindDevice
 from photons_transport.targets.base import Target
 
-from photons_control.planner.plans import NoMessages, Skip
+from photons_control.planner.persistent import PersistentCache
+from photons_control.planner.plans import FirmwarePlan, NoMessages, Skip
 from photons_control.script import find_serials
 
 
@@ -64,6 +66,10 @@ class Planner:
         self.depinfo = depinfo
         self.error_catcher = error_catcher
 
+        # id(pkt) to pkt for packets we have processed. We hold onto the
+        # packet so the id can't be reused while this planner is alive
+        self.seen = {}
+
     def find_msgs_to_send(self):
         """
         Yield items for any messages that we need to send to this
@@ -80,6 +86,9 @@ class Planner:
                 key = message.Key
                 self.session.refresh_received(key, self.serial, info.instance.refresh)
 
+                if info.plan.persistent:
+                    self.session.restore(message, self.serial, info.instance.refresh)
+
                 if not self.session.has_received(key, self.serial) and key not in sent:
                     sent.add(key)
                     message = message.clone()
@@ -109,9 +118,15 @@ class Planner:
         async for thing in self._process(self.session.known_packets(self.serial)):
             yield thing
 
-    async def add(self, pkt):
-        """Add a packet to known packets and process it against all plans"""
-        self.session.receive(pkt)
+    async def add(self, pkt, *, receive=True):
+        """
+        Add a packet to known packets and process it against all plans
+
+        If receive is False then the packet is only processed, for when another
+        planner has already added it to known packets
+        """
+        if receive:
+            self.session.receive(pkt)
         async for thing in self._process([pkt]):
             yield thing
 
@@ -185,6 +200,10 @@ class Planner:
         yield (serial, label, result)
         """
         for pkt in pkts:
+            if id(pkt) in self.seen:
+                continue
+            self.seen[id(pkt)] = pkt
+
             for label, info in sorted(self._by_label.items()):
                 if info.done:
                     continue
@@ -222,15 +241,142 @@ class Planner:
             return instance.serial, label, result
 
 
+class InFlight:
+    """
+    Replies to a message that has been sent to a device by one gather that
+    other gathers for the same serial may share
+
+    If the gather that sent the message stops before the message is finished
+    then the message is abandoned and gathers sharing it must send it
+    themselves.
+    """
+
+    def __init__(self, message):
+        self.message = message
+        self.pkts = []
+        self.errors = []
+        self.waiters = []
+        self.finished = False
+        self.abandoned = False
+
+    def add(self, pkt):
+        self.pkts.append(pkt)
+        self._wake()
+
+    def finish(self):
+        self.finished = True
+        self._wake()
+
+    def abandon(self):
+        if not self.finished:
+            self.abandoned = True
+            self.finish()
+
+    def _wake(self):
+        waiters, self.waiters = self.waiters, []
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(True)
+
+    def _timed_out(self, fut):
+        if not fut.done():
+            fut.set_exception(
+                TimedOut(
+                    "Waiting for reply to a packet",
+                    serial=self.message.serial,
+                    sent_pkt_type=self.message.pkt_type,
+                )
+            )
+
+    async def stream(self, timeout=None):
+        """
+        Yield the replies for this message until the message is finished.
+
+        If timeout is not None then we raise TimedOut if the message isn't
+        finished after that many seconds.
+        """
+        loop = hp.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        i = 0
+        while True:
+            while i < len(self.pkts):
+                yield self.pkts[i]
+                i += 1
+
+            if self.finished:
+                return
+
+            fut = hp.create_future(name="InFlight::stream[wait]")
+            self.waiters.append(fut)
+
+            handle = None
+            if deadline is not None:
+                handle = loop.call_later(max(0, deadline - loop.time()), self._timed_out, fut)
+
+            try:
+                await fut
+            finally:
+                if handle is not None:
+                    handle.cancel()
+
+
+class CacheStats:
+    """
+    Counts of how the Session cache has been used
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.expired = 0
+        self.restored = 0
+        self.evictions = 0
+
+    @property
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "expired": self.expired,
+            "restored": self.restored,
+            "evictions": self.evictions,
+        }
+
+
 class Session:
     """
     The cache of results from the Gatherer. It caches the replies to individual
     messages and the final results from plans. It caches per plan/serial.
+
+    Both caches are indexed by serial, and for each serial we hold onto at most
+    ``max_entries`` message keys and plan keys, forgetting the least recently
+    used ones first. If ``max_age`` is not None then anything older than that
+    many seconds is forgotten.
+
+    If we have a ``persistent`` cache then replies to messages from persistent
+    plans are also stored there and restored from there before we send those
+    messages to a device. We use the StateHostFirmware replies we receive to
+    forget what we have stored when the firmware on a device changes, and we
+    only restore replies once we have received the firmware in this session.
+    Restored replies are only as fresh as that StateHostFirmware reply, so the
+    refresh on the plan still applies to them.
     """
 
-    def __init__(self):
-        self.received = defaultdict(lambda: defaultdict(list))
-        self.filled = defaultdict(dict)
+    def __init__(self, *, max_age=None, max_entries=256, stats=None, persistent=None):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.stats = CacheStats() if stats is None else stats
+
+        self.received = {}
+        self.filled = {}
+
+        self.firmwares = {}
+        self.persisting = set()
+        self.unpersisted = defaultdict(set)
 
     def planner(self, plans, depinfo, serial, error_catcher):
         """Return a Planner instance for managing packets and results"""
@@ -244,7 +390,60 @@ class Session:
         We also record the current time to use later for determining refreshes
         """
         key = pkt.Information.sender_message.Key
-        self.received[pkt.serial][key].append((time.time(), pkt))
+        infos = self._for_serial(self.received, pkt.serial)
+
+        if key in infos:
+            infos.move_to_end(key)
+        else:
+            infos[key] = []
+
+        infos[key].append((time.time(), pkt))
+        self._evict(infos)
+
+        if self.persistent is not None:
+            self._persist(pkt, key)
+
+    def restore(self, message, serial, refresh):
+        """
+        Load replies to this message from our persistent cache if we don't
+        already have them and the firmware on the device is the same as when
+        they were stored.
+
+        The firmware is what we use to know if the cache is still valid, and
+        so replies to GetHostFirmware are never restored.
+        """
+        if self.persistent is None or message | DeviceMessages.GetHostFirmware:
+            return
+
+        key = message.Key
+        self.persisting.add(key)
+
+        if refresh is True or refresh == 0 or self._fresh_received(key, serial):
+            return
+
+        if serial not in self.firmwares:
+            return
+
+        firmware, confirmed = self.firmwares[serial]
+        if self.persistent.firmware(serial) != firmware:
+            return
+
+        replies = self.persistent.get(serial, key)
+        if not replies:
+            return
+
+        now = time.time()
+        restored = []
+        for ts, pkt in replies:
+            ts = max(ts, confirmed)
+            if (refresh is False or now - ts <= refresh) and not self._too_old(ts):
+                restored.append((ts, pkt))
+
+        if restored:
+            infos = self._for_serial(self.received, serial)
+            infos[key] = restored
+            self._evict(infos)
+            self.stats.restored += 1
 
     def fill(self, plankey, serial, result):
         """
@@ -252,7 +451,10 @@ class Session:
 
         We also record the current time to use later for determining refreshes
         """
-        self.filled[plankey][serial] = (time.time(), result)
+        results = self._for_serial(self.filled, serial)
+        results[plankey] = (time.time(), result)
+        results.move_to_end(plankey)
+        self._evict(results)
 
     def completed(self, plankey, serial):
         """
@@ -260,20 +462,38 @@ class Session:
 
         Otherwise, return None
         """
-        if plankey in self.filled and serial in self.filled[plankey]:
-            return self.filled[plankey][serial][1]
+        results = self.filled.get(serial)
+        if results is not None and plankey in results:
+            ts, result = results[plankey]
+            if not self._too_old(ts):
+                results.move_to_end(plankey)
+                self.stats.hits += 1
+                return result
+
+            self.stats.expired += 1
+            self._remove(self.filled, serial, plankey)
+
+        self.stats.misses += 1
 
     def has_received(self, key, serial):
         """Return whether this serial has received results for this key"""
-        return bool(self.received[serial].get(key))
+        if self._fresh_received(key, serial):
+            self.received[serial].move_to_end(key)
+            self.stats.hits += 1
+            return True
+
+        self.stats.misses += 1
+        return False
 
     def known_packets(self, serial):
         """Yield all the known reply packets from this serial"""
-        for s, pkts in self.received.items():
-            if s == serial:
-                for ps in pkts.values():
-                    for _, p in ps:
-                        yield p
+        infos = self.received.get(serial)
+        if not infos:
+            return
+
+        for key in list(infos):
+            for _, p in self._fresh_received(key, serial):
+                yield p
 
     def refresh_received(self, key, serial, refresh):
         """
@@ -288,16 +508,18 @@ class Session:
         if refresh is False:
             return
 
-        now = time.time()
+        infos = self.received.get(serial)
+        if not infos or key not in infos:
+            return
 
-        for s, infos in self.received.items():
-            if s == serial and key in infos:
-                if refresh is True or refresh == 0:
-                    del infos[key]
-                else:
-                    infos[key] = [(ts, i) for ts, i in infos[key] if 0 < now - ts <= refresh]
-                    if not infos[key]:
-                        del infos[key]
+        if refresh is True or refresh == 0:
+            self._remove(self.received, serial, key)
+            return
+
+        now = time.time()
+        infos[key] = [(ts, i) for ts, i in infos[key] if 0 < now - ts <= refresh]
+        if not infos[key]:
+            self._remove(self.received, serial, key)
 
     def refresh_filled(self, plankey, serial, refresh):
         """
@@ -309,17 +531,87 @@ class Session:
         * refresh == integer - Look at the time the result was recorded
           if it's been refresh seconds, then remove the result.
         """
-        if refresh is False or plankey not in self.filled or serial not in self.filled[plankey]:
+        results = self.filled.get(serial)
+        if refresh is False or not results or plankey not in results:
             return
 
         now = time.time()
-        ts, _ = self.filled[plankey][serial]
+        ts, _ = results[plankey]
 
         if refresh is True or now - ts >= refresh:
-            del self.filled[plankey][serial]
+            self._remove(self.filled, serial, plankey)
+
+    def _persist(self, pkt, key):
+        """Store this packet in our persistent cache if it's from a persistent plan"""
+        serial = pkt.serial
+
+        if pkt | DeviceMessages.StateHostFirmware:
+            firmware = (pkt.version_major, pkt.version_minor, pkt.build)
+            self.firmwares[serial] = (firmware, time.time())
+
+            if self.persistent.set_firmware(serial, firmware):
+                # Forget anything we restored for the old firmware
+                for k in self.persisting:
+                    if serial in self.received and k in self.received[serial]:
+                        self._remove(self.received, serial, k)
+                self.filled.pop(serial, None)
+
+            for k in self.unpersisted.pop(serial, ()):
+                if self._fresh_received(k, serial):
+                    self.persistent.set(serial, k, self.received[serial][k])
+            return
+
+        if key not in self.persisting:
+            return
+
+        if serial in self.firmwares:
+            self.persistent.set(serial, key, self.received[serial][key])
+        else:
+            self.unpersisted[serial].add(key)
+
+    def _for_serial(self, store, serial):
+        """Return the LRU of items for this serial in this store"""
+        items = store.get(serial)
+        if items is None:
+            items = store[serial] = OrderedDict()
+        return items
+
+    def _remove(self, store, serial, key):
+        """Remove this key for this serial from this store"""
+        items = store[serial]
+        del items[key]
+        if not items:
+            del store[serial]
+
+    def _evict(self, items):
+        """Remove the least recently used items if we have too many"""
+        if self.max_entries is None:
+            return
+
+        while len(items) > self.max_entries:
+            items.popitem(last=False)
+            self.stats.evictions += 1
 
-        if not self.filled[plankey]:
-            del self.filled[plankey]
+    def _too_old(self, ts):
+        return self.max_age is not None and time.time() - ts > self.max_age
+
+    def _fresh_received(self, key, serial):
+        """Return the packets for this key and serial that aren't older than max_age"""
+        infos = self.received.get(serial)
+        if not infos or key not in infos:
+            return []
+
+        pkts = infos[key]
+        if self.max_age is not None:
+            fresh = [(ts, p) for ts, p in pkts if not self._too_old(ts)]
+            if len(fresh) != len(pkts):
+                self.stats.expired += 1
+                if not fresh:
+                    self._remove(self.received, serial, key)
+                    return []
+                infos[key] = pkts = fresh
+
+        return pkts
 
 
 class Gatherer:
@@ -379,19 +671,44 @@ class Gatherer:
     give the plan a different label.
 
     Note that results from gathering will be cached and you may remove this cache
-    by calling gatherer.clear_cache()
+    by calling gatherer.clear_cache(). The cache holds onto at most
+    ``max_entries`` results per device and anything older than ``max_age``
+    seconds if that is not None. Information about how the cache has been used
+    is available from ``gatherer.stats``.
+
+    If ``persistent`` is given as a path to a file or a ``PersistentCache``
+    then replies for plans that are marked as persistent are also kept on disk
+    so they may be used the next time photons is started.
     """
 
     Skip = Skip
 
-    def __init__(self, sender):
+    def __init__(self, sender, *, max_age=None, max_entries=256, persistent=None):
         if isinstance(sender, Target):
             raise ProgrammerError("The Gatherer no longer takes in target instances. Please pass in a target.session result instead")
         self.sender = sender
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.cache_stats = CacheStats()
+        self.inflight = {}
+
+        if isinstance(persistent, str):
+            persistent = PersistentCache(persistent)
+        self.persistent = persistent
 
     @hp.memoized_property
     def session(self):
-        return Session()
+        return Session(
+            max_age=self.max_age,
+            max_entries=self.max_entries,
+            stats=self.cache_stats,
+            persistent=self.persistent,
+        )
+
+    @property
+    def stats(self):
+        """Return the hits, misses, expired and evictions from our cache"""
+        return self.cache_stats.info
 
     def clear_cache(self):
         """Remove all cached results"""
@@ -432,6 +749,9 @@ class Gatherer:
                     if result.successful:
                         yield result.value
 
+            if self.persistent is not None:
+                await self.persistent.flush()
+
     async def gather_all(self, plans, reference, **kwargs):
         """
         This is a coroutine that returns a single dictionary that looks like
@@ -496,26 +816,159 @@ class Gatherer:
         * Complete any plans that are finished after no more messages and yield
           completed results.
         """
+        if self.persistent is not None and any(plan.persistent for plan in plans.values()):
+            await self._confirm_firmware(serial, **kwargs)
+
         depinfo = await self._deps(plans, serial, **kwargs)
         planner = self.session.planner(plans, depinfo, serial, kwargs["error_catcher"])
 
         msgs_to_send = list(planner.find_msgs_to_send())
+        own, shared = self._claim(serial, msgs_to_send)
 
-        # Must call completed after getting msgs_to_send
-        # to make sure refreshes are taken into account
-        # But we'll return them before we send those messages
-        # So that those results are immediately available
-        async for complete in planner.completed():
-            yield complete
-
-        if msgs_to_send:
-            async for pkt in self.sender(msgs_to_send, **kwargs):
-                async for complete in planner.add(pkt):
-                    yield complete
+        try:
+            # Must call completed after getting msgs_to_send
+            # to make sure refreshes are taken into account
+            # But we'll return them before we send those messages
+            # So that those results are immediately available
+            async for complete in planner.completed():
+                yield complete
+
+            if own or shared:
+                async for pkt, receive in self._replies(serial, own, shared, kwargs):
+                    async for complete in planner.add(pkt, receive=receive):
+                        yield complete
+        finally:
+            self._release(serial, own)
 
         async for complete in planner.ended():
             yield complete
 
+    def _claim(self, serial, msgs):
+        """
+        Return ``(own, shared)`` where own is a list of ``(message, InFlight)``
+        for messages we must send ourselves and shared is a list of InFlight
+        for messages another gather is already waiting on replies for.
+        """
+        own = []
+        shared = []
+        for msg in msgs:
+            key = (serial, msg.Key)
+            if key in self.inflight:
+                shared.append(self.inflight[key])
+                self.cache_stats.shared += 1
+            else:
+                inflight = self.inflight[key] = InFlight(msg)
+                own.append((msg, inflight))
+        return own, shared
+
+    def _release(self, serial, own):
+        """
+        Stop sharing the messages we sent. Any that didn't finish are abandoned
+        so that gathers sharing them know to send them themselves.
+        """
+        for msg, inflight in own:
+            inflight.abandon()
+            key = (serial, msg.Key)
+            if self.inflight.get(key) is inflight:
+                del self.inflight[key]
+
+    async def _replies(self, serial, own, shared, kwargs):
+        """
+        Yield ``(pkt, receive)`` for replies to the messages we send and to the
+        messages we are sharing with other gathers. ``receive`` is False for
+        replies that the other gather has already added to the cache.
+        """
+        batches = []
+        for msg, inflight in own:
+            for batch in batches:
+                if msg.pkt_type not in batch:
+                    break
+            else:
+                batch = {}
+                batches.append(batch)
+            batch[msg.pkt_type] = (msg, inflight)
+
+        if len(batches) == 1 and not shared:
+            async for item in self._send(serial, batches[0], kwargs):
+                yield item
+            return
+
+        async with hp.ResultStreamer(
+            self.sender.stop_fut,
+            error_catcher=kwargs["error_catcher"],
+            exceptions_only_to_error_catcher=True,
+            name="Gatherer::_replies[streamer]",
+        ) as streamer:
+            for batch in batches:
+                await streamer.add_generator(self._send(serial, batch, kwargs))
+            for inflight in shared:
+                await streamer.add_generator(self._share(serial, inflight, kwargs))
+            streamer.no_more_work()
+
+            async for result in streamer:
+                if result.successful:
+                    yield result.value
+
+    async def _send(self, serial, batch, kwargs):
+        """
+        Send messages that all have a different pkt_type so that we know which
+        message an error is for from the pkt_type it has.
+        """
+        by_key = {msg.Key: inflight for msg, inflight in batch.values()}
+
+        def catch(error):
+            sent_pkt_type = getattr(error, "kwargs", {}).get("sent_pkt_type")
+            if sent_pkt_type in batch:
+                batch[sent_pkt_type][1].errors.append(error)
+            else:
+                for _, inflight in batch.values():
+                    inflight.errors.append(error)
+            hp.add_error(kwargs["error_catcher"], error)
+
+        own = list(batch.values())
+        try:
+            async for pkt in self.sender([msg for msg, _ in own], **{**kwargs, "error_catcher": catch}):
+                inflight = by_key.get(pkt.Information.sender_message.Key)
+                if inflight is not None:
+                    inflight.add(pkt)
+                yield pkt, True
+
+            for _, inflight in own:
+                inflight.finish()
+        finally:
+            self._release(serial, own)
+
+    async def _share(self, serial, inflight, kwargs):
+        """
+        Yield replies from a message another gather sent. We wait no longer than
+        our own message_timeout, and if the other gather stops before the
+        message is finished then we send the message ourselves.
+        """
+        async for pkt in inflight.stream(timeout=kwargs.get("message_timeout", 10)):
+            yield pkt, False
+
+        if inflight.abandoned:
+            async for pkt in self.sender(inflight.message, **kwargs):
+                yield pkt, True
+            return
+
+        if inflight.errors:
+            raise inflight.errors[0]
+        elif not inflight.pkts:
+            raise TimedOut(
+                "Waiting for reply to a packet",
+                serial=serial,
+                sent_pkt_type=inflight.message.pkt_type,
+            )
+
+    async def _confirm_firmware(self, serial, **kwargs):
+        """
+        Load what we have on disk for this serial and make sure we know the
+        firmware the device has now, so we know if what's on disk may be used.
+        """
+        await self.persistent.load(serial)
+        await self.gather_all({"firmware": FirmwarePlan()}, serial, **kwargs)
+
     async def _deps(self, plans, serial, **kwargs):
         """
         Determine if any of the plans have dependent plans and get that information
@@ -0,0 +1,166 @@
+"""
+A cache of replies from devices that is kept on disk between runs of photons.
+
+It is used by the Gatherer for plans that say they are ``persistent``, which
+means the replies to their messages only change when the firmware on the
+device changes.
+"""
+
+import binascii
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from photons_app import helpers as hp
+from photons_messages import protocol_register
+from photons_protocol.messages import Messages
+
+
+class PersistentCache:
+    """
+    Holds onto reply packets in a sqlite database, per serial and per message
+    key, along with the time each reply was received.
+
+    We also store the firmware of each serial and storing a different firmware
+    for a serial will remove all the replies we have for that serial.
+
+    The database is only used from one worker thread. ``load`` reads what we
+    have for a serial into memory, the other methods work on that memory and
+    ``flush`` writes any changes. ``close`` writes what hasn't been flushed
+    yet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+        self.loaded = set()
+        self.replies = {}
+        self.firmwares = {}
+        self.pending = []
+
+    @hp.memoized_property
+    def executor(self):
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="photons_persistent_cache")
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            with self._conn:
+                self._conn.execute("CREATE TABLE IF NOT EXISTS firmware (serial TEXT PRIMARY KEY, firmware TEXT)")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS replies (serial TEXT, key TEXT, data TEXT, PRIMARY KEY (serial, key))")
+        return self._conn
+
+    async def load(self, serial):
+        """Read what we have stored for this serial if we haven't already"""
+        if serial in self.loaded:
+            return
+
+        pending, self.pending = self.pending, []
+        firmware, replies = await self._run(self._load, pending, serial)
+
+        if serial not in self.loaded:
+            self.loaded.add(serial)
+
+            # Anything we were told while loading is newer than what was stored
+            if firmware is not None and serial not in self.firmwares:
+                self.firmwares[serial] = firmware
+                self.replies[serial] = replies
+
+    async def flush(self):
+        """Write any changes to the database"""
+        if self.pending:
+            pending, self.pending = self.pending, []
+            await self._run(self._write, pending)
+
+    def close(self):
+        if not self.pending and getattr(self, "_executor", None) is None:
+            return
+
+        pending, self.pending = self.pending, []
+        try:
+            self.executor.submit(self._close, pending).result()
+        finally:
+            self.executor.shutdown(wait=True)
+            del self.executor
+
+    def firmware(self, serial):
+        """Return the (version_major, version_minor, build) we have for this serial or None"""
+        return self.firmwares.get(serial)
+
+    def set_firmware(self, serial, firmware):
+        """
+        Record the firmware for this serial and forget any replies we have if
+        that firmware has changed.
+
+        Return whether the firmware was different to what we had.
+        """
+        firmware = tuple(firmware)
+        if self.firmwares.get(serial) == firmware:
+            return False
+
+        self.firmwares[serial] = firmware
+        self.replies.pop(serial, None)
+        self.pending.append(("firmware", serial, firmware))
+        return True
+
+    def get(self, serial, key):
+        """Return a list of ``(time, packet)`` for this serial and message key or None"""
+        return self.replies.get(serial, {}).get(self.encode_key(key))
+
+    def set(self, serial, key, replies):
+        """Store the ``(time, packet)`` replies for this serial and message key"""
+        key = self.encode_key(key)
+        replies = list(replies)
+        self.replies.setdefault(serial, {})[key] = replies
+
+        data = json.dumps([[ts, binascii.hexlify(pkt.pack().tobytes()).decode()] for ts, pkt in replies])
+        self.pending.append(("replies", serial, key, data))
+
+    def encode_key(self, key):
+        return json.dumps(list(key))
+
+    async def _run(self, func, *args):
+        return await hp.get_event_loop().run_in_executor(self.executor, partial(func, *args))
+
+    def _load(self, pending, serial):
+        self._write(pending)
+
+        row = self.conn.execute("SELECT firmware FROM firmware WHERE serial = ?", (serial,)).fetchone()
+        if row is None:
+            return None, {}
+
+        replies = {}
+        for key, data in self.conn.execute("SELECT key, data FROM replies WHERE serial = ?", (serial,)):
+            replies[key] = [(ts, Messages.create(binascii.unhexlify(d), protocol_register=protocol_register)) for ts, d in json.loads(data)]
+
+        return tuple(json.loads(row[0])), replies
+
+    def _write(self, pending):
+        if not pending:
+            return
+
+        with self.conn:
+            for op in pending:
+                if op[0] == "firmware":
+                    _, serial, firmware = op
+                    row = self.conn.execute("SELECT firmware FROM firmware WHERE serial = ?", (serial,)).fetchone()
+                    if row is None or tuple(json.loads(row[0])) != firmware:
+                        self.conn.execute("DELETE FROM replies WHERE serial = ?", (serial,))
+                        self.conn.execute(
+                            "REPLACE INTO firmware (serial, firmware) VALUES (?, ?)",
+                            (serial, json.dumps(list(firmware))),
+                        )
+                else:
+                    _, serial, key, data = op
+                    self.conn.execute("REPLACE INTO replies (serial, key, data) VALUES (?, ?, ?)", (serial, key, data))
+
+    def _close(self, pending):
+        try:
+            self._write(pending)
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
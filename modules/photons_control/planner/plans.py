@@ -127,6 +127,12 @@ class Plan:
         to the device. Note that this is overridden if you specify refresh when
         you instantiate the plan.
 
+    persistent - Default False
+        If ``True`` then the replies to the messages from this plan only change
+        when the firmware on the device changes. If the Gatherer has a
+        persistent cache, then these replies are stored in that cache and used
+        instead of sending these messages where possible.
+
     setup - Method
         Called by ``__init__`` with all positional and keyword arguments used to
         instantiate the plan except refresh. Note that before setup is called,
@@ -190,6 +196,7 @@ class Plan:
     messages = None
     dependant_info = None
     default_refresh = 10
+    persistent = False
 
     def __init__(self, *args, refresh=sb.NotSpecified, **kwargs):
         self.refresh = self.default_refresh
@@ -705,26 +712,27 @@ class ChainPlan(Plan):
                 firmware_version_major=firmware.version_major,
             )
 
-        def reverse_orient(self, orientations, index, colors):
+        def reverse_orient(self, orientations, sizes, index, colors):
             orientation = __import__("photons_canvas").orientation
-            o = orientation.reverse_orientation(orientations.get(index, self.Orien.RightSideUp))
-            return orientation.reorient(colors, o)
+            o = orientations.get(index, self.Orien.RightSideUp)
+            return orientation.reverse_orient(colors, o, *sizes.get(index, (8, 8)))
 
-        def reorient(self, orientations, random_orientations, index, colors, randomize=False):
+        def reorient(self, orientations, random_orientations, sizes, index, colors, randomize=False):
             reorient = __import__("photons_canvas").orientation.reorient
 
             if randomize:
                 orientations = random_orientations
 
-            return reorient(colors, orientations.get(index, self.Orien.RightSideUp))
+            return reorient(colors, orientations.get(index, self.Orien.RightSideUp), *sizes.get(index, (8, 8)))
 
         async def info(self):
             coords_and_sizes = [((t.user_x, t.user_y), (t.width, t.height)) for t in self.chain]
 
             random_orientations = {i: random.choice(list(self.Orien.__members__.values())) for i in self.orientations}
 
-            reorient = partial(self.reorient, self.orientations, random_orientations)
-            reverse_orient = partial(self.reverse_orient, self.orientations)
+            sizes = {i: size for i, (_, size) in enumerate(coords_and_sizes)}
+            reorient = partial(self.reorient, self.orientations, random_orientations, sizes)
+            reverse_orient = partial(self.reverse_orient, self.orientations, sizes)
 
             return {
                 "chain": self.chain,
@@ -754,6 +762,7 @@ class CapabilityPlan(Plan):
     """
 
     messages = [DeviceMessages.GetHostFirmware(), DeviceMessages.GetVersion()]
+    persistent = True
 
     class Instance(Plan.Instance):
         def process(self, pkt):
@@ -920,6 +929,7 @@ class VersionPlan(Plan):
     """
 
     messages = [DeviceMessages.GetVersion()]
+    persistent = True
 
     class Instance(Plan.Instance):
         def process(self, pkt):
@@ -144,38 +144,291 @@ class FieldInfo(dictobj):
         return b
 
 
+class StructField:
+    """
+    A byte aligned field with a static size that can be packed and unpacked as
+    part of a precompiled ``struct.Struct``.
+    """
+
+    def __init__(self, name, typ):
+        self.name = name
+        self.typ = typ
+        self.multiple = bool(typ._multiple)
+        self.number = typ._multiple or 1
+        self.is_bytes = typ.struct_format is None
+        self.is_reserved = typ.__class__.__name__ == "Reserved"
+
+        self.size_bits = typ.size_bits * self.number
+        self.size_bytes = typ.size_bits // 8
+
+        if self.is_bytes:
+            # Multiple bytes fields are unpacked as one bitarray
+            self.count = 1
+            self.codes = f"{self.size_bytes * self.number}s"
+        else:
+            self.count = self.number
+            self.codes = typ.struct_format[1:] * self.number
+
+    @classmethod
+    def compatible(kls, typ):
+        """Return whether this type can be represented in a ``struct.Struct``"""
+        size_bits = typ.size_bits
+        if type(size_bits) is not int or size_bits % 8 != 0:
+            return False
+
+        if typ._multiple is not False and type(typ._multiple) is not int:
+            return False
+
+        fmt = typ.struct_format
+        if fmt is None:
+            return True
+
+        if type(fmt) is not str or not fmt.startswith("<"):
+            return False
+
+        try:
+            return struct.calcsize(fmt) * 8 == size_bits
+        except struct.error:
+            return False
+
+    def packable(self, val):
+        """
+        Return a list of values for the struct or None if this value needs to go
+        through ``FieldInfo``
+        """
+        if not self.multiple:
+            item = self.packable_item(val)
+            if item is None:
+                return None
+            return [item]
+
+        if not isinstance(val, list) or len(val) != self.number:
+            return None
+
+        items = [self.packable_item(v) for v in val]
+        if any(item is None for item in items):
+            return None
+
+        if self.is_bytes:
+            return [b"".join(items)]
+        return items
+
+    def packable_item(self, val):
+        if val is sb.NotSpecified:
+            if self.is_reserved:
+                return b"\x00" * self.size_bytes
+            return None
+
+        if not self.is_bytes:
+            if val is Optional:
+                return 0
+            if type(val) is bitarray:
+                return None
+            return val
+
+        if type(val) is bitarray:
+            if len(val) != self.typ.size_bits:
+                return None
+            if val.endian != "little":
+                val = bitarray(val, endian="little")
+            return val.tobytes()
+
+        if type(val) is bytes and len(val) == self.size_bytes:
+            return val
+
+    def unpack(self, final, values, j):
+        """Set this field on final from ``values[j:]`` and return the next index into values"""
+        if self.is_bytes:
+            val = bitarray(endian="little")
+            val.frombytes(values[j])
+            if self.multiple:
+                final[self.name] = val
+            else:
+                dictobj.__setitem__(final, self.name, val)
+            return j + 1
+
+        if self.multiple:
+            final[self.name] = list(values[j : j + self.count])
+        else:
+            dictobj.__setitem__(final, self.name, values[j])
+        return j + self.count
+
+
+class StructSegment:
+    """A run of ``StructField`` objects represented by one ``struct.Struct``"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.struct = struct.Struct("<" + "".join(field.codes for field in fields))
+        self.size_bits = self.struct.size * 8
+
+    def pack(self, packing, pkt, parent, serial, final):
+        values = []
+        found = []
+        for field in self.fields:
+            val = packing.value_for(pkt, field.name, parent, serial)
+            found.append(val)
+            if values is not None:
+                items = field.packable(val)
+                if items is None:
+                    values = None
+                else:
+                    values.extend(items)
+
+        if values is not None:
+            try:
+                final.frombytes(self.struct.pack(*values))
+                return
+            except struct.error:
+                # Let FieldInfo tell us which field was bad
+                pass
+
+        for field, val in zip(self.fields, found):
+            packing.pack_infos(final, packing.field_infos(pkt, field.name, field.typ, val))
+
+    def unpack(self, packing, final, value, buf, i):
+        if i % 8 != 0 or i + self.size_bits > len(value):
+            for field in self.fields:
+                i = packing.unpack_field(final, field.name, field.typ, value, i)
+            return i
+
+        values = self.struct.unpack_from(buf, i // 8)
+        j = 0
+        for field in self.fields:
+            j = field.unpack(final, values, j)
+        return i + self.size_bits
+
+
+class FieldSegment:
+    """A single field that is packed and unpacked with bitarrays"""
+
+    def __init__(self, name, typ):
+        self.name = name
+        self.typ = typ
+
+    def pack(self, packing, pkt, parent, serial, final):
+        val = packing.value_for(pkt, self.name, parent, serial)
+        packing.pack_infos(final, packing.field_infos(pkt, self.name, self.typ, val))
+
+    def unpack(self, packing, final, value, buf, i):
+        return packing.unpack_field(final, self.name, self.typ, value, i)
+
+
+class PacketCodec:
+    """
+    A codec for a packet class generated once from ``Meta.all_field_types``
+
+    Runs of byte aligned fields are packed and unpacked with a single
+    precompiled ``struct.Struct`` and only sub byte and dynamically sized fields
+    go through ``FieldInfo`` and ``BitarraySlice``.
+
+    ``PacketCodec.for_kls`` returns ``None`` if the class has nothing that can
+    be compiled.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    @classmethod
+    def for_kls(kls, pkt_kls):
+        Meta = getattr(pkt_kls, "Meta", None)
+        if Meta is None or not hasattr(Meta, "all_field_types"):
+            return None
+
+        if "codec" not in Meta.__dict__:
+            Meta.codec = kls.compile(pkt_kls)
+        return Meta.codec
+
+    @classmethod
+    def compile(kls, pkt_kls):
+        run = []
+        segments = []
+
+        # offset becomes None once we can't know where fields start
+        offset = 0
+
+        for name, typ in pkt_kls.Meta.all_field_types:
+            if offset is not None and offset % 8 == 0 and StructField.compatible(typ):
+                field = StructField(name, typ)
+                run.append(field)
+                offset += field.size_bits
+                continue
+
+            if run:
+                segments.append(StructSegment(run))
+                run = []
+
+            segments.append(FieldSegment(name, typ))
+
+            size_bits = typ.size_bits
+            multiple = typ._multiple
+            if offset is None or type(size_bits) is not int or (multiple is not False and type(multiple) is not int):
+                offset = None
+            else:
+                offset += size_bits * (multiple or 1)
+
+        if run:
+            segments.append(StructSegment(run))
+
+        if not any(isinstance(segment, StructSegment) for segment in segments):
+            return None
+
+        return kls(segments)
+
+    def pack(self, packing, pkt, parent, serial):
+        final = bitarray(endian="little")
+        for segment in self.segments:
+            segment.pack(packing, pkt, parent, serial, final)
+        return final
+
+    def unpack(self, packing, pkt_kls, value):
+        i = 0
+        buf = value.tobytes()
+        final = pkt_kls()
+        for segment in self.segments:
+            i = segment.unpack(packing, final, value, buf, i)
+        return final, i
+
+
 class PacketPacking:
     @classmethod
     def fields_in(kls, pkt, parent, serial):
         for name, typ in pkt.Meta.all_field_types:
-            val = pkt.__getitem__(
-                name,
-                parent=parent,
-                serial=serial,
-                allow_bitarray=True,
-                unpacking=False,
-                do_transform=False,
-            )
-            size_bits = typ.size_bits
-            if callable(size_bits):
-                size_bits = size_bits(pkt)
-            group = pkt.Meta.name_to_group.get(name, pkt.__class__.__name__)
+            yield from kls.field_infos(pkt, name, typ, kls.value_for(pkt, name, parent, serial))
 
-            if not typ._multiple:
-                yield FieldInfo(name, typ, val, size_bits, group)
-            else:
-                if not isinstance(val, list):
-                    raise BadConversion("Expected field to be a list", name=name, val=type(val))
+    @classmethod
+    def value_for(kls, pkt, name, parent, serial):
+        return pkt.__getitem__(
+            name,
+            parent=parent,
+            serial=serial,
+            allow_bitarray=True,
+            unpacking=False,
+            do_transform=False,
+        )
+
+    @classmethod
+    def field_infos(kls, pkt, name, typ, val):
+        size_bits = typ.size_bits
+        if callable(size_bits):
+            size_bits = size_bits(pkt)
+        group = pkt.Meta.name_to_group.get(name, pkt.__class__.__name__)
+
+        if not typ._multiple:
+            yield FieldInfo(name, typ, val, size_bits, group)
+        else:
+            if not isinstance(val, list):
+                raise BadConversion("Expected field to be a list", name=name, val=type(val))
 
-                number = typ._multiple
-                if callable(number):
-                    number = number(pkt)
+            number = typ._multiple
+            if callable(number):
+                number = number(pkt)
 
-                if len(val) != number:
-                    raise BadConversion("Expected correct number of items", name=name, found=len(val), want=number)
+            if len(val) != number:
+                raise BadConversion("Expected correct number of items", name=name, found=len(val), want=number)
 
-                for v in val:
-                    yield FieldInfo(name, typ, v, size_bits, group)
+            for v in val:
+                yield FieldInfo(name, typ, v, size_bits, group)
 
     @classmethod
     def pkt_from_bitarray(kls, pkt_kls, value):
@@ -183,36 +436,47 @@ class PacketPacking:
         final = pkt_kls()
 
         for name, typ in pkt_kls.Meta.all_field_types:
-            single_size_bits = typ.size_bits
-            if callable(single_size_bits):
-                single_size_bits = single_size_bits(final)
+            i = kls.unpack_field(final, name, typ, value, i)
+        return final, i
 
-            multiple = typ._multiple
+    @classmethod
+    def unpack_field(kls, final, name, typ, value, i):
+        """
+        Set the value for this field on ``final`` from the bits found at index
+        ``i`` of ``value`` and return the index of the bit after this field.
+        """
+        pkt_kls = type(final)
+        single_size_bits = typ.size_bits
+        if callable(single_size_bits):
+            single_size_bits = single_size_bits(final)
+
+        multiple = typ._multiple
+
+        size_bits = single_size_bits
+        if multiple:
+            if callable(multiple):
+                multiple = multiple(final)
+            size_bits *= multiple
+
+        val = value[i : i + size_bits]
+        i += size_bits
+
+        if multiple:
+            if typ.struct_format:
+                res = []
+                j = 0
+                for _ in range(multiple):
+                    v = val[j : j + single_size_bits]
+                    j += single_size_bits
+                    info = BitarraySlice(name, typ, v, single_size_bits, pkt_kls.__name__)
+                    res.append(info.unpackd)
+                val = res
+            final[name] = val
+        else:
+            info = BitarraySlice(name, typ, val, size_bits, pkt_kls.__name__)
+            dictobj.__setitem__(final, info.name, info.unpackd)
 
-            size_bits = single_size_bits
-            if multiple:
-                if callable(multiple):
-                    multiple = multiple(final)
-                size_bits *= multiple
-
-            val = value[i : i + size_bits]
-            i += size_bits
-
-            if multiple:
-                if typ.struct_format:
-                    res = []
-                    j = 0
-                    for _ in range(multiple):
-                        v = val[j : j + single_size_bits]
-                        j += single_size_bits
-                        info = BitarraySlice(name, typ, v, single_size_bits, pkt_kls.__name__)
-                        res.append(info.unpackd)
-                    val = res
-                final[name] = val
-            else:
-                info = BitarraySlice(name, typ, val, size_bits, pkt_kls.__name__)
-                dictobj.__setitem__(final, info.name, info.unpackd)
-        return final, i
+        return i
 
     @classmethod
     def pack(kls, pkt, payload=None, parent=None, serial=None):
@@ -224,21 +488,21 @@ class PacketPacking:
         Finally, the bitarray object is essentially concated together to create
         one final bitarray object.
 
+        Packet classes with byte aligned fields use a ``PacketCodec`` so that
+        those fields are packed together with one ``struct.Struct``.
+
         This code assumes the packet has little endian.
 
         If ``payload`` is provided and this packet is a ``parent_packet`` and
         it's last field has a ``message_type`` property of 0, then that payload
         is converted into a bitarray and added to the end of the result.
         """
-        final = bitarray(endian="little")
-
-        for info in kls.fields_in(pkt, parent, serial):
-            result = info.to_sized_bitarray()
-
-            if result is None:
-                raise BadConversion("Failed to convert field into a bitarray", field=info.as_dict())
-
-            final += result
+        codec = PacketCodec.for_kls(type(pkt))
+        if codec is None:
+            final = bitarray(endian="little")
+            kls.pack_infos(final, kls.fields_in(pkt, parent, serial))
+        else:
+            final = codec.pack(kls, pkt, parent, serial)
 
         # If this is a parent packet with a Payload of message_type 0
         # Then this means we have no payload fields and so must append
@@ -251,6 +515,17 @@ class PacketPacking:
 
         return final
 
+    @classmethod
+    def pack_infos(kls, final, infos):
+        """Add the bitarray for each ``FieldInfo`` onto ``final``"""
+        for info in infos:
+            result = info.to_sized_bitarray()
+
+            if result is None:
+                raise BadConversion("Failed to convert field into a bitarray", field=info.as_dict())
+
+            final += result
+
     @classmethod
     def unpack(kls, pkt_kls, value):
         """
@@ -259,14 +534,20 @@ class PacketPacking:
 
         We then get information about each field from ``Meta`` and use that to
         slice the value into chunks that are used to determine a value for each
-        field.
+        field. Runs of byte aligned fields are unpacked together with the
+        ``struct.Struct`` from the ``PacketCodec`` for the class.
 
         If this is a ``parent_packet`` and the last field has a ``message_type``
         property of 0, then the remainder of the ``value`` is assigned as
         bytes to that field on the final instance.
         """
         value = val_to_bitarray(value, doing="Making bitarray to unpack")
-        final, index = kls.pkt_from_bitarray(pkt_kls, value)
+
+        codec = PacketCodec.for_kls(pkt_kls)
+        if codec is None:
+            final, index = kls.pkt_from_bitarray(pkt_kls, value)
+        else:
+            final, index = codec.unpack(kls, pkt_kls, value)
 
         if getattr(pkt_kls, "parent_packet", False) and index < len(value):
             for name, typ in pkt_kls.Meta.field_types:
@@ -14,7 +14,7 @@ from photons_app import helpers as hp
 from photons_app.errors import PhotonsAppError, RunErrors, UserQuit
 
 from photons_transport.errors import StopPacketStream
-from photons_transport.retry_options import Gaps, RetryTicker
+from photons_transport.retry_options import RTT, Gaps, RetryTicker
 
 log = logging.getLogger("photons_transport")
 
@@ -47,4 +47,4 @@ def catch_errors(error_catcher=None):
         raise RunErrors(_errors=error_catcher)
 
 
-__all__ = ["RetryTicker", "Gaps", "catch_errors"]
+__all__ = ["RetryTicker", "RTT", "Gaps", "catch_errors"]
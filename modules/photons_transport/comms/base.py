@@ -4,6 +4,7 @@ import json
 import logging
 import random
 import struct
+from collections import OrderedDict
 
 from photons_app import helpers as hp
 from photons_app.errors import BadRunWithResults, FoundNoDevices, RunErrors, TimedOut
@@ -11,9 +12,10 @@ from photons_protocol.messages import Messages
 from photons_protocol.packets import Information
 
 from photons_transport import catch_errors
-from photons_transport.comms.receiver import Receiver
+from photons_transport.comms.receiver import LazyPacket, Receiver
 from photons_transport.comms.writer import Writer
 from photons_transport.errors import FailedToFindDevice, StopPacketStream
+from photons_transport.retry_options import RTT
 
 log = logging.getLogger("photons_transport.comms")
 
@@ -111,6 +113,72 @@ class Found:
         return f"<FOUND: {services}>"
 
 
+class SourcePool:
+    """
+    Hold onto the source ids a session uses for it's packets
+
+    The first source is always the session's main source. When there is more
+    than one source then packets can be spread across them so that more
+    messages may be in flight to the same device at once. A stream is any
+    hashable name for a workload that will always be given the same source so
+    that traffic can be attributed to that workload.
+
+    Only the ``max_streams`` most recently used streams are remembered and a
+    stream should be released when it is finished with.
+    """
+
+    def __init__(self, source, size=1, max_streams=1024):
+        self.sources = [source]
+        while len(self.sources) < max(1, size):
+            other = random.randrange(1, 1 << 32)
+            if other not in self.sources:
+                self.sources.append(other)
+
+        self.index = 0
+        self.max_streams = max_streams
+        self.streams = OrderedDict()
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __contains__(self, source):
+        return source in self.sources
+
+    def next(self):
+        """Return the next source, round robin"""
+        source = self.sources[self.index]
+        self.index = (self.index + 1) % len(self.sources)
+        return source
+
+    def for_stream(self, stream=None):
+        """
+        Return the source for this stream
+
+        If there is no stream then we return the next source round robin.
+        Otherwise a stream is given a source the first time it's seen and that
+        source is used for the stream from then on.
+        """
+        if stream is None:
+            return self.next()
+
+        source = self.streams.get(stream)
+        if source is None:
+            source = self.streams[stream] = self.next()
+            while len(self.streams) > self.max_streams:
+                self.streams.popitem(last=False)
+        else:
+            self.streams.move_to_end(stream)
+        return source
+
+    def release(self, stream):
+        """Forget the source for a stream that is finished"""
+        self.streams.pop(stream, None)
+
+    def streams_for(self, source):
+        """Return the streams that are using this source"""
+        return [stream for stream, s in self.streams.items() if s == source]
+
+
 def timeout_task(task, errf, serial):
     """Used to cancel sending a messages and record a timed out exception"""
     if not task.done():
@@ -195,6 +263,12 @@ class Communication:
         self.receiver = Receiver()
         self.received_data_tasks = hp.TaskHolder(self.stop_fut, name=f"{type(self).__name__}.__init__|received_data_tasks|")
 
+        self.received_batch = []
+        self.received_batch_task = None
+        self.write_batch = []
+
+        self.rtts = {}
+
         self.make_plans = __import__("photons_control.planner").planner.make_plans
 
         self.setup()
@@ -207,7 +281,12 @@ class Communication:
 
     @hp.memoized_property
     def gatherer(self):
-        return __import__("photons_control.planner").planner.Gatherer(self)
+        return __import__("photons_control.planner").planner.Gatherer(
+            self,
+            max_age=getattr(self.transport_target, "gatherer_max_age", None),
+            max_entries=getattr(self.transport_target, "gatherer_max_entries", 256),
+            persistent=getattr(self.transport_target, "gatherer_cache_path", None),
+        )
 
     async def finish(self, exc_typ=None, exc=None, tb=None):
         self.stop_fut.cancel()
@@ -219,19 +298,78 @@ class Communication:
 
         await self.received_data_tasks.finish(exc_typ, exc, tb)
 
+        gatherer = getattr(self, "_gatherer", None)
+        if gatherer is not None and gatherer.persistent is not None:
+            try:
+                await gatherer.persistent.flush()
+                gatherer.persistent.close()
+            except Exception as error:
+                log.error(hp.lc("Failed to close the gatherer cache", error=error))
+
     @hp.memoized_property
     def source(self):
         """Return us a source to use for our packets"""
         return random.randrange(1, 1 << 32)
 
-    def seq(self, target):
-        """Create the next sequence for this target"""
-        if not hasattr(self, "_seq"):
-            self._seq = {}
-        if target not in self._seq:
-            self._seq[target] = 0
-        self._seq[target] = (self._seq[target] + 1) % pow(2, 8)
-        return self._seq[target]
+    @hp.memoized_property
+    def sources(self):
+        """Return the pool of sources we may use for our packets"""
+        return SourcePool(self.source, size=getattr(self.transport_target, "source_pool_size", 1))
+
+    def source_for(self, stream=None):
+        """
+        Return a source from our pool for this stream
+
+        If no stream is given the sources are used round robin.
+        """
+        if len(self.sources) == 1:
+            return self.source
+        return self.sources.for_stream(stream)
+
+    def release_stream(self, stream):
+        """Let go of the source for a stream that won't send any more messages"""
+        self.sources.release(stream)
+
+    def seq(self, target, source=None):
+        """Create the next sequence for this target that isn't already in flight"""
+        if source is None:
+            source = self.source
+        return self.receiver.window(source, target).next()
+
+    async def free_seq(self, target, sequence, source=None):
+        """
+        Return this sequence if it isn't in flight for this target, otherwise
+        wait for and return a sequence that is free
+        """
+        if source is None:
+            source = self.source
+        window = self.receiver.window(source, target)
+        if window.is_free(sequence):
+            return sequence
+        window.collisions_avoided += 1
+        return await window.acquire()
+
+    def rtt(self, serial):
+        """Return the round trip time estimate for this serial"""
+        rtt = self.rtts.get(serial)
+        if rtt is None:
+            rtt = self.rtts[serial] = RTT()
+        return rtt
+
+    def measure_rtt(self, serial, result, sent_at):
+        """Add the time it takes for this result to get it's first reply to our estimate for this serial"""
+
+        def measure(res):
+            if res.cancelled() or res.exception() or res.first_received is None:
+                return
+            self.rtt(serial).add(max(0, res.first_received - sent_at))
+
+        result.add_done_callback(measure)
+
+    @property
+    def rtt_info(self):
+        """Return information about the round trip time estimate for each serial"""
+        return {serial: rtt.info for serial, rtt in self.rtts.items()}
 
     async def forget(self, serial):
         if serial not in self.found:
@@ -365,7 +503,10 @@ class Communication:
             name=f"SendPacket({original.pkt_type, packet.serial})::send_single[streamer_fut]",
         )
 
-        retry_ticker = retry_gaps.retry_ticker(name=f"{type(self).__name__}({type(transport).__name__})::retry_ticker")
+        retry_ticker = retry_gaps.retry_ticker(
+            name=f"{type(self).__name__}({type(transport).__name__})::retry_ticker",
+            rtt=None if is_broadcast else self.rtt(packet.serial),
+        )
 
         with tick_fut, streamer_fut:
             async with hp.ResultStreamer(streamer_fut, name=f"SendPacket({original.pkt_type, packet.serial}).send_single") as streamer:
@@ -416,8 +557,66 @@ class Communication:
         await transport.spawn(original, timeout=connect_timeout)
         return transport, is_broadcast
 
+    @property
+    def batched_io(self):
+        """Whether we send and receive data in batches"""
+        return getattr(self.transport_target, "batched_io", False) is True
+
     def sync_received_data(self, *args, **kwargs):
-        return self.received_data_tasks.add(self.received_data(*args, **kwargs))
+        if not self.batched_io:
+            return self.received_data_tasks.add(self.received_data(*args, **kwargs))
+
+        self.received_batch.append((args, kwargs))
+        if self.received_batch_task is None or self.received_batch_task.done():
+            self.received_batch_task = self.received_data_tasks.add(self.drain_received_data())
+        return self.received_batch_task
+
+    def batch_write(self, transport, bts, address):
+        """
+        Queue bts to be sent with everything else written in this loop tick,
+        for every device in this session.
+
+        Return a future that resolves once the bytes are sent, or has the
+        error from sending them.
+        """
+        fut = hp.create_future(name=f"{type(self).__name__}::batch_write[fut]")
+        self.write_batch.append((transport, bts, address, fut))
+        if len(self.write_batch) == 1:
+            hp.get_event_loop().call_soon(self.flush_writes)
+        return fut
+
+    def flush_writes(self):
+        """Send everything that was written since the last time we flushed"""
+        batch, self.write_batch = self.write_batch, []
+        for transport, bts, address, fut in batch:
+            if fut.done():
+                continue
+
+            if transport.is_closing():
+                fut.set_result(False)
+                continue
+
+            try:
+                transport.sendto(bts, address)
+            except Exception as error:
+                fut.set_exception(error)
+            else:
+                fut.set_result(True)
+
+    async def drain_received_data(self):
+        """
+        Process everything that has been received so far in one task rather
+        than creating a task for every datagram
+        """
+        while self.received_batch:
+            batch, self.received_batch = self.received_batch, []
+            for args, kwargs in batch:
+                try:
+                    await self.received_data(*args, **kwargs)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as error:
+                    log.exception(error)
 
     async def received_data(self, data, addr, allow_zero=False):
         """What to do when we get some data"""
@@ -445,6 +644,8 @@ class Communication:
                     PacketKls = Packet
                 if isinstance(data, PacketKls):
                     pkt = data.clone()
+                elif protocol == 1024 and isinstance(data, bytes):
+                    pkt = LazyPacket(data, protocol, pkt_type, PacketKls)
                 else:
                     pkt = PacketKls.create(data)
         except Exception as error:
@@ -1,4 +1,6 @@
+import binascii
 import logging
+import struct
 
 from bitarray import bitarray
 from photons_app import helpers as hp
@@ -6,6 +8,133 @@ from photons_app import helpers as hp
 log = logging.getLogger("photons_transport.comms.receiver")
 
 
+class LazyPacket:
+    """
+    A view of a received LIFX packet that has only decoded the frame header,
+    frame address and protocol header.
+
+    The whole packet is only unpacked when ``packet`` is accessed, which the
+    Receiver only does when something is waiting for this packet. Accessing any
+    other attribute will also unpack the packet and get that attribute from it.
+    """
+
+    represents_ack = False
+
+    def __init__(self, data, protocol, pkt_type, PacketKls):
+        self.data = data
+        self.protocol = protocol
+        self.pkt_type = pkt_type
+        self.PacketKls = PacketKls
+
+        self.source = struct.unpack("<I", data[4:8])[0]
+        self.target = data[8:16]
+        self.sequence = data[23]
+        self.serial = binascii.hexlify(self.target[:6]).decode()
+
+    @hp.memoized_property
+    def packet(self):
+        return self.PacketKls.create(self.data)
+
+    def __or__(self, kls):
+        return self.protocol == kls.Payload.Meta.protocol and self.pkt_type == kls.Payload.message_type
+
+    def __getattr__(self, key):
+        if key.startswith("_"):
+            raise AttributeError(key)
+        return getattr(self.packet, key)
+
+    def __repr__(self):
+        return f"<LazyPacket source: {self.source}, sequence: {self.sequence}, serial: {self.serial}, pkt_type: {self.pkt_type}>"
+
+
+class SequenceWindow:
+    """
+    Knows which sequence numbers are registered with the Receiver for one target
+    so that we only give out sequence numbers that aren't already in flight.
+
+    collisions_avoided
+        The number of times we skipped a sequence number because it was in flight
+
+    waited
+        The number of times we had to wait because every sequence number was in
+        flight
+    """
+
+    size = 256
+
+    def __init__(self):
+        self.last = 0
+        self.waiters = []
+        self.inflight = {}
+
+        self.waited = 0
+        self.collisions_avoided = 0
+
+    @property
+    def exhausted(self):
+        return len(self.inflight) >= self.size
+
+    def is_free(self, sequence):
+        return sequence not in self.inflight
+
+    def next(self):
+        """
+        Return the next sequence number that isn't in flight
+
+        If every sequence number is in flight then we return the next one anyway
+        and ``acquire`` should be used to wait for a free one.
+        """
+        for _ in range(self.size):
+            self.last = (self.last + 1) % self.size
+            if self.last not in self.inflight:
+                return self.last
+            self.collisions_avoided += 1
+
+        self.last = (self.last + 1) % self.size
+        return self.last
+
+    async def acquire(self):
+        """Wait till there is a free sequence number and return it"""
+        if self.exhausted:
+            self.waited += 1
+
+        while self.exhausted:
+            fut = hp.create_future(name="SequenceWindow::acquire[wait]")
+            self.waiters.append(fut)
+            try:
+                await fut
+            finally:
+                if fut in self.waiters:
+                    self.waiters.remove(fut)
+
+        return self.next()
+
+    def add(self, sequence):
+        self.inflight[sequence] = self.inflight.get(sequence, 0) + 1
+
+    def remove(self, sequence):
+        if sequence not in self.inflight:
+            return
+
+        self.inflight[sequence] -= 1
+        if self.inflight[sequence] <= 0:
+            del self.inflight[sequence]
+
+        while self.waiters and not self.exhausted:
+            fut = self.waiters.pop(0)
+            if not fut.done():
+                fut.set_result(True)
+                break
+
+    @property
+    def info(self):
+        return {
+            "inflight": len(self.inflight),
+            "waited": self.waited,
+            "collisions_avoided": self.collisions_avoided,
+        }
+
+
 class Receiver:
     """Hold onto and routes replies from the bridge"""
 
@@ -13,20 +142,49 @@ class Receiver:
 
     def __init__(self):
         self.results = {}
+        self.windows = {}
         self.blank_target = bitarray("0" * 8 * 8).tobytes()
 
     @property
     def loop(self):
         return hp.get_event_loop()
 
+    def window(self, source, serial):
+        """
+        Return the SequenceWindow for this source and serial
+
+        Sequence numbers only need to be unique for each source, so each
+        source gets it's own window of sequences for each device
+        """
+        key = (source, serial)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = SequenceWindow()
+        return window
+
+    @property
+    def inflight_info(self):
+        """Return information about the sequence windows for each source and serial"""
+        info = {}
+        for (source, serial), window in self.windows.items():
+            info.setdefault(source, {})[serial] = window.info
+        return info
+
     def register(self, packet, result, original):
         """Register a future waiting for a result"""
         key = (packet.source, packet.sequence, packet.target)
         self.results[key] = (original, result)
 
+        # The packet may be modified after this so remember what we registered
+        sequence = packet.sequence
+
+        window = self.window(packet.source, packet.serial)
+        window.add(sequence)
+
         def cleanup(res):
-            if key in self.results:
+            if key in self.results and self.results[key][1] is result:
                 del self.results[key]
+            window.remove(sequence)
 
         result.add_done_callback(cleanup)
 
@@ -55,7 +213,9 @@ class Receiver:
 
         if key not in self.results and broadcast_key not in self.results:
             if self.message_catcher is not NotImplemented and callable(self.message_catcher):
-                await self.message_catcher(pkt)
+                pkt = self.unpack(pkt)
+                if pkt is not None:
+                    await self.message_catcher(pkt)
             else:
                 # This usually happens when Photons retries a message
                 # But gets a reply from multiple of these requests
@@ -67,6 +227,20 @@ class Receiver:
         if key not in self.results:
             key = broadcast_key
 
+        pkt = self.unpack(pkt)
+        if pkt is None:
+            return
+
         original = self.results[key][0]
         pkt.Information.update(remote_addr=addr, sender_message=original)
         self.results[key][1].add_packet(pkt)
+
+    def unpack(self, pkt):
+        """Return the full packet for a LazyPacket or None if it can't be unpacked"""
+        if not isinstance(pkt, LazyPacket):
+            return pkt
+
+        try:
+            return pkt.packet
+        except Exception as error:
+            log.exception(error)
@@ -17,6 +17,7 @@ class Result(asyncio.Future):
         self.did_broadcast = did_broadcast
 
         self.results = []
+        self.first_received = None
         self.last_ack_received = None
         self.last_res_received = None
 
@@ -27,6 +28,9 @@ class Result(asyncio.Future):
 
     def add_packet(self, pkt):
         """Determine if we should call add_ack or add_result"""
+        if self.first_received is None:
+            self.first_received = time.time()
+
         if getattr(pkt, "represents_ack", False):
             self.add_ack()
         else:
@@ -1,5 +1,6 @@
 import binascii
 import logging
+import time
 
 from photons_app import helpers as hp
 
@@ -32,8 +33,10 @@ class Writer:
 
     async def __call__(self):
         self.modify_sequence()
+        await self.ensure_free_sequence()
         result = self.register()
         bts = await self.write()
+        self.measure(result)
 
         lc = hp.lc.using(
             serial=self.clone.serial,
@@ -52,9 +55,18 @@ class Writer:
 
     def modify_sequence(self):
         if self.sent > 0:
-            self.clone.sequence = self.session.seq(self.original.serial)
+            self.clone.sequence = self.session.seq(self.clone.serial, source=self.clone.source)
         self.sent += 1
 
+    async def ensure_free_sequence(self):
+        """Make sure we don't register over a result that is still in flight"""
+        self.clone.sequence = await self.session.free_seq(self.clone.serial, self.clone.sequence, source=self.clone.source)
+
+    def measure(self, result):
+        """Record how long this result takes to get a reply"""
+        if not self.did_broadcast and not result.done():
+            self.session.measure_rtt(self.clone.serial, result, time.time())
+
     def register(self):
         result = Result(self.original, self.did_broadcast, self.retry_gaps)
         if not result.done():
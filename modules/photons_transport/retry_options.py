@@ -72,12 +72,83 @@ def Gaps(*, gap_between_results, gap_between_ack_and_res, timeouts):
             """
             return self.gap_between_results + 0.05
 
-        def retry_ticker(self, name=None):
-            return RetryTicker(timeouts=self.timeouts, name=name)
+        def retry_ticker(self, name=None, rtt=None):
+            timeouts = self.timeouts
+            if rtt is not None:
+                timeouts = rtt.timeouts(timeouts)
+            return RetryTicker(timeouts=timeouts, name=name)
 
     return ResultGaps.FieldSpec()
 
 
+class RTT:
+    """
+    Keeps a smoothed round trip time and variance for a device, in the same way
+    TCP does it (RFC 6298), and uses it to determine how long to wait before
+    sending a retry.
+    """
+
+    alpha = 1 / 8
+    beta = 1 / 4
+    k = 4
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def add(self, sample):
+        """Add a measurement in seconds from sending a message to getting a reply"""
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - sample)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * sample
+        self.samples += 1
+
+    @property
+    def rto(self):
+        """How long to wait for a reply before retrying, or None if we have no measurements"""
+        if self.srtt is None:
+            return None
+        return self.srtt + self.k * self.rttvar
+
+    def timeouts(self, timeouts):
+        """
+        Return a list of (step, end) tuples like those given to a RetryTicker
+
+        We start with our retry timeout and double it for each retry. The
+        first step in the provided timeouts is the floor, so we never retry
+        sooner than the static schedule would, and the largest step is the
+        ceiling.
+
+        If we don't have any measurements yet, then the provided timeouts are
+        returned as is.
+        """
+        rto = self.rto
+        if rto is None or not timeouts:
+            return timeouts
+
+        floor = timeouts[0][0]
+        ceiling = max(step for step, _ in timeouts)
+
+        result = []
+        end = 0
+        step = min(max(rto, floor), ceiling)
+        while step < ceiling:
+            end += step
+            result.append((round(step, 3), round(end, 3)))
+            step = min(step * 2, ceiling)
+
+        result.append((ceiling, None))
+        return result
+
+    @property
+    def info(self):
+        return {"srtt": self.srtt, "rttvar": self.rttvar, "rto": self.rto, "samples": self.samples}
+
+
 class RetryTicker:
     def __init__(self, *, timeouts, name=None):
         self.name = name
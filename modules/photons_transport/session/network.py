@@ -7,7 +7,7 @@ from photons_messages import DiscoveryMessages, Services
 from photons_transport.comms.base import Communication
 from photons_transport.errors import InvalidBroadcast, NoDesiredService, UnknownService
 from photons_transport.retry_options import RetryTicker
-from photons_transport.transports.udp import UDP
+from photons_transport.transports.udp import UDP, SharedUDP
 
 log = logging.getLogger("photons_transport.session.network")
 
@@ -19,9 +19,18 @@ class NetworkSession(Communication):
     """
 
     UDPTransport = UDP
+    SharedUDPTransport = SharedUDP
 
     def setup(self):
         self.broadcast_transports = {}
+        self.shared_udp = None
+        if self.shared_socket:
+            self.shared_udp = self.UDPTransport(self, "0.0.0.0", 0)
+
+    @property
+    def shared_socket(self):
+        """Whether all our devices share one socket"""
+        return getattr(self.transport_target, "shared_socket", False) is True
 
     async def finish(self, exc_typ=None, exc=None, tb=None):
         await super().finish(exc_typ, exc, tb)
@@ -35,6 +44,12 @@ class NetworkSession(Communication):
                 if exc:
                     log.error(hp.lc("Failed to close broadcast transport", error=exc))
 
+        if self.shared_udp is not None:
+            try:
+                await self.shared_udp.close()
+            except Exception as error:
+                log.error(hp.lc("Failed to close shared transport", error=error))
+
     def retry_gaps(self, packet, transport):
         return self.transport_target.gaps
 
@@ -104,6 +119,9 @@ class NetworkSession(Communication):
         if service != Services.UDP:
             raise UnknownService(service=service)
 
+        if self.shared_socket:
+            return self.SharedUDPTransport(self, kwargs["host"], kwargs["port"], serial=serial)
+
         return self.UDPTransport(self, kwargs["host"], kwargs["port"], serial=serial)
 
     async def make_broadcast_transport(self, broadcast):
@@ -13,9 +13,12 @@ from photons_transport.targets.base import Target
 
 class LanTarget(Target):
     """
-    Knows how to talk to a device over the local network. It's one configuration
+    Knows how to talk to a device over the local network. One configuration
     option is default_broadcast which says what address to broadcast discovery
     if broadcast is given to sender calls as True.
+
+    If shared_socket is True then one socket is used to talk to every device
+    rather than a socket per device.
     """
 
     gaps = dictobj.Field(
@@ -28,6 +31,7 @@ class LanTarget(Target):
 
     default_broadcast = dictobj.Field(sb.defaulted(sb.string_spec(), "255.255.255.255"))
     discovery_options = dictobj.Field(discovery_options_spec)
+    shared_socket = dictobj.Field(sb.boolean, default=False)
 
     session_kls = NetworkSession
 
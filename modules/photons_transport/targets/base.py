@@ -40,6 +40,11 @@ class Target(dictobj.Spec):
     protocol_register = dictobj.Field(sb.overridden("{protocol_register}"), formatted=True)
     final_future = dictobj.Field(sb.overridden("{final_future}"), formatted=True)
     description = dictobj.Field(sb.string_spec, default="Base transport functionality")
+    source_pool_size = dictobj.Field(sb.integer_spec, default=1)
+    batched_io = dictobj.Field(sb.boolean, default=False)
+    gatherer_max_age = dictobj.NullableField(sb.float_spec)
+    gatherer_max_entries = dictobj.Field(sb.integer_spec, default=256)
+    gatherer_cache_path = dictobj.NullableField(sb.string_spec)
 
     item_kls = Item
     script_runner_kls = ScriptRunner
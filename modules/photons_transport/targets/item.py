@@ -121,6 +121,13 @@ class Item:
             Note that if you saying ``target.script(msgs).run(....)`` then limit will be set
             to a semaphore with max 30 by default. You may specify just a number and it will turn it
             into a semaphore.
+
+        stream
+            A hashable name for the workload these messages are part of. If the
+            target has a ``source_pool_size`` greater than one then every message
+            for the same stream will use the same source, which lets many streams
+            have messages in flight to the same device without running out of
+            sequence numbers. If not specified then sources are used round robin.
         """
         if "timeout" in kwargs:
             log.warning(hp.lc("Please use message_timeout instead of timeout when calling run"))
@@ -135,7 +142,7 @@ class Item:
 
             # Work out what and where to send
             # All the packets from here have targets on them
-            packets = self.make_packets(sender, serials)
+            packets = self.make_packets(sender, serials, stream=kwargs.get("stream"))
 
             # Short cut if nothing to actually send
             if not packets:
@@ -193,33 +200,37 @@ class Item:
                 ps.append((p, p.simplify()))
         return ps
 
-    def make_packets(self, sender, serials):
+    def make_packets(self, sender, serials, stream=None):
         """
         Create and fill in the packets from our parts
 
         This means that for each reference and each part we create a clone of
         the part with the target set to the reference, complete with a source and
-        sequence
+        sequence. The source comes from the sender's pool of sources for this
+        stream unless the part already has a source.
         """
         # Simplify our parts
         simplified_parts = self.simplify_parts()
+        source = sender.source_for(stream)
 
         packets = []
         for original, p in simplified_parts:
             if p.target is sb.NotSpecified:
                 for serial in serials:
                     clone = p.clone()
+                    chosen = choose_source(clone, source)
                     clone.update(
                         dict(
                             target=serial,
-                            source=choose_source(clone, sender.source),
-                            sequence=sender.seq(serial),
+                            source=chosen,
+                            sequence=sender.seq(serial, source=chosen),
                         )
                     )
                     packets.append((original, clone))
             else:
                 clone = p.clone()
-                clone.update(dict(source=choose_source(clone, sender.source), sequence=sender.seq(p.serial)))
+                chosen = choose_source(clone, source)
+                clone.update(dict(source=chosen, sequence=sender.seq(p.serial, source=chosen)))
                 packets.append((original, clone))
 
         return packets
@@ -33,7 +33,11 @@ class UDP(Socket):
             handle.cancel()
 
     async def write(self, transport, bts, original_message):
-        transport.sendto(bts, self.address)
+        if not self.session.batched_io:
+            transport.sendto(bts, self.address)
+            return
+
+        await self.session.batch_write(transport, bts, self.address)
 
     def make_socket_protocol(self):
         fut, Protocol = super().make_socket_protocol()
@@ -52,3 +56,20 @@ class UDP(Socket):
         if platform.system() == "Windows":
             sock.bind(("", 0))
         return sock
+
+
+class SharedUDP(UDP):
+    """
+    Knows how to send and receive over udp for one device using a socket that
+    is shared with every other device in the session.
+
+    Replies arrive on the shared socket and are given to the session, which
+    already knows which message they are for from the packet header.
+    """
+
+    async def spawn_transport(self, timeout):
+        return await self.session.shared_udp.spawn(None, timeout=timeout)
+
+    async def close_transport(self, transport):
+        # The socket belongs to the session and is closed when the session finishes
+        pass
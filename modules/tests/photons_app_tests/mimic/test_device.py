@@ -976,6 +976,71 @@ class TestDevice:
                         ]
                         assert skips == []
 
+                async def test_it_only_gives_events_to_operators_that_handle_them(self, record, final_future):
+                    class Power(Operator):
+                        handles = (DeviceMessages.GetPower, Events.SHUTTING_DOWN)
+
+                        async def respond(s, event):
+                            record.add(s, "power", event)
+
+                    class Everything(Operator):
+                        async def respond(s, event):
+                            record.add(s, "everything", event)
+
+                    class Quiet(Operator):
+                        pass
+
+                    class II(IO):
+                        io_source = "io1"
+
+                        async def apply(s):
+                            s.device.io[s.io_source] = s
+
+                    device = Device(
+                        "d073d5001337",
+                        Products.LCM2_A19,
+                        Device.Firmware(2, 80, 0),
+                        lambda d: Power(d),
+                        lambda d: Everything(d),
+                        lambda d: Quiet(d),
+                        lambda d: II(d),
+                        search_for_operators=False,
+                    )
+
+                    async with device.session(final_future):
+                        io = device.io["io1"]
+                        get_power = Events.INCOMING(device, io, pkt=DeviceMessages.GetPower())
+                        get_label = Events.INCOMING(device, io, pkt=DeviceMessages.GetLabel())
+                        annotation = Events.ANNOTATION(device, logging.INFO, "stuff")
+
+                        record.clear()
+                        for event in (get_power, get_label, annotation):
+                            assert await device.execute_event(event, None) is event
+
+                        assert record == [
+                            ("power", get_power),
+                            ("everything", get_power),
+                            ("everything", get_label),
+                            ("everything", annotation),
+                        ]
+
+                        assert isinstance(device.operators[2], Quiet)
+                        assert [op for _, op in device.responders_for(get_label)] == [io, device.operators[1]]
+                        assert all(not isinstance(op, Quiet) for _, op in device._responders)
+
+                        # Operators added later are included
+                        class Late(Operator):
+                            handles = (DeviceMessages.GetLabel,)
+
+                            async def respond(s, event):
+                                record.add(s, "late", event)
+
+                        await Late(device).apply()
+
+                        record.clear()
+                        assert await device.execute_event(get_label, None) is get_label
+                        assert record == [("everything", get_label), ("late", get_label)]
+
         class TestShortcuts:
             async def test_it_can_power_on(self, device, record):
                 device.has_power = False
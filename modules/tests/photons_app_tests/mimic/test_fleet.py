@@ -0,0 +1,104 @@
+import pytest
+from delfick_project.errors_pytest import assertRaises
+from photons_app import helpers as hp
+from photons_app.mimic import DeviceCollection
+from photons_app.mimic.fleet import BadFleetDescription, FleetKinds, parse_fleet
+from photons_app.mimic.transport import MemoryTarget
+from photons_messages import DeviceMessages, DiscoveryMessages, protocol_register
+from photons_products import Products
+
+
+class TestParseFleet:
+    def test_it_understands_counts_of_kinds(self):
+        fleet = parse_fleet("200 A19, 40 strips, 20 tile chains,")
+        assert [(count, kind.product) for count, kind in fleet] == [
+            (200, Products.LCM3_A19),
+            (40, Products.LCM2_Z),
+            (20, Products.LCM3_TILE),
+        ]
+        assert fleet[1][1] is FleetKinds["strip"]
+        assert fleet[2][1].value_store == {"chain_length": 5}
+
+    def test_it_understands_product_names(self):
+        ((count, kind),) = parse_fleet("3 LCM2_BEAM")
+        assert count == 3
+        assert kind.product is Products.LCM2_BEAM
+        assert kind.firmware == hp.Firmware(2, 80)
+
+    def test_it_complains_about_bad_descriptions(self):
+        with assertRaises(BadFleetDescription, "Expected '<count> <kind>'", got="some bulbs"):
+            parse_fleet("some bulbs")
+
+        with assertRaises(BadFleetDescription, "Unknown kind of device", kind="toasters"):
+            parse_fleet("2 toasters")
+
+
+class TestFleet:
+    async def test_it_can_make_many_devices_that_share_a_loop(self, final_future):
+        devices = DeviceCollection(record_limit=5, shared_incoming=True)
+        made = devices.add_fleet("20 bulbs, 5 strips, 2 tiles")
+        assert len(made) == 27
+        assert len(devices) == 27
+        assert len(set(devices.serials)) == 27
+        assert devices[made[-1].serial] is made[-1]
+        assert sorted(devices.stores) == devices.serials
+
+        async with devices.for_test(final_future) as sender:
+            assert all(device.io["MEMORY"].shared_incoming is devices.shared_incoming for device in made)
+
+            found, missing = await sender.find_specific_serials(devices.serials, broadcast=True)
+            assert len(found) == 27
+            assert missing == []
+
+            got = await sender(DeviceMessages.GetPower(), devices.serials)
+            assert sorted(pkt.serial for pkt in got) == devices.serials
+
+            assert len(sender.received) == 5
+
+            strip = made[20]
+            assert strip.cap.has_multizone
+            assert len(strip.attrs.zones) == 16
+
+    async def test_it_records_events_for_fleet_devices(self, final_future):
+        devices = DeviceCollection()
+        bulb, other = devices.add_fleet("2 bulbs")
+
+        async with devices.for_test(final_future) as sender:
+            devices.store(bulb).clear()
+            devices.store(other).clear()
+
+            await sender(DeviceMessages.SetPower(level=0), bulb.serial)
+
+            assert devices.store(bulb).device is bulb
+            devices.store(bulb).assertIncoming(DeviceMessages.SetPower(level=0), ignore=[DiscoveryMessages.GetService])
+            devices.store(other).assertNoSetMessages()
+
+
+class TestMemoryTarget:
+    @pytest.fixture()
+    def devices(self):
+        devices = DeviceCollection()
+        devices.add_fleet("3 bulbs")
+        return devices
+
+    async def test_it_can_record_nothing(self, final_future, devices):
+        async with devices.for_test(final_future):
+            configuration = {"final_future": final_future, "protocol_register": protocol_register}
+            target = MemoryTarget.create(configuration, {"devices": list(devices), "record_limit": 0})
+            async with target.session() as sender:
+                await sender(DiscoveryMessages.GetService(), devices.serials[0])
+                assert len(sender.received) == 0
+
+    async def test_it_records_everything_by_default(self, final_future, devices):
+        async with devices.for_test(final_future) as sender:
+            for serial in devices.serials:
+                await sender(DeviceMessages.GetPower(), serial)
+            got = [serial for _, serial, name, _ in sender.received if name == "GetPowerPayload"]
+            assert got == devices.serials
+            assert sender.devices == {device.serial: device for device in devices}
+
+    async def test_it_finds_devices_added_after_it_started(self, final_future, devices):
+        async with devices.for_test(final_future) as sender:
+            extra = devices.add_fleet("1 bulb")[0]
+            sender.transport_target.devices.append(extra)
+            assert sender.device_for(extra.serial) is extra
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from delfick_project.errors_pytest import assertRaises
+from photons_app.errors import PhotonsAppError
+from photons_app.mimic import DeviceCollection
+from photons_app.mimic.network import Network
+from photons_messages import DeviceMessages
+
+
+class TestNetwork:
+    def test_it_can_be_made_from_presets_options_or_another_network(self):
+        assert Network.create(None) is None
+
+        network = Network.create("wifi")
+        assert network.options.distribution == "normal"
+        assert Network.create(network) is network
+
+        network = Network.create({"latency": 0.1})
+        assert network.options.latency == 0.1
+        assert network.options.loss == 0
+        assert network.options.bandwidth is None
+
+        with assertRaises(PhotonsAppError, "Unknown network preset", wanted="dialup"):
+            Network.create("dialup")
+
+    def test_it_does_nothing_by_default(self):
+        network = Network.create({})
+        assert network.delays(100) == [0]
+        assert network.info == {"sent": 1, "lost": 0, "duplicated": 0, "reordered": 0}
+
+    def test_it_makes_the_same_choices_with_the_same_seed(self):
+        options = {"latency": 0.01, "jitter": 0.05, "loss": 0.2, "duplicate": 0.2, "reorder": 0.2, "seed": 3}
+
+        def choices(name):
+            network = Network.create(options, name=name)
+            return [network.delays(50) for _ in range(50)], network.info
+
+        assert choices("d073d5000001") == choices("d073d5000001")
+        assert choices("d073d5000001") != choices("d073d5000002")
+
+        delays, info = choices("d073d5000001")
+        assert info["sent"] == 50
+        assert info["lost"] == len([d for d in delays if not d])
+        assert info["duplicated"] == len([d for d in delays if len(d) == 2])
+        assert all(delay >= 0.01 for ds in delays for delay in ds)
+
+    def test_it_can_lose_duplicate_and_reorder(self):
+        assert Network.create({"loss": 1}).delays(10) == []
+
+        delays = Network.create({"latency": 0.1, "duplicate": 1}).delays(10)
+        assert delays == [0.1, 0.2]
+
+        network = Network.create({"reorder": 1, "reorder_delay": 0.3})
+        assert network.delays(10) == [0.3]
+        assert network.reordered == 1
+
+    def test_it_can_pick_jitter_from_distributions(self):
+        for distribution in ("uniform", "normal", "exponential"):
+            network = Network.create({"jitter": 0.1, "distribution": distribution, "seed": 1})
+            delays = [network.delays(10)[0] for _ in range(100)]
+            assert all(delay >= 0 for delay in delays)
+            assert len(set(delays)) > 1
+
+    def test_it_can_limit_bandwidth(self, FakeTime):
+        network = Network.create({"bandwidth": 1000})
+        with FakeTime() as t:
+            t.set(10)
+            assert network.delays(100) == [pytest.approx(0.1)]
+            assert network.delays(100) == [pytest.approx(0.2)]
+
+            t.set(11)
+            assert network.delays(500) == [pytest.approx(0.5)]
+
+
+class TestNetworkOnDevices:
+    async def test_it_delays_messages_to_and_from_devices(self, final_future):
+        devices = DeviceCollection()
+        made = devices.add_fleet("2 bulbs", network={"latency": 0.05})
+
+        async with devices.for_test(final_future) as sender:
+            start = time.time()
+            got = await sender(DeviceMessages.GetPower(), made[0].serial)
+            assert len(got) == 1
+            assert time.time() - start >= 0.1
+
+            io = made[0].io["MEMORY"]
+            assert io.network.sent > 0
+            assert made[1].io["MEMORY"].network is not io.network
+
+    async def test_it_can_share_one_network_between_devices(self, final_future):
+        devices = DeviceCollection()
+        network = Network.create({"duplicate": 1})
+        made = devices.add_fleet("2 bulbs", network=network)
+
+        async with devices.for_test(final_future) as sender:
+            got = await sender(DeviceMessages.GetPower(), devices.serials)
+            assert sorted(pkt.serial for pkt in got) == devices.serials
+
+            assert all(device.io["MEMORY"].network is network for device in made)
+            assert network.duplicated == network.sent
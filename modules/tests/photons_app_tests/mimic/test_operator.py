@@ -7,6 +7,7 @@ from photons_app import helpers as hp
 from photons_app.mimic.device import Device
 from photons_app.mimic.event import Events
 from photons_app.mimic.operator import LambdaSetter, Operator, StaticSetter, Viewer
+from photons_messages import DeviceMessages
 from photons_products import Products
 
 
@@ -196,6 +197,25 @@ class TestOperator:
                 assert device.operators == []
                 assert would == [custom1, custom2]
 
+    class TestHandles:
+        def test_it_responds_to_everything_by_default(self):
+            assert Operator.handles is None
+            assert Operator.responds_to(Events.ANNOTATION)
+            assert Operator.responds_to(Events.INCOMING, (1024, 20))
+
+        def test_it_can_say_what_events_and_messages_it_responds_to(self):
+            class Op(Operator):
+                handles = (DeviceMessages.GetPower, Events.SHUTTING_DOWN)
+
+            get_power = (DeviceMessages.GetPower.Payload.Meta.protocol, DeviceMessages.GetPower.Payload.message_type)
+            get_label = (DeviceMessages.GetLabel.Payload.Meta.protocol, DeviceMessages.GetLabel.Payload.message_type)
+
+            assert Op.responds_to(Events.INCOMING, get_power)
+            assert not Op.responds_to(Events.INCOMING, get_label)
+            assert Op.responds_to(Events.SHUTTING_DOWN)
+            assert not Op.responds_to(Events.POWER_OFF)
+            assert not Op.responds_to(Events.ANNOTATION)
+
     class TestCanHaveOptions:
         def test_it_complains_if_instantiated_with_bad_options(self, device):
             class Op(Operator):
@@ -1,7 +1,10 @@
+from unittest import mock
+
 import pytest
 from photons_app import helpers as hp
 from photons_app.mimic.event import Events
 from photons_app.mimic.operators.device import Collection
+from photons_canvas.orientation import Orientation, reorient
 from photons_messages import (
     DeviceMessages,
     LightLastHevCycleResult,
@@ -12,6 +15,7 @@ from photons_messages import (
     TileMessages,
     Waveform,
 )
+from photons_messages.fields import Color
 from photons_products import Family, Products
 
 devices = pytest.helpers.mimic()
@@ -303,6 +307,13 @@ class TestMatrix:
     def assertResponse(self, device, **attrs):
         return makeAssertResponse(device, **attrs)
 
+    @pytest.fixture()
+    def color_cache(self):
+        # Colors unpacked from the replies would otherwise be in the cache
+        # shared with every other test under their rounded hue
+        with mock.patch.object(Color.Meta, "cache", {}):
+            yield
+
     async def test_it_responds_to_changing_user_position(self, device, assertResponse):
         await assertResponse(
             TileMessages.SetUserPosition(tile_index=1, user_x=0, user_y=1),
@@ -359,6 +370,30 @@ class TestMatrix:
             matrix_effect=TileEffectType.FLAME,
         )
 
+    async def test_it_responds_to_setting_colors(self, device, assertResponse, color_cache):
+        colors = [hp.Color(i, 1, 1, 3500) for i in range(64)]
+        await assertResponse(TileMessages.Set64(tile_index=1, length=1, x=0, y=0, width=8, colors=colors), True)
+        assert device.attrs.chain[1].colors == colors
+
+        # Only the rectangle we give is changed
+        changed = [hp.Color(300 + i, 0, 1, 9000) for i in range(4)]
+        await assertResponse(TileMessages.Set64(tile_index=1, length=1, x=6, y=6, width=2, colors=changed), True)
+
+        want = list(colors)
+        want[54], want[55], want[62], want[63] = changed
+        assert device.attrs.chain[1].colors == want
+
+    async def test_it_knows_what_colors_a_person_would_see(self, device, assertResponse, color_cache):
+        colors = [hp.Color(i, 1, 1, 3500) for i in range(64)]
+        await assertResponse(TileMessages.Set64(tile_index=0, length=1, x=0, y=0, width=8, colors=colors), True)
+
+        tile = device.attrs.chain[0]
+        assert tile.upright_colors == colors
+
+        tile.accel_meas_x = -10
+        assert tile.orientation is Orientation.RotatedLeft
+        assert tile.upright_colors == reorient(colors, Orientation.RotatedRight)
+
     async def test_it_doesnt_respond_to_tile_messages_if_the_product_doesnt_have_chain(self):
         device = devices["a19"]
         assert "matrix_effect" not in device.attrs
@@ -0,0 +1,146 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from photons_canvas.animations.infrastructure.cannons import Sem
+from photons_canvas.animations.infrastructure.pacing import AdaptiveEvery
+from photons_canvas.animations.infrastructure.stats import FrameStats
+from photons_canvas.animations.run_options import make_run_options
+
+
+class Animation:
+    def __init__(self, every):
+        self.every = every
+        self.frame_stats = FrameStats(self)
+
+
+@pytest.fixture()
+def options():
+    return make_run_options({"adaptive": {"enabled": True, "check_every": 4, "min_every": 0.05, "max_every": 0.2}}, None).adaptive
+
+
+def render(animation, *durations):
+    for duration in durations:
+        animation.frame_stats.rendered(duration)
+
+
+class TestAdaptiveEvery:
+    def test_it_has_defaults_that_are_turned_off(self):
+        adaptive = make_run_options({}, None).adaptive
+        assert not adaptive.enabled
+        assert adaptive.min_every == 0.04
+        assert adaptive.max_every == 0.5
+        assert adaptive.check_every == 20
+        assert adaptive.step == 0.2
+
+    def test_it_only_decides_after_enough_frames(self, options):
+        animation = Animation(0.1)
+        pacer = AdaptiveEvery(animation, options)
+
+        render(animation, 0.09, 0.09, 0.09)
+        assert pacer.frame() is None
+        assert animation.every == 0.1
+
+        render(animation, 0.09)
+        assert pacer.frame() == 0.12
+        assert animation.every == 0.12
+        assert pacer.info == {"every": 0.12, "min_every": 0.05, "max_every": 0.2, "changes": 1}
+
+    def test_it_speeds_up_when_there_is_room(self, options):
+        animation = Animation(0.1)
+        pacer = AdaptiveEvery(animation, options)
+
+        for expected in (0.0833, 0.0694, 0.0578, 0.05, 0.05):
+            render(animation, 0.001, 0.001, 0.001, 0.001)
+            pacer.frame()
+            assert animation.every == expected
+
+        assert pacer.changes == 4
+
+    def test_it_slows_down_when_frames_are_dropped(self, options):
+        animation = Animation(0.1)
+        pacer = AdaptiveEvery(animation, options)
+
+        render(animation, 0.001, 0.001, 0.001, 0.001)
+        animation.frame_stats.dropped_by_semaphore += 1
+        assert pacer.frame() == 0.12
+
+        render(animation, 0.001, 0.001, 0.001, 0.001)
+        animation.frame_stats.skipped += 1
+        assert pacer.frame() == 0.144
+
+        for _ in range(3):
+            render(animation, 0.001, 0.001, 0.001, 0.001)
+            animation.frame_stats.skipped += 1
+            pacer.frame()
+        assert animation.every == 0.2
+
+    def test_it_compares_drops_to_how_many_times_it_sent_to_each_device(self, options):
+        animation = Animation(0.1)
+        pacer = AdaptiveEvery(animation, options)
+
+        def frames(dropped):
+            for _ in range(4):
+                render(animation, 0.05)
+                for _ in range(10):
+                    animation.frame_stats.sent(0.001)
+            animation.frame_stats.dropped_by_semaphore += dropped
+
+        # One drop out of 41 sends to ten devices isn't enough to slow down
+        frames(1)
+        assert pacer.frame() is None
+        assert animation.every == 0.1
+
+        frames(3)
+        assert pacer.frame() == 0.12
+
+    def test_it_uses_ack_latency(self, options):
+        animation = Animation(0.1)
+        cannon = mock.Mock(name="cannon", sem=Sem())
+        pacer = AdaptiveEvery(animation, options, cannon=cannon)
+
+        cannon.sem.latencies.extend([0.3, 0.1])
+        render(animation, 0.001, 0.001, 0.001, 0.001)
+        assert pacer.frame() == 0.12
+
+        # Latency that is neither too slow nor very fast leaves every alone
+        cannon.sem.latencies.clear()
+        cannon.sem.latencies.append(0.1)
+        render(animation, 0.001, 0.001, 0.001, 0.001)
+        assert pacer.frame() is None
+        assert animation.every == 0.12
+
+    def test_it_leaves_animations_alone_that_choose_every_outside_the_bounds(self, options):
+        animation = Animation(1)
+        pacer = AdaptiveEvery(animation, options)
+
+        render(animation, 0.001, 0.001, 0.001, 0.001)
+        assert pacer.frame() is None
+        assert animation.every == 1
+
+        # And starts again from what the animation chooses for itself
+        animation.every = 0.15
+        render(animation, 0.14, 0.14, 0.14, 0.14)
+        assert pacer.frame() == 0.18
+
+
+class TestSemAckLatency:
+    async def test_it_records_how_long_acks_take(self, FakeTime):
+        sem = Sem()
+        assert sem.ack_latency is None
+
+        with FakeTime() as t:
+            t.set(1)
+            acked = asyncio.Future()
+            failed = asyncio.Future()
+            cancelled = asyncio.Future()
+            for result in (acked, failed, cancelled):
+                sem.add("d073d5000001", result)
+
+            t.set(1.25)
+            acked.set_result([])
+            failed.set_exception(TimeoutError())
+            cancelled.cancel()
+            await asyncio.sleep(0)
+
+        assert sem.ack_latency == 0.25
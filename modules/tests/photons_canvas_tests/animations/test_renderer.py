@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from unittest import mock
+
+from photons_app import helpers as hp
+from photons_canvas import Canvas
+from photons_canvas.animations.infrastructure.renderer import Renderer
+from photons_canvas.animations.infrastructure.state import State
+from photons_canvas.animations.infrastructure.stats import FrameStats
+from photons_canvas.orientation import Orientation
+from photons_canvas.points import containers as cont
+from photons_messages import TileMessages
+from photons_products import Products
+
+
+def make_canvas():
+    device = cont.Device("d073d5001337", Products.LCM3_TILE.cap)
+    canvas = Canvas()
+    canvas.add_parts(cont.Part(0, 0, 2, 2, 0, Orientation.RightSideUp, device))
+    return canvas
+
+
+class TestRenderer:
+    async def test_it_renders_in_a_thread(self):
+        threads = set()
+
+        def layer(point, canvas):
+            threads.add(threading.current_thread())
+            return (100, 1, 1, 3500)
+
+        renderer = Renderer(workers=1)
+        try:
+            canvas = make_canvas()
+            msgs = await renderer.render(canvas, layer, duration=2)
+        finally:
+            renderer.shutdown()
+
+        assert threads and threading.current_thread() not in threads
+        assert len(msgs) == 1
+        assert msgs[0] | TileMessages.Set64
+        assert msgs[0].duration == 2
+        assert all(canvas[point] == (100, 1, 1, 3500) for point in canvas.points)
+
+        assert renderer.info == {"workers": 1, "rendered": 1, "dropped": 0}
+
+    class TestState:
+        def make_state(self, renderer, latest_tick=3):
+            state = State(hp.create_future(), renderer=renderer)
+            state.animation = mock.Mock(name="animation", latest_tick=latest_tick, every=0.075, duration=1, retries=False, random_orientations=False)
+            state.animation.frame_stats = FrameStats(state.animation)
+            return state
+
+        def test_it_drops_frames_that_are_out_of_date(self):
+            renderer = Renderer()
+            state = self.make_state(renderer)
+
+            assert state.skip_frame((2, 0))
+            assert not state.skip_frame((3, 0))
+            assert renderer.dropped == 1
+            assert state.animation.frame_stats.skipped == 1
+
+        async def test_it_doesnt_add_parts_while_a_frame_is_rendering(self):
+            renderer = Renderer()
+            state = self.make_state(renderer)
+            state.canvas = make_canvas()
+            state.animation.rearrange.side_effect = lambda canvas: canvas
+            state.animation.process_event = mock.AsyncMock(name="process_event")
+
+            started = threading.Event()
+            release = threading.Event()
+
+            def layer(point, canvas):
+                started.set()
+                release.wait(5)
+                return (100, 1, 1, 3500)
+
+            async def render():
+                return [msgs async for msgs in state.send_canvas(layer)]
+
+            device = cont.Device("d073d5001338", Products.LCM3_TILE.cap)
+            part = cont.Part(0, 0, 2, 2, 0, Orientation.RightSideUp, device)
+
+            try:
+                rendering = hp.async_as_background(render())
+                await hp.get_event_loop().run_in_executor(None, started.wait, 5)
+
+                adding = hp.async_as_background(state.add_collected([[part]]))
+                await asyncio.sleep(0.05)
+                assert not adding.done()
+                assert part not in state.canvas.parts
+                state.animation.process_event.assert_not_called()
+
+                release.set()
+                ((msg,),) = await rendering
+                assert msg.target[:6] == bytes.fromhex("d073d5001337")
+
+                await adding
+                assert part in state.canvas.parts
+                assert renderer.info == {"workers": 1, "rendered": 1, "dropped": 0}
+            finally:
+                release.set()
+                renderer.shutdown()
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from photons_canvas.animations.infrastructure.stats import FrameStats, Histogram
+
+
+class TestHistogram:
+    def test_it_counts_durations_into_buckets(self):
+        histogram = Histogram()
+        assert histogram.info == {
+            "count": 0,
+            "mean": 0,
+            "max": 0,
+            "buckets": {"0.005": 0, "0.01": 0, "0.025": 0, "0.05": 0, "0.075": 0, "0.1": 0, "0.25": 0, "0.5": 0, "1": 0, "inf": 0},
+        }
+
+        for duration in (0.001, 0.005, 0.02, 0.3, 2):
+            histogram.add(duration)
+
+        assert histogram.info == {
+            "count": 5,
+            "mean": 0.4652,
+            "max": 2,
+            "buckets": {"0.005": 2, "0.01": 0, "0.025": 1, "0.05": 0, "0.075": 0, "0.1": 0, "0.25": 0, "0.5": 1, "1": 0, "inf": 1},
+        }
+
+
+class TestFrameStats:
+    def test_it_knows_how_well_the_animation_keeps_up(self, FakeTime):
+        animation = mock.Mock(name="animation", every=0.1)
+        stats = FrameStats(animation, window=3)
+
+        with FakeTime() as t:
+            info = stats.info
+            assert info["fps"] == 0
+            assert stats.average_fps == 0
+            assert info["target_fps"] == 10
+            assert info["frames"] == 0
+
+            t.set(1)
+            stats.rendered(0.01)
+            t.set(1.2)
+            stats.rendered(0.15)
+            t.set(1.4)
+            stats.rendered(0.05)
+            stats.sent(0.02)
+            stats.skipped += 1
+            stats.dropped_by_semaphore += 2
+
+            info = stats.info
+            assert info["fps"] == 5
+            assert info["frames"] == 3
+            assert info["late"] == 1
+            assert info["skipped"] == 1
+            assert info["dropped_by_semaphore"] == 2
+            assert info["render"]["count"] == 3
+            assert info["send"]["count"] == 1
+
+            # Only the last few frames count towards fps
+            t.set(1.5)
+            stats.rendered(0.01)
+            assert stats.fps == round(2 / 0.3, 2)
+
+            # But every frame since the first counts towards the average
+            assert stats.first_frame == 1
+            assert stats.average_fps == round(3 / 0.5, 2)
+
+        animation.every = 0
+        assert stats.info["target_fps"] is None
@@ -0,0 +1,260 @@
+import pytest
+from delfick_project.norms import Meta
+from photons_app import helpers as hp
+from photons_canvas import Canvas
+from photons_canvas.animations import Animation, Finish
+from photons_canvas.animations.registered import marquee, nyan, pacman
+from photons_canvas.animations.infrastructure.state import State
+from photons_canvas.animations.infrastructure.timeline import (
+    Player,
+    Recorder,
+    Timeline,
+    TimelineCache,
+    key_for,
+    layout_for,
+)
+from photons_canvas.orientation import Orientation
+from photons_canvas.points import containers as cont
+from photons_products import Products
+
+
+class Counter(Animation):
+    """Changes color every second tick and finishes after six ticks"""
+
+    every = 0.1
+    pre_renderable = True
+
+    async def process_event(self, event):
+        if not event.is_tick:
+            return
+
+        event.state = (event.state or 0) + 1
+        if event.state > 6:
+            raise Finish("Done")
+
+        hue = (event.state // 2) * 10
+        return lambda point, canvas: (hue, 1, 1, 3500)
+
+
+class Cycle(Animation):
+    """Goes through three colors forever"""
+
+    every = 0.1
+    pre_renderable = True
+
+    async def process_event(self, event):
+        if not event.is_tick:
+            return
+
+        event.state = (event.state or 0) + 1
+        hue = (event.state % 3) * 10
+        return lambda point, canvas: (hue, 1, 1, 3500)
+
+    def pre_render_position(self, state):
+        return state % 3
+
+
+def make_part(serial="d073d5001337", part_number=0, user_x=0):
+    device = cont.Device(serial, Products.LCM3_TILE.cap)
+    return cont.Part(user_x, 0, 8, 8, part_number, Orientation.RightSideUp, device)
+
+
+async def record(*parts, max_frames=2000, animation=None):
+    if animation is None:
+        animation = Counter(hp.create_future(), None)
+
+    state = State(hp.create_future())
+    await state.set_animation(animation, False)
+    await state.add_collected([list(parts)])
+    return state, await Recorder(state, max_frames=max_frames).record()
+
+
+marquees = [
+    (marquee.MarqueeAnimation, marquee.Options),
+    (nyan.NyanAnimation, nyan.Options),
+    (pacman.PacmanAnimation, pacman.Options),
+]
+
+
+def make_marquee(options, kls=marquee.MarqueeAnimation, options_kls=marquee.Options):
+    return kls(hp.create_future(), options_kls.FieldSpec().normalise(Meta.empty(), options))
+
+
+def hues(msg):
+    return {round(color.hue) for color in msg.colors}
+
+
+class TestRecorder:
+    async def test_it_only_records_parts_that_changed(self):
+        state, timeline = await record(make_part())
+
+        assert timeline.every == 0.1
+        assert timeline.parts == [("d073d5001337", 0)]
+        assert not timeline.loops
+        assert [[index for index, _ in frame] for frame in timeline.frames] == [[0], [0], [], [0], [], [0]]
+
+        # The state is left on the last frame
+        assert set(state.canvas.points.values()) == {(30, 1, 1, 3500)}
+
+    async def test_it_gives_up_if_the_animation_does_not_finish_or_repeat(self):
+        _, timeline = await record(make_part(), max_frames=3)
+        assert timeline is None
+
+    async def test_it_records_until_the_animation_repeats(self):
+        _, timeline = await record(make_part(), animation=Cycle(hp.create_future(), None))
+        assert len(timeline) == 4
+        assert timeline.loops
+        assert timeline.loop_start == 1
+
+        # The last frame is the same as the first
+        assert timeline.frames[3] == timeline.frames[0]
+
+    async def test_it_records_one_scroll_of_marquee_animations(self):
+        for kls, options_kls in marquees:
+            animation = make_marquee({"text": "HI", "text_color": "100", "speed": 1}, kls, options_kls)
+            assert animation.pre_renderable
+
+            _, timeline = await record(make_part(), animation=animation)
+            assert timeline is not None, kls
+            assert timeline.loops
+
+            # The last frame is the same as the one before loop_start, so playing
+            # past the end carries on from loop_start
+            player = Player(timeline, keyframe_every=1)
+            before = [m.colors for m in player.play(timeline.loop_start - 1)]
+            start = [m.colors for m in player.play(timeline.loop_start)]
+
+            assert [m.colors for m in player.play(len(timeline) - 1)] == before
+            assert [m.colors for m in player.play(len(timeline))] == start
+
+        animation = make_marquee({"text": "HI", "text_color": "100", "speed": 1})
+        _, timeline = await record(make_part(), animation=animation)
+
+        # One frame for every pixel the text moves, and one for it being back at the start
+        width = marquee.Characters(*[marquee.alphabet_8[ch] for ch in "HI"]).width
+        assert len(timeline) == width + 8 + 1
+        assert timeline.loop_start == 1
+
+    async def test_it_records_marquee_until_it_finishes_if_it_has_iterations(self):
+        animation = make_marquee({"text": "HI", "text_color": "100", "speed": 1, "num_iterations": 2})
+        _, timeline = await record(make_part(), animation=animation)
+
+        width = marquee.Characters(*[marquee.alphabet_8[ch] for ch in "HI"]).width
+        assert not timeline.loops
+        assert len(timeline) == (width + 8) * 2 + 1
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"text_color": "rainbow", "speed": 1}, {"text_color": "100:200", "speed": 1}, {"text_color": "100", "speed": "0.5-1"}],
+    )
+    def test_marquee_animations_arent_pre_rendered_if_they_are_random(self, options):
+        for kls, options_kls in marquees:
+            assert not make_marquee(options, kls, options_kls).pre_renderable
+
+    def test_it_only_supports_tiles(self):
+        assert not Recorder.supports(Canvas())
+
+        canvas = Canvas()
+        canvas.add_parts(make_part())
+        assert Recorder.supports(canvas)
+
+        strip = cont.Device("d073d5001338", Products.LCM2_Z.cap)
+        canvas.add_parts(cont.Part(0, 1, 16, 1, 0, Orientation.RightSideUp, strip))
+        assert not Recorder.supports(canvas)
+
+
+class TestPlayer:
+    async def test_it_plays_frames(self):
+        _, timeline = await record(make_part(), make_part("d073d5001338", user_x=1))
+        player = Player(timeline, keyframe_every=100)
+
+        msgs = player.play(0)
+        assert [(m.serial, m.tile_index) for m in msgs] == [("d073d5001337", 0), ("d073d5001338", 0)]
+        assert all(hues(m) == {0} for m in msgs)
+
+        assert all(hues(m) == {10} for m in player.play(1))
+        assert player.play(2) == []
+        assert player.play(2) == []
+        assert not player.finished
+
+        # Skipped frames still have their changes sent
+        msgs = player.play(5)
+        assert len(msgs) == 2
+        assert all(hues(m) == {30} for m in msgs)
+        assert player.finished
+
+        canvas = Canvas()
+        canvas.add_parts(make_part())
+        player.apply_to(canvas)
+        assert {(round(h), s, b, k) for h, s, b, k in canvas.points.values()} == {(30, 1, 1, 3500)}
+
+    async def test_it_sends_everything_every_so_often(self):
+        _, timeline = await record(make_part())
+        player = Player(timeline, keyframe_every=3)
+
+        assert len(player.play(0)) == 1
+        assert len(player.play(1)) == 1
+        assert len(player.play(2)) == 1
+        assert player.play(3) != []
+        assert player.play(4) == []
+
+    async def test_it_can_loop(self):
+        _, timeline = await record(make_part(), animation=Cycle(hp.create_future(), None))
+        player = Player(timeline, keyframe_every=100)
+
+        assert hues(player.play(0)[0]) == {10}
+        assert hues(player.play(2)[0]) == {0}
+        assert hues(player.play(3)[0]) == {10}
+
+        # And we go back to the frame after the first one
+        assert hues(player.play(4)[0]) == {20}
+        assert hues(player.play(5)[0]) == {0}
+        assert hues(player.play(6)[0]) == {10}
+        assert hues(player.play(7)[0]) == {20}
+        assert not player.finished
+
+    def test_it_sends_a_keyframe_every_half_second_by_default(self):
+        assert Player(Timeline(0.1, [])).keyframe_every == 5
+        assert Player(Timeline(2, [])).keyframe_every == 1
+
+
+class TestTimeline:
+    async def test_it_can_be_saved_and_loaded(self):
+        _, timeline = await record(make_part(), make_part(part_number=1, user_x=1), animation=Cycle(hp.create_future(), None))
+
+        bts = timeline.dumps()
+        assert len(bts) < sum(len(payload) for frame in timeline.frames for _, payload in frame)
+
+        loaded = Timeline.loads(bts)
+        assert loaded.every == timeline.every
+        assert loaded.parts == timeline.parts
+        assert loaded.loops is True
+        assert loaded.loop_start == 1
+        assert loaded.frames == timeline.frames
+
+    async def test_it_can_be_cached_on_disk(self, tmp_path):
+        _, timeline = await record(make_part())
+
+        TimelineCache(str(tmp_path / "timelines")).set("stuff", timeline)
+        assert (tmp_path / "timelines" / "stuff.timeline").exists()
+
+        loaded = TimelineCache(str(tmp_path / "timelines")).get("stuff")
+        assert loaded.frames == timeline.frames
+        assert TimelineCache(str(tmp_path / "timelines")).get("other") is None
+
+        (tmp_path / "timelines" / "stuff.timeline").write_bytes(b"nope")
+        assert TimelineCache(str(tmp_path / "timelines")).get("stuff") is None
+
+        memory = TimelineCache()
+        memory.set("stuff", timeline)
+        assert memory.get("stuff") is timeline
+
+    def test_it_has_a_key_for_an_animation_on_a_layout(self):
+        canvas = Canvas()
+        canvas.add_parts(make_part())
+
+        key = key_for(Counter(hp.create_future(), None), layout_for(canvas))
+        assert key == key_for(Counter(hp.create_future(), None), layout_for(canvas))
+
+        canvas.add_parts(make_part(part_number=1, user_x=1))
+        assert key != key_for(Counter(hp.create_future(), None), layout_for(canvas))
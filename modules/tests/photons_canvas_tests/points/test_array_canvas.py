@@ -0,0 +1,229 @@
+import pytest
+from photons_canvas.points import containers as cont
+from photons_canvas.points.canvas import Canvas, PartLayer
+from photons_messages import TileMessages
+from photons_messages.fields import Color
+
+np = pytest.importorskip("numpy")
+
+from photons_canvas.points.array_canvas import ArrayCanvas  # noqa: E402
+
+
+class TestArrayCanvas:
+    def test_it_has_start_properties(self):
+        canvas = ArrayCanvas()
+
+        for attr in ("top", "left", "right", "bottom", "width", "height"):
+            assert getattr(canvas, attr) is None
+
+        assert canvas.point_to_parts == {}
+        assert canvas.point_to_devices == {}
+        assert not canvas
+        assert not canvas.points
+
+    def test_it_can_get_set_and_delete_points(self):
+        canvas = ArrayCanvas()
+        assert (1, 2) not in canvas
+        assert canvas[1, 2] is None
+
+        canvas[1, 2] = (200, 0.5, 0.25, 3500)
+        assert (1, 2) in canvas
+        assert canvas
+        assert canvas[1, 2] == (200, 0.5, 0.25, 3500)
+        assert canvas((1, 2), canvas) == (200, 0.5, 0.25, 3500)
+        assert canvas.bounds == ((1, 1), (2, 2), (0, 0))
+
+        canvas[3, 5] = Color(100, 1, 1, 9000)
+        assert canvas[3, 5] == (100, 1, 1, 9000)
+        assert canvas.bounds == ((1, 3), (5, 2), (2, 3))
+
+        canvas[4, 4] = None
+        assert (4, 4) in canvas
+        assert canvas[4, 4] is None
+        assert dict(canvas.points) == {
+            (1, 2): (200, 0.5, 0.25, 3500),
+            (3, 5): (100, 1, 1, 9000),
+            (4, 4): None,
+        }
+
+        del canvas[3, 5]
+        del canvas[4, 4]
+        assert (3, 5) not in canvas
+        assert canvas.bounds == ((1, 1), (2, 2), (0, 0))
+        assert dict(canvas.points) == {(1, 2): (200, 0.5, 0.25, 3500)}
+
+    def test_it_can_grow_past_its_capacity(self):
+        canvas = ArrayCanvas(capacity=2)
+        for i in range(100):
+            canvas[i, 0] = (i, 1, 1, 3500)
+
+        assert len(canvas.points) == 100
+        assert all(canvas[i, 0] == (i, 1, 1, 3500) for i in range(100))
+
+    def test_it_behaves_like_a_canvas_when_adding_parts(self, V):
+        part1 = V.make_part(V.device, 1, user_x=0, user_y=0)
+        part2 = V.make_part(V.device, 2, user_x=1, user_y=0)
+        part3 = V.make_part(V.other_device, 1, user_x=0.5, user_y=0)
+        colors = [(i, 1, 0.5, 3500) for i in range(64)]
+
+        canvas = Canvas()
+        canvas.add_parts((part1, colors), part2, part3, zero_color=(0, 0, 0, 0))
+
+        array_canvas = ArrayCanvas()
+        array_canvas.add_parts((part1, colors), part2, part3, zero_color=(0, 0, 0, 0))
+
+        assert array_canvas.parts == canvas.parts
+        assert array_canvas.devices == canvas.devices
+        assert array_canvas.bounds == canvas.bounds
+        assert dict(array_canvas.points) == canvas.points
+        assert dict(array_canvas.point_to_parts) == dict(canvas.point_to_parts)
+        assert dict(array_canvas.point_to_devices) == dict(canvas.point_to_devices)
+
+    def test_it_clones_without_sharing_colors(self, V):
+        part = V.make_part(V.device, 1, user_x=0, user_y=0)
+
+        canvas = ArrayCanvas()
+        canvas.add_parts(part, zero_color=(0, 0, 0, 0))
+        canvas[100, 100] = (1, 1, 1, 3500)
+
+        clone = canvas.clone()
+        assert clone.bounds == canvas.bounds
+        assert clone.parts == canvas.parts
+        assert dict(clone.points) == dict(canvas.points)
+        assert clone._layout is canvas._layout
+
+        clone[0, 0] = (200, 1, 1, 3500)
+        assert clone[0, 0] == (200, 1, 1, 3500)
+        assert canvas[0, 0] == (0, 0, 0, 0)
+
+        # Adding a point only changes the clone
+        clone[200, 200] = (1, 1, 1, 3500)
+        assert clone._layout is not canvas._layout
+        assert (200, 200) in clone
+        assert (200, 200) not in canvas
+
+    def test_it_can_read_and_write_parts_at_once(self, V):
+        part = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+
+        canvas = ArrayCanvas()
+        canvas.add_parts(part)
+        assert canvas.colors_for(part) == [None, None, None, None]
+
+        canvas.set_colors(part, [(1, 1, 1, 3500), None, Color(3, 0, 1, 9000), (4, 0.5, 0.5, 2500)])
+        assert canvas.colors_for(part) == [(1, 1, 1, 3500), None, (3, 0, 1, 9000), (4, 0.5, 0.5, 2500)]
+
+        canvas.set_colors(part, np.array([[i * 10, 1, 0.5, 3500] for i in range(4)]))
+        assert canvas.colors_for(part) == [(i * 10, 1, 0.5, 3500) for i in range(4)]
+
+        canvas.fill((5, 0, 0, 4000), part=part)
+        assert canvas.colors_for(part) == [(5, 0, 0, 4000)] * 4
+
+        canvas[50, 50] = (1, 1, 1, 1)
+        canvas.fill(None)
+        assert canvas.colors_for(part) == [None] * 4
+        assert canvas[50, 50] is None
+
+    def test_it_can_adjust_all_points(self):
+        canvas = ArrayCanvas()
+        canvas[0, 0] = (350, 0.5, 0.75, 3500)
+        canvas[1, 0] = (10, 1, 0.25, 65000)
+        canvas[2, 0] = None
+
+        canvas.adjust_all(hue_change=20, brightness_change=0.5, kelvin_change=1000)
+        assert canvas[0, 0] == (360, 0.5, 1, 4500)
+        assert canvas[1, 0] == (30, 1, 0.75, 65535)
+        assert canvas[2, 0] is None
+
+        canvas.adjust_all(saturation_change=(0,), kelvin_change=(2500,))
+        assert canvas[0, 0] == (360, 0, 1, 2500)
+        assert canvas[1, 0] == (30, 0, 0.75, 2500)
+
+    def test_it_makes_the_same_messages_as_a_canvas(self, V):
+        def layer(point, canvas):
+            if point[0] % 2 == 0:
+                return None
+            return (abs(point[0] * point[1]), 1, 1, 3500)
+
+        got = {}
+        for kls in (Canvas, ArrayCanvas):
+            part1 = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+            part2 = V.make_part(V.other_device, 2, user_x=25 / 8, user_y=1, width=2, height=2)
+
+            canvas = kls()
+            canvas.add_parts(part1, part2)
+            msgs = canvas.msgs(layer, onto=canvas.points)
+            assert all(m | TileMessages.Set64 for m in msgs)
+            got[kls] = ([m.colors for m in msgs], dict(canvas.points))
+
+        assert got[ArrayCanvas] == got[Canvas]
+
+    def test_it_can_use_a_clone_as_the_layer(self, V):
+        part1 = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+        part2 = V.make_part(V.device, 2, user_x=1, user_y=0, width=2, height=2)
+
+        canvas = ArrayCanvas()
+        canvas.add_parts(part1, part2)
+
+        layer = canvas.clone()
+        layer.fill((100, 1, 0.5, 3500), part=part1)
+
+        msgs = canvas.msgs(layer, onto=canvas.points)
+        assert len(msgs) == 2
+        assert msgs[0].colors[:4] == [Color(100, 1, 0.5, 3500)] * 4
+        assert msgs[1].colors[:4] == [Color(0, 0, 0, 0)] * 4
+
+        assert canvas.colors_for(part1) == [(100, 1, 0.5, 3500)] * 4
+        assert canvas.colors_for(part2) == [None] * 4
+        assert all(point in canvas for point in part2.points)
+
+    def test_it_can_be_rearranged(self, V):
+        from photons_canvas.points import rearrange
+
+        part1 = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+        part2 = V.make_part(V.device, 2, user_x=3, user_y=3, width=2, height=2)
+
+        canvas = ArrayCanvas()
+        canvas.add_parts(part1, part2)
+
+        new = rearrange.rearrange(canvas, rearrange.Straight())
+        assert isinstance(new, ArrayCanvas)
+        assert [(p.user_x, p.user_y) for p in new.parts] == [(0, 0), (0.25, 0)]
+        assert all(isinstance(p, cont.Part) for p in new.parts)
+
+    def test_it_dims_parts_like_a_canvas(self, V):
+        part = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+
+        got = {}
+        for kls in (Canvas, ArrayCanvas):
+            canvas = kls()
+            canvas.add_parts(part)
+            canvas[(0, 0)] = (200, 0.5, 0.5, 9000)
+            canvas[(1, 0)] = (100, 1, 0, 3500)
+            canvas[(0, -1)] = (100, 1, 0.25, 3500)
+            got[kls] = (canvas.dim_part(part, 0.25), canvas.dim_part(part, -0.75))
+
+        assert got[ArrayCanvas] == got[Canvas]
+        assert got[Canvas] == (
+            [(200, 0.5, 0.25, 9000), None, None, None],
+            [(200, 0.5, 1, 9000), None, (100, 1, 1, 3500), None],
+        )
+
+    def test_it_can_use_arrays_from_a_part_layer(self, V):
+        part1 = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+        part2 = V.make_part(V.device, 2, user_x=1, user_y=0, width=2, height=2)
+
+        def colors(part, canvas):
+            if part.part_number == 1:
+                return np.array([[i * 10, 1, 0.5, 3500] for i in range(4)])
+            return [(1, 0, 1, 9000), None, None, (2, 0, 1, 9000)]
+
+        canvas = ArrayCanvas()
+        canvas.add_parts(part1, part2)
+
+        msgs = canvas.msgs(PartLayer(colors), onto=canvas.points)
+        assert len(msgs) == 2
+        assert msgs[0].colors[:4] == [Color(i * 10, 1, 0.5, 3500) for i in range(4)]
+        assert msgs[1].colors[:4] == [Color(1, 0, 1, 9000), Color(0, 0, 0, 0), Color(0, 0, 0, 0), Color(2, 0, 1, 9000)]
+
+        assert canvas.colors_for(part1) == [(i * 10, 1, 0.5, 3500) for i in range(4)]
+        assert canvas.colors_for(part2) == [(1, 0, 1, 9000), None, None, (2, 0, 1, 9000)]
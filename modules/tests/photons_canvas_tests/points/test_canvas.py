@@ -3,7 +3,7 @@ from unittest import mock
 from photons_canvas.orientation import Orientation
 from photons_canvas.points import containers as cont
 from photons_canvas.points import helpers as php
-from photons_canvas.points.canvas import Canvas
+from photons_canvas.points.canvas import Canvas, PartLayer
 from photons_messages import TileMessages
 from photons_messages.fields import Color
 
@@ -112,6 +112,12 @@ class TestCanvas:
         assert clone.parts == c.parts
         assert clone.devices == c.devices
 
+    def test_it_shares_a_points_cache_with_clones(self):
+        c = Canvas()
+        assert c.points_cache.info == {"size": 256, "entries": 0, "hits": 0, "misses": 0}
+        assert c.clone().points_cache is c.points_cache
+        assert Canvas().points_cache is not c.points_cache
+
     def test_it_can_find_the_parts_for_each_point(self, V):
         # 6   a c c a _
         # 5   a c c a _
@@ -470,6 +476,18 @@ class TestCanvas:
             assert canvas.dim((3, 4), -0.7) == (200, 0.4, 1, 9000)
             assert canvas.dim((3, 4), 0.7) is None
 
+        def test_it_can_get_dimmed_colours_for_a_part(self, V):
+            part = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+
+            canvas = Canvas()
+            canvas.add_parts(part)
+            canvas[(0, 0)] = (200, 0.4, 0.5, 9000)
+            canvas[(1, 0)] = (100, 1, 0, 3500)
+            canvas[(0, -1)] = (100, 1, 0.25, 3500)
+
+            assert canvas.dim_part(part, 0.25) == [(200, 0.4, 0.25, 9000), None, None, None]
+            assert canvas.dim_part(part, -0.75) == [(200, 0.4, 1, 9000), None, (100, 1, 1, 3500), None]
+
         def test_it_return_None_from_adjusting_a_point_if_the_point_is_empty_and_ignore_empty(self):
             canvas = Canvas()
             assert canvas.adjust((1, 2)) is None
@@ -620,3 +638,46 @@ class TestCanvas:
                     (26, 7): None,
                 },
             }
+
+        def test_it_gets_colours_for_whole_parts_from_a_part_layer(self, V):
+            called = []
+
+            def colors(part, canvas):
+                called.append(part)
+                return [(part.part_number * 10 + i, 1, 1, 3500) for i in range(len(part.points))]
+
+            part1 = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+            part2 = V.make_part(V.device, 2, user_x=1, user_y=1, width=2, height=2)
+
+            c = Canvas()
+            c.add_parts(part1, part2)
+
+            onto = {}
+            msgs = list(c.msgs(PartLayer(colors), onto=onto))
+            assert called == [part1, part2]
+
+            assert len(msgs) == 2
+            assert msgs[0].colors[:4] == [Color(10 + i, 1, 1, 3500) for i in range(4)]
+            assert msgs[1].colors[:4] == [Color(20 + i, 1, 1, 3500) for i in range(4)]
+
+            assert onto == {
+                **{point: (10 + i, 1, 1, 3500) for i, point in enumerate(part1.points)},
+                **{point: (20 + i, 1, 1, 3500) for i, point in enumerate(part2.points)},
+            }
+
+        def test_it_can_call_a_part_layer_for_a_single_point(self, V):
+            called = []
+
+            def colors(part, canvas):
+                called.append(part)
+                return [(i, 1, 1, 3500) for i in range(len(part.points))]
+
+            part = V.make_part(V.device, 1, user_x=0, user_y=0, width=2, height=2)
+
+            c = Canvas()
+            c.add_parts(part)
+
+            layer = PartLayer(colors)
+            assert [layer(point, c) for point in part.points] == [(i, 1, 1, 3500) for i in range(4)]
+            assert layer((100, 100), c) is None
+            assert called == [part]
@@ -237,3 +237,74 @@ class TestPoints:
 
         bounds = ((3, 8), (11, 9), (5, 2))
         assert php.Points.top_row(bounds) == 11
+
+    def test_it_uses_the_cache_it_is_given(self):
+        cache = php.PointsCache(2)
+        bounds = ((3, 8), (5, 1), (5, 4))
+
+        all_points = php.Points.all_points(bounds, cache=cache)
+        assert php.Points.all_points(bounds, cache=cache) is all_points
+        assert php.Points.rows(bounds, cache=cache)[0] == php.Points.row(5, bounds, cache=cache)
+        assert cache.info == {"size": 2, "entries": 2, "hits": 2, "misses": 2}
+
+        # Only the most recent bounds are kept
+        php.Points.all_points(((0, 1), (1, 0), (1, 1)), cache=cache)
+        php.Points.all_points(((0, 2), (1, 0), (2, 1)), cache=cache)
+        assert len(cache) == 2
+        assert php.Points.all_points(bounds, cache=cache) is not all_points
+
+        assert php.Points.all_points(bounds, cache=False) is not php.Points.all_points(bounds, cache=False)
+
+        cache.clear()
+        assert cache.info == {"size": 2, "entries": 0, "hits": 0, "misses": 0}
+
+
+class TestGrid:
+    def test_it_is_a_sequence_of_points(self):
+        grid = php.Grid(range(3, 6), range(5, 3, -1))
+
+        assert len(grid) == 6
+        assert list(grid) == [(3, 5), (4, 5), (5, 5), (3, 4), (4, 4), (5, 4)]
+        assert grid[0] == (3, 5)
+        assert grid[4] == (4, 4)
+        assert grid[-1] == (5, 4)
+        assert grid[1:3] == [(4, 5), (5, 5)]
+
+        with pytest.raises(IndexError):
+            grid[6]
+
+    def test_it_knows_what_points_it_has(self):
+        grid = php.Grid(range(3, 6), range(5, 3, -1))
+
+        assert (4, 4) in grid
+        assert (4, 3) not in grid
+        assert (6, 5) not in grid
+        assert "nope" not in grid
+
+        assert grid.index((5, 4)) == 5
+        with pytest.raises(ValueError):
+            grid.index((6, 4))
+
+    def test_it_compares_to_other_sequences_of_points(self):
+        grid = php.Grid(range(0, 2), range(1, -1, -1))
+
+        assert grid == [(0, 1), (1, 1), (0, 0), (1, 0)]
+        assert grid == ((0, 1), (1, 1), (0, 0), (1, 0))
+        assert grid != [(0, 1), (1, 1), (0, 0)]
+        assert grid == php.Grid(range(0, 2), range(1, -1, -1))
+        assert grid != php.Grid(range(0, 3), range(1, -1, -1))
+        assert hash(grid) == hash(php.Grid(range(0, 2), range(1, -1, -1)))
+
+        assert php.Grid(range(0), range(0)) == []
+
+    def test_it_can_be_split_into_lines(self):
+        grid = php.Grid(range(0, 2), range(1, -1, -1))
+
+        rows = php.Lines(grid)
+        assert len(rows) == 2
+        assert rows == [[(0, 1), (1, 1)], [(0, 0), (1, 0)]]
+
+        cols = php.Lines(grid, vertical=True)
+        assert len(cols) == 2
+        assert cols[-1] == [(1, 1), (1, 0)]
+        assert cols[:1] == [[(0, 1), (0, 0)]]
@@ -3,7 +3,7 @@ from unittest import mock
 from photons_canvas.orientation import Orientation
 from photons_canvas.points import containers as cont
 from photons_canvas.points.simple_messages import Set64
-from photons_messages import LightMessages, TileMessages
+from photons_messages import LightMessages, MultiZoneMessages, TileMessages
 from photons_messages.fields import Color
 from photons_products import Products
 
@@ -235,6 +235,11 @@ class TestPart:
             *[(16, 18), (17, 18), (18, 18), (19, 18), (20, 18), (21, 18)],
         ]
 
+        # The points are remembered until the part moves
+        assert part.points is part.points
+        part.update(0, 0, 2, 2)
+        assert part.points == [(0, 0), (1, 0), (0, -1), (1, -1)]
+
     def test_it_can_reverse_orient(self, V):
         ret_colors = mock.Mock(name="ret_colors", spec=[])
         reorient = mock.Mock(name="reorient", return_value=ret_colors)
@@ -242,10 +247,10 @@ class TestPart:
         colors = mock.Mock(name="colors", spec=[])
         part = V.make_part(V.device, 0, orientation=Orientation.RotatedLeft)
 
-        with mock.patch("photons_canvas.points.containers.reorient", reorient):
+        with mock.patch("photons_canvas.points.containers.reverse_orient", reorient):
             assert part.reverse_orient(colors) is ret_colors
 
-        reorient.assert_called_once_with(colors, Orientation.RotatedRight)
+        reorient.assert_called_once_with(colors, Orientation.RotatedLeft, 8, 8)
 
     def test_it_can_orient(self, V):
         ret_colors = mock.Mock(name="ret_colors", spec=[])
@@ -257,7 +262,7 @@ class TestPart:
         with mock.patch("photons_canvas.points.containers.reorient", reorient):
             assert part.reorient(colors) is ret_colors
 
-        reorient.assert_called_once_with(colors, Orientation.RotatedLeft)
+        reorient.assert_called_once_with(colors, Orientation.RotatedLeft, 8, 8)
 
     def test_it_can_orient_with_random_orientation(self, V):
         ret_colors = mock.Mock(name="ret_colors", spec=[])
@@ -278,7 +283,7 @@ class TestPart:
         with mock.patch("photons_canvas.points.containers.reorient", reorient):
             assert part.reorient(colors, randomize=True) is ret_colors
 
-        reorient.assert_called_once_with(colors, part.random_orientation)
+        reorient.assert_called_once_with(colors, part.random_orientation, 8, 8)
 
     class TestMsgs:
         def test_it_returns_a_SetColor_for_bulbs(self, V):
@@ -358,6 +363,85 @@ class TestPart:
 
             assert isinstance(msgs[0], Set64)
 
+        def test_it_gives_a_new_Set64_for_each_frame(self, V):
+            device = cont.Device("d073d5001337", Products.LCM3_TILE.cap)
+            part = V.make_part(device, 3, orientation=Orientation.RotatedLeft)
+
+            colors1 = [(i, 1, 1, 3500) for i in range(64)]
+            colors2 = [(i, 0, 1, 9000) for i in range(64)]
+            colors3 = [(i, 0.5, 0.5, 2500) for i in range(64)]
+
+            msg1 = part._msgs(colors1, duration=1)[0]
+            assert msg1.colors == [Color(*c) for c in part.reorient(colors1)]
+
+            # Like the noisy network cannon does
+            msg1.update({"source": 2, "sequence": 3, "ack_required": True, "res_required": True})
+
+            msg2 = part._msgs(colors2, duration=2)[0]
+            assert msg2 is not msg1
+            assert msg2.colors == [Color(*c) for c in part.reorient(colors2)]
+            assert msg2.duration == 2
+            assert not msg2.ack_required
+            assert not msg2.res_required
+            assert msg2.source == part._set_64.source
+            assert msg2.sequence == part._set_64.sequence
+
+            msg3 = part._msgs(colors3, duration=0)[0]
+            assert msg3 is not msg1 and msg3 is not msg2
+            assert msg3.colors == [Color(*c) for c in part.reorient(colors3)]
+            assert msg3.duration == 0
+            assert not msg3.ack_required
+
+            # Messages we already handed out aren't changed
+            assert msg1.colors == [Color(*c) for c in part.reorient(colors1)]
+            assert msg1.duration == 1
+            assert msg1.ack_required
+            assert msg2.colors == [Color(*c) for c in part.reorient(colors2)]
+
+            assert msg3.tile_index == 3
+            assert msg3.serial == device.serial
+
+        def test_it_reorients_candles_that_arent_8x8(self, V):
+            device = cont.Device("d073d5001337", Products.LCM3_CANDLE.cap)
+            colors = [(i, 1, 1, 3500) for i in range(30)]
+
+            # fmt: off
+            expected = {
+                Orientation.RightSideUp: list(range(30)),
+                Orientation.UpsideDown: list(range(29, -1, -1)),
+                Orientation.RotatedLeft: [
+                      25, 20, 15, 10, 5, 0
+                    , 26, 21, 16, 11, 6, 1
+                    , 27, 22, 17, 12, 7, 2
+                    , 28, 23, 18, 13, 8, 3
+                    , 29, 24, 19, 14, 9, 4
+                    ],
+                Orientation.RotatedRight: [
+                      4, 9, 14, 19, 24, 29
+                    , 3, 8, 13, 18, 23, 28
+                    , 2, 7, 12, 17, 22, 27
+                    , 1, 6, 11, 16, 21, 26
+                    , 0, 5, 10, 15, 20, 25
+                    ],
+            }
+            # fmt: on
+
+            for o, want in expected.items():
+                part = V.make_part(device, 0, width=5, height=6, orientation=o)
+                assert len(list(part.points)) == 30
+
+                rotated = part.reorient(colors)
+                assert rotated == [colors[i] for i in want]
+                assert part.reverse_orient(rotated) == colors
+
+                msgs = part.msgs(colors, duration=1)
+                assert len(msgs) == 1
+                assert msgs[0].width == 5
+                assert msgs[0].colors[:30] == [Color(*c) for c in rotated]
+
+                # State64 from a candle pads the colors out to 64
+                assert part.reverse_orient(rotated + [(0, 0, 0, 0)] * 34)[:30] == colors
+
         class TestCaching:
             def test_it_it_sends_same_messages_or_NO_MESSAGES_depending_on_time_and_difference(self, FakeTime, V):
                 colors = [(i, 1, 1, 3500) for i in range(64)]
@@ -427,3 +511,65 @@ class TestPart:
                     assert part.last_msgs is msgs3
                     assert part.next_force_send == 3.5
                     assert part.colors == colors
+
+            def test_it_only_sends_changed_zones_to_strips(self, FakeTime, V):
+                colors = [(i, 1, 1, 3500) for i in range(20)]
+                colors2 = list(colors)
+                colors2[5] = (200, 0, 1, 3500)
+                colors2[7] = (201, 0, 1, 3500)
+
+                for cap, kls in (
+                    (Products.LCM2_Z.cap(2, 80), MultiZoneMessages.SetExtendedColorZones),
+                    (Products.LCM1_Z.cap, MultiZoneMessages.SetColorZones),
+                ):
+                    device = cont.Device("d073d5001337", cap)
+
+                    with FakeTime() as t:
+                        t.set(2)
+                        part = V.make_part(device, 0, width=20, height=1, original_colors=colors)
+
+                        msgs = part.msgs(colors, force=False)
+                        assert isinstance(msgs, tuple)
+                        assert all(m | kls for m in msgs)
+
+                        t.set(2.1)
+                        msgs2 = part.msgs(colors2, force=False)
+                        assert part.last_msgs is msgs2
+                        assert part.last_msgs_partial
+                        assert all(m | kls for m in msgs2)
+
+                        if kls is MultiZoneMessages.SetExtendedColorZones:
+                            assert len(msgs2) == 1
+                            assert msgs2[0].zone_index == 5
+                            assert msgs2[0].colors_count == 3
+                            assert msgs2[0].colors[:3] == [Color(*c) for c in colors2[5:8]]
+                        else:
+                            assert [(m.start_index, m.end_index) for m in msgs2] == [(5, 5), (6, 6), (7, 7)]
+
+                        # Nothing changed but it's time to send everything again
+                        t.set(3)
+                        msgs3 = part.msgs(colors2, force=False)
+                        assert not part.last_msgs_partial
+                        assert msgs3 is part.last_msgs
+                        if kls is MultiZoneMessages.SetExtendedColorZones:
+                            assert [(m.zone_index, m.colors_count) for m in msgs3] == [(0, 20)]
+                        else:
+                            assert len(msgs3) == 20
+
+                        # And those are sent again next time
+                        t.set(4)
+                        assert part.msgs(colors2, force=False) is msgs3
+
+            def test_it_knows_the_span_of_changed_colors(self):
+                colors = [(i, 1, 1, 3500) for i in range(10)]
+                assert cont.changed_span(colors, list(colors)) is None
+                assert cont.changed_span(colors, colors[:5]) == (0, 10)
+
+                changed = list(colors)
+                changed[3] = None
+                changed[6] = (0, 0, 0, 0)
+                assert cont.changed_span(changed, colors) == (3, 7)
+
+                changed = list(colors)
+                changed[-1] = None
+                assert cont.changed_span(changed, colors) == (9, 10)
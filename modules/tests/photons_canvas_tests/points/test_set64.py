@@ -194,6 +194,20 @@ class TestSet64:
         simple = Set64(colors=setting)
         assert simple.colors == [*([c1, c2] * 3), *([Color(0, 0, 0, 0)] * 58)]
 
+    def test_it_can_write_colors_in_a_different_order(self):
+        colors = [(i, 1, 0.5, 3500) for i in range(64)]
+        order = list(reversed(range(64)))
+
+        simple = Set64()
+        before = simple._bts
+        simple.set_colors(colors, order)
+        assert simple._bts is before
+        assert simple.colors == [Color(*c) for c in reversed(colors)]
+
+        simple.set_colors(colors)
+        assert simple.colors == [Color(*c) for c in colors]
+        assert simple.pack() == Set64(colors=colors).pack()
+
     def test_it_can_be_given_None_as_a_valid_color(self):
         simple = Set64(colors=[(100, 1, 0, 3500), None, (200, 0, 1, 9000)])
         assert simple.colors == [Color(100, 1, 0, 3500), Color(0, 0, 0, 0), Color(200, 0, 1, 9000)] + [Color(0, 0, 0, 0)] * 61
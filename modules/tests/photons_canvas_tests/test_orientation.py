@@ -1,3 +1,4 @@
+import pytest
 from photons_canvas import orientation
 from photons_canvas.orientation import Orientation as O
 
@@ -59,6 +60,57 @@ class TestNearestOrientation:
             assert got is expected, f"Expected accel meas ({x}, {y}, {x}) to be orientated {expected.name}, got {got.name}"
 
 
+class TestReorientOrder:
+    def test_it_is_None_if_the_order_doesnt_change(self):
+        for o in (O.RightSideUp, O.FaceUp, O.FaceDown):
+            assert orientation.reorient_order(o) is None
+            assert orientation.reverse_orient_order(o, 5, 6) is None
+
+    def test_it_gives_the_same_order_as_sorting_rotated_indexes(self):
+        for o in (O.UpsideDown, O.RotatedLeft, O.RotatedRight):
+            for width, height in ((8, 8), (5, 6), (3, 1)):
+                count = width * height
+                want = [i for _, i in sorted((orientation.rotated_index(i, o, width, height), i) for i in range(count))]
+                assert list(orientation.reorient_order(o, width, height)) == want
+
+    def test_it_caches_the_order(self):
+        order = orientation.reorient_order(O.RotatedLeft, 8, 8)
+        assert orientation.reorient_order(O.RotatedLeft, 8, 8) is order
+        assert orientation.reorient_order(O.RotatedLeft, 5, 6) is not order
+        assert orientation.reorient_order(O.RotatedLeft, 6, 5) is not orientation.reorient_order(O.RotatedLeft, 5, 6)
+
+    def test_it_can_undo_the_order(self):
+        colors = list(range(30))
+        for o in O:
+            reoriented = orientation.reorient(colors, o, 5, 6)
+            assert sorted(reoriented) == colors
+            assert orientation.reverse_orient(reoriented, o, 5, 6) == colors
+
+    def test_reversing_is_the_same_as_the_reverse_orientation_for_square_tiles(self):
+        colors = list(range(64))
+        for o in O:
+            assert orientation.reverse_orient(colors, o) == orientation.reorient(colors, orientation.reverse_orientation(o))
+
+
+class TestApplyOrder:
+    def test_it_leaves_colors_past_the_order_alone(self):
+        order = orientation.reorient_order(O.UpsideDown, 2, 2)
+        assert orientation.apply_order([0, 1, 2, 3, 4, 5], order) == [3, 2, 1, 0, 4, 5]
+        assert orientation.apply_order([0, 1, 2, 3], None) == [0, 1, 2, 3]
+
+    def test_it_works_on_arrays(self):
+        np = pytest.importorskip("numpy")
+
+        colors = np.arange(24).reshape((6, 4))
+        order = orientation.reorient_order(O.UpsideDown, 2, 2)
+
+        got = orientation.apply_order(colors, order)
+        assert got.tolist() == [colors[i].tolist() for i in (3, 2, 1, 0, 4, 5)]
+
+        got = orientation.apply_order(colors[:4], order)
+        assert got.tolist() == [colors[i].tolist() for i in (3, 2, 1, 0)]
+
+
 class TestReorient:
     def test_it_does_nothing_if_it_doesnt_need_to(self):
         colors = list(range(64))
@@ -159,3 +211,68 @@ class TestReorient:
         # fmt: on
 
         assert orientation.reorient(colors, O.UpsideDown) == expected
+
+    def test_it_can_fix_a_rotated_candle(self):
+        _ = "_"
+        h = "#"
+
+        # The colors for a 5x6 candle are in rows of 5 and a rotated candle
+        # wants them in rows of 6
+
+        # fmt: off
+
+        colors = [
+              h, h, h, h, h
+            , _, _, _, _, h
+            , _, _, _, _, _
+            , _, _, _, _, _
+            , _, _, _, _, _
+            , _, _, _, _, _
+            ]
+
+        rotated_left = [
+              _, _, _, _, _, h
+            , _, _, _, _, _, h
+            , _, _, _, _, _, h
+            , _, _, _, _, _, h
+            , _, _, _, _, h, h
+            ]
+
+        rotated_right = [
+              h, h, _, _, _, _
+            , h, _, _, _, _, _
+            , h, _, _, _, _, _
+            , h, _, _, _, _, _
+            , h, _, _, _, _, _
+            ]
+
+        # fmt: on
+
+        assert orientation.reorient(colors, O.RotatedLeft, 5, 6) == rotated_left
+        assert orientation.reverse_orient(rotated_left, O.RotatedLeft, 5) == colors
+
+        assert orientation.reorient(colors, O.RotatedRight, 5, 6) == rotated_right
+        assert orientation.reverse_orient(rotated_right, O.RotatedRight, 5) == colors
+
+    def test_it_matches_the_original_reorient_for_8x8_tiles(self):
+        def rotated_index(i, o):
+            x = i % 8
+            y = i // 8
+
+            if o is O.UpsideDown:
+                x, y = 7 - x, 7 - y
+            elif o is O.RotatedLeft:
+                x, y = 7 - y, x
+            elif o is O.RotatedRight:
+                x, y = y, 7 - x
+
+            return x + (y * 8)
+
+        def reorient(colors, o):
+            if o in (O.RightSideUp, O.FaceUp, O.FaceDown):
+                return colors
+            return [v for _, v in sorted((rotated_index(i, o), v) for i, v in enumerate(colors))]
+
+        colors = list(range(64))
+        for o in O:
+            assert orientation.reorient(colors, o) == reorient(colors, o)
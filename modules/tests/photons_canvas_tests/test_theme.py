@@ -1,7 +1,12 @@
+import random
+
 import pytest
 from photons_app import helpers as hp
 from photons_app.special import FoundSerials
-from photons_canvas.theme import ApplyTheme
+from photons_canvas import Canvas
+from photons_canvas.orientation import Orientation
+from photons_canvas.points import containers as cont
+from photons_canvas.theme import Applier, ApplyTheme, PointGrid
 from photons_products import Products
 
 devices = pytest.helpers.mimic()
@@ -131,3 +136,59 @@ class TestApplyTheme:
             assert c.kelvin == 3500
 
         assert len(non_zero_hues) > 200
+
+
+class TestPointGrid:
+    def test_it_finds_the_closest_points(self):
+        rand = random.Random(3)
+        points = list({(rand.randint(-20, 20), rand.randint(-10, 30)) for _ in range(200)})
+
+        grid = PointGrid(((-20, 20), (30, -10), (40, 40)))
+        for point in points:
+            grid.add(point)
+
+        for _ in range(100):
+            x, y = rand.randint(-25, 25), rand.randint(-15, 35)
+            got = grid.search_knn((x, y), 3)
+            want = sorted((px - x) ** 2 + (py - y) ** 2 for px, py in points)[:3]
+            assert [dist for dist, _ in got] == want
+            assert all((px - x) ** 2 + (py - y) ** 2 == dist for dist, (px, py) in got)
+
+    def test_it_returns_what_it_has_if_there_arent_enough_points(self):
+        grid = PointGrid(((0, 10), (10, 0), (10, 10)))
+        assert grid.search_knn((1, 1), 3) == []
+
+        grid.add((9, 9))
+        assert grid.search_knn((1, 1), 3) == [(128, (9, 9))]
+
+
+class TestApplier:
+    def test_it_fills_in_the_canvas_in_batches(self):
+        device = cont.Device("d073d5001337", Products.LCM3_TILE.cap)
+        canvas = Canvas()
+        canvas.add_parts(cont.Part(0, 0, 8, 8, 1, Orientation.RightSideUp, device))
+
+        colors = [(0, 1, 0.3, 3500), (120, 1, 0.3, 3500)]
+        applier = Applier(canvas, colors, batch_size=50)
+
+        # The part grows by 3 on each side, so 14 * 14 points in batches of 50
+        batches = list(applier.apply_in_batches())
+        assert len(batches) == 4
+
+        assert len(canvas.points) == 14 * 14
+        for point in canvas.parts[0].points:
+            c = canvas[point]
+            assert c is not None
+            assert c[1:] == (1, pytest.approx(0.3), 3500)
+            assert 0 <= c[0] <= 120
+
+    def test_it_does_nothing_to_an_empty_canvas(self):
+        canvas = Canvas()
+        applier = Applier(canvas, [(0, 1, 0.3, 3500)])
+
+        assert list(applier.apply_in_batches()) == []
+        applier.apply()
+        assert len(canvas.points) == 0
+
+        assert applier.bounds_for([]) == ((0, 0), (0, 0), (0, 0))
+        assert applier.bounds_for([(1, 5), (3, 2)]) == ((1, 3), (5, 2), (2, 3))
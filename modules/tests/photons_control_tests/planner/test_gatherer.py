@@ -1,3 +1,4 @@
+import asyncio
 import itertools
 from contextlib import contextmanager
 from unittest import mock
@@ -7,6 +8,7 @@ from delfick_project.errors_pytest import assertRaises, assertSameError
 from photons_app import helpers as hp
 from photons_app.errors import BadRunWithResults, TimedOut
 from photons_control.planner import Gatherer, NoMessages, Plan, Skip, make_plans
+from photons_control.planner.plans import VersionPlan
 from photons_messages import DeviceMessages, DiscoveryMessages, LightMessages
 from photons_products import Products
 
@@ -110,6 +112,314 @@ def modified_time():
 
 
 class TestGatherer:
+    class TestCache:
+        async def test_it_passes_cache_options_to_the_session_and_keeps_stats(self, sender):
+            gatherer = Gatherer(sender, max_age=30, max_entries=5)
+            assert gatherer.session.max_age == 30
+            assert gatherer.session.max_entries == 5
+            assert gatherer.stats == {"hits": 0, "misses": 0, "shared": 0, "expired": 0, "restored": 0, "evictions": 0}
+
+            plans = make_plans("label")
+            got = dict(await gatherer.gather_all(plans, light1.serial))
+            assert got == {light1.serial: (True, {"label": "bob"})}
+            assert gatherer.stats == {"hits": 0, "misses": 2, "shared": 0, "expired": 0, "restored": 0, "evictions": 0}
+
+            got = dict(await gatherer.gather_all(plans, light1.serial))
+            assert got == {light1.serial: (True, {"label": "bob"})}
+            assert gatherer.stats == {"hits": 1, "misses": 2, "shared": 0, "expired": 0, "restored": 0, "evictions": 0}
+
+            gatherer.clear_cache()
+            assert gatherer.session.filled == {}
+            assert gatherer.stats == {"hits": 1, "misses": 2, "shared": 0, "expired": 0, "restored": 0, "evictions": 0}
+
+        async def test_it_can_restore_replies_for_persistent_plans_from_disk(self, sender, tmp_path):
+            path = str(tmp_path / "cache.db")
+            plans = make_plans("capability", "version")
+
+            def assertResults(got):
+                assert got[light1.serial][0]
+                info = got[light1.serial][1]
+                assert (info["version"]["vendor"], info["version"]["product"]) == (1, Products.LCM2_A19_PLUS.pid)
+                assert info["capability"]["product"] is Products.LCM2_A19_PLUS
+                return info
+
+            gatherer = Gatherer(sender, persistent=path)
+            assertResults(dict(await gatherer.gather_all(plans, light1.serial)))
+            compare_received(
+                {
+                    light1: [DeviceMessages.GetHostFirmware(), DeviceMessages.GetVersion()],
+                    light2: [],
+                    light3: [],
+                }
+            )
+            assert gatherer.stats["restored"] == 0
+            gatherer.persistent.close()
+
+            # A new gatherer only needs to ask for the firmware
+            gatherer = Gatherer(sender, persistent=path)
+            info = assertResults(dict(await gatherer.gather_all(plans, light1.serial)))
+            assert (info["capability"]["firmware"].version_major, info["capability"]["firmware"].version_minor) == (2, 77)
+            compare_received({light1: [DeviceMessages.GetHostFirmware()], light2: [], light3: []})
+            assert gatherer.stats["restored"] > 0
+            gatherer.persistent.close()
+
+            # Changing firmware invalidates what was stored
+            light1.firmware = hp.Firmware(3, 70)
+            gatherer = Gatherer(sender, persistent=path)
+            info = assertResults(dict(await gatherer.gather_all(plans, light1.serial)))
+            assert (info["capability"]["firmware"].version_major, info["capability"]["firmware"].version_minor) == (3, 70)
+            compare_received(
+                {
+                    light1: [DeviceMessages.GetHostFirmware(), DeviceMessages.GetVersion()],
+                    light2: [],
+                    light3: [],
+                }
+            )
+            assert gatherer.stats["restored"] == 0
+            assert gatherer.persistent.firmware(light1.serial)[:2] == (3, 70)
+            gatherer.persistent.close()
+
+            gatherer = Gatherer(sender, persistent=path)
+            assertResults(dict(await gatherer.gather_all(plans, light1.serial)))
+            compare_received({light1: [DeviceMessages.GetHostFirmware()], light2: [], light3: []})
+            assert gatherer.stats["restored"] > 0
+            gatherer.persistent.close()
+
+        async def test_it_only_restores_replies_once_it_knows_the_firmware(self, sender, tmp_path):
+            path = str(tmp_path / "cache.db")
+            plans = make_plans("version")
+
+            gatherer = Gatherer(sender, persistent=path)
+            got = dict(await gatherer.gather_all(plans, light1.serial))
+            assert got[light1.serial][1]["version"]["product"] == Products.LCM2_A19_PLUS.pid
+            compare_received(
+                {
+                    light1: [DeviceMessages.GetHostFirmware(), DeviceMessages.GetVersion()],
+                    light2: [],
+                    light3: [],
+                }
+            )
+            gatherer.persistent.close()
+
+            # The version plan doesn't need the firmware, but we ask for it
+            # before we trust what we have on disk
+            gatherer = Gatherer(sender, persistent=path)
+            got = dict(await gatherer.gather_all(plans, light1.serial))
+            assert got[light1.serial][1]["version"]["product"] == Products.LCM2_A19_PLUS.pid
+            compare_received({light1: [DeviceMessages.GetHostFirmware()], light2: [], light3: []})
+            assert gatherer.stats["restored"] == 1
+            gatherer.persistent.close()
+
+        async def test_it_still_refreshes_restored_replies(self, sender, tmp_path):
+            path = str(tmp_path / "cache.db")
+
+            with modified_time() as t:
+                gatherer = Gatherer(sender, persistent=path)
+                await gatherer.gather_all(make_plans("version"), light1.serial)
+                compare_received(
+                    {
+                        light1: [DeviceMessages.GetHostFirmware(), DeviceMessages.GetVersion()],
+                        light2: [],
+                        light3: [],
+                    }
+                )
+
+                # The firmware we know is 5 seconds old and so what we have
+                # on disk is too old for a refresh of 2 seconds
+                t.forward(5)
+                plans = make_plans(version=VersionPlan(refresh=2))
+                await gatherer.gather_all(plans, light1.serial)
+                compare_received({light1: [DeviceMessages.GetVersion()], light2: [], light3: []})
+                assert gatherer.stats["restored"] == 0
+                gatherer.persistent.close()
+
+    class TestCoalescing:
+        async def test_it_shares_replies_between_concurrent_gathers(self, sender):
+            gatherer = Gatherer(sender)
+            hold = hp.create_future()
+
+            async def intercept(event, Cont):
+                if event.pkt | DeviceMessages.GetLabel:
+                    await hold
+                raise Cont()
+
+            with light1.io["MEMORY"].packet_filter.intercept_process_request(intercept):
+                with light2.io["MEMORY"].packet_filter.intercept_process_request(intercept):
+                    t1 = hp.async_as_background(gatherer.gather_all(make_plans("label"), two_lights))
+                    t2 = hp.async_as_background(gatherer.gather_all(make_plans("label", "power"), two_lights))
+
+                    while gatherer.stats["shared"] < 2:
+                        await asyncio.sleep(0.001)
+                    hold.set_result(True)
+
+                    got1, got2 = await asyncio.gather(t1, t2)
+
+            assert dict(got1) == {
+                light1.serial: (True, {"label": "bob"}),
+                light2.serial: (True, {"label": "sam"}),
+            }
+            assert dict(got2) == {
+                light1.serial: (True, {"label": "bob", "power": {"level": 0, "on": False}}),
+                light2.serial: (True, {"label": "sam", "power": {"level": 65535, "on": True}}),
+            }
+
+            compare_received(
+                {
+                    light1: [DeviceMessages.GetLabel(), DeviceMessages.GetPower()],
+                    light2: [DeviceMessages.GetLabel(), DeviceMessages.GetPower()],
+                    light3: [],
+                }
+            )
+            assert gatherer.stats["shared"] == 2
+            assert gatherer.inflight == {}
+
+        async def test_it_only_shares_messages_that_are_still_in_flight(self, sender):
+            gatherer = Gatherer(sender)
+            plans = make_plans("label")
+
+            assert dict(await gatherer.gather_all(plans, light1.serial)) == {light1.serial: (True, {"label": "bob"})}
+            gatherer.clear_cache()
+            assert dict(await gatherer.gather_all(plans, light1.serial)) == {light1.serial: (True, {"label": "bob"})}
+
+            compare_received({light1: [DeviceMessages.GetLabel(), DeviceMessages.GetLabel()], light2: [], light3: []})
+            assert gatherer.stats["shared"] == 0
+
+        async def test_it_does_not_share_with_a_gather_for_a_different_serial(self, sender):
+            gatherer = Gatherer(sender)
+            plans = make_plans("label")
+
+            got1, got2 = await asyncio.gather(
+                gatherer.gather_all(plans, light1.serial),
+                gatherer.gather_all(plans, light2.serial),
+            )
+            assert dict(got1) == {light1.serial: (True, {"label": "bob"})}
+            assert dict(got2) == {light2.serial: (True, {"label": "sam"})}
+
+            compare_received({light1: [DeviceMessages.GetLabel()], light2: [DeviceMessages.GetLabel()], light3: []})
+            assert gatherer.stats["shared"] == 0
+
+        async def test_it_gives_shared_gathers_the_error_from_the_message(self, sender):
+            gatherer = Gatherer(sender)
+            plans = make_plans("label")
+
+            errors1 = []
+            errors2 = []
+
+            async with light1.offline():
+                got1, got2 = await asyncio.gather(
+                    gatherer.gather_all(plans, light1.serial, message_timeout=0.1, error_catcher=errors1),
+                    gatherer.gather_all(plans, light1.serial, message_timeout=1, error_catcher=errors2),
+                )
+
+            assert dict(got1) == {}
+            assert dict(got2) == {}
+            for errors in (errors1, errors2):
+                assert len(errors) == 1
+                assert isinstance(errors[0], TimedOut)
+                assert errors[0].kwargs["serial"] == light1.serial
+            assert errors1[0] is errors2[0]
+            assert gatherer.inflight == {}
+
+        async def test_it_gives_errors_to_the_message_they_are_for(self, sender):
+            echoes = {}
+
+            class EchoPlan(Plan):
+                messages = [DeviceMessages.EchoRequest(echoing=b"one"), DeviceMessages.EchoRequest(echoing=b"two")]
+
+                class Instance(Plan.Instance):
+                    def process(s, pkt):
+                        if pkt | DeviceMessages.EchoResponse:
+                            echoes.setdefault(id(s), []).append(pkt.echoing.rstrip(b"\x00"))
+
+                    async def info(s):
+                        return echoes[id(s)]
+
+            gatherer = Gatherer(sender)
+            plans = make_plans(echo=EchoPlan())
+            hold = hp.create_future()
+
+            async def intercept(event, Cont):
+                if event.pkt | DeviceMessages.EchoRequest:
+                    if event.pkt.echoing.startswith(b"one"):
+                        # Lost, so this message times out
+                        return
+                    await hold
+                raise Cont()
+
+            errors1 = []
+            errors2 = []
+
+            with light1.io["MEMORY"].packet_filter.intercept_process_request(intercept):
+                t1 = hp.async_as_background(gatherer.gather_all(plans, light1.serial, message_timeout=0.1, error_catcher=errors1))
+                t2 = hp.async_as_background(gatherer.gather_all(plans, light1.serial, message_timeout=1, error_catcher=errors2))
+
+                while gatherer.stats["shared"] < 2:
+                    await asyncio.sleep(0.001)
+                hold.set_result(True)
+
+                await asyncio.gather(t1, t2)
+
+            assert len(errors1) == 1
+            assert errors1[0].kwargs["sent_pkt_type"] == DeviceMessages.EchoRequest.Payload.message_type
+            assert errors2 == errors1
+            assert errors2[0] is errors1[0]
+            assert gatherer.inflight == {}
+
+        async def test_it_uses_its_own_timeout_when_sharing(self, sender):
+            gatherer = Gatherer(sender)
+            plans = make_plans("label")
+            hold = hp.create_future()
+
+            async def intercept(event, Cont):
+                if event.pkt | DeviceMessages.GetLabel:
+                    await hold
+                raise Cont()
+
+            errors = []
+
+            with light1.io["MEMORY"].packet_filter.intercept_process_request(intercept):
+                t1 = hp.async_as_background(gatherer.gather_all(plans, light1.serial, message_timeout=2))
+                while gatherer.inflight == {}:
+                    await asyncio.sleep(0.001)
+
+                got2 = await gatherer.gather_all(plans, light1.serial, message_timeout=0.1, error_catcher=errors)
+                assert dict(got2) == {}
+                assert len(errors) == 1
+                assert isinstance(errors[0], TimedOut)
+                assert not t1.done()
+
+                hold.set_result(True)
+                assert dict(await t1) == {light1.serial: (True, {"label": "bob"})}
+
+        async def test_it_sends_the_message_itself_if_the_other_gather_is_cancelled(self, sender):
+            gatherer = Gatherer(sender)
+            plans = make_plans("label")
+            hold = hp.create_future()
+
+            async def intercept(event, Cont):
+                if event.pkt | DeviceMessages.GetLabel:
+                    await hold
+                raise Cont()
+
+            with light1.io["MEMORY"].packet_filter.intercept_process_request(intercept):
+                t1 = hp.async_as_background(gatherer.gather_all(plans, light1.serial))
+                while gatherer.inflight == {}:
+                    await asyncio.sleep(0.001)
+
+                t2 = hp.async_as_background(gatherer.gather_all(plans, light1.serial))
+                while gatherer.stats["shared"] < 1:
+                    await asyncio.sleep(0.001)
+
+                t1.cancel()
+                await asyncio.sleep(0.01)
+                hold.set_result(True)
+
+                assert dict(await t2) == {light1.serial: (True, {"label": "bob"})}
+                assert t1.cancelled()
+
+            compare_received({light1: [DeviceMessages.GetLabel(), DeviceMessages.GetLabel()], light2: [], light3: []})
+            assert gatherer.inflight == {}
+
     class TestAPlanSayingNoMessages:
         async def test_it_processes_without_needing_messages(self, sender):
             called = []
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+from photons_control.planner.persistent import PersistentCache
+from photons_messages import DeviceMessages
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.db"))
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+def version(serial):
+    return DeviceMessages.StateVersion(vendor=1, product=29, source=2, sequence=3, target=serial)
+
+
+class TestPersistentCache:
+    async def test_it_stores_firmware_per_serial(self, cache):
+        await cache.load("d073d5000001")
+        assert cache.firmware("d073d5000001") is None
+
+        assert cache.set_firmware("d073d5000001", (3, 70, 1))
+        assert cache.firmware("d073d5000001") == (3, 70, 1)
+        assert cache.firmware("d073d5000002") is None
+
+        assert not cache.set_firmware("d073d5000001", (3, 70, 1))
+
+    async def test_it_stores_replies_with_the_time_they_were_received(self, cache):
+        key = DeviceMessages.GetVersion().Key
+        await cache.load("d073d5000001")
+        assert cache.get("d073d5000001", key) is None
+
+        cache.set("d073d5000001", key, [(20, version("d073d5000001"))])
+        ((ts, got),) = cache.get("d073d5000001", key)
+        assert ts == 20
+        assert got | DeviceMessages.StateVersion
+        assert (got.vendor, got.product, got.serial) == (1, 29, "d073d5000001")
+
+        assert cache.get("d073d5000002", key) is None
+        assert cache.get("d073d5000001", DeviceMessages.GetLabel().Key) is None
+
+    async def test_it_forgets_replies_when_the_firmware_changes(self, cache):
+        key = DeviceMessages.GetVersion().Key
+
+        cache.set_firmware("d073d5000001", (3, 70, 1))
+        cache.set("d073d5000001", key, [(1, version("d073d5000001"))])
+        cache.set_firmware("d073d5000002", (3, 70, 1))
+        cache.set("d073d5000002", key, [(1, version("d073d5000002"))])
+
+        cache.set_firmware("d073d5000001", (3, 70, 1))
+        assert cache.get("d073d5000001", key) is not None
+
+        cache.set_firmware("d073d5000001", (3, 90, 2))
+        assert cache.get("d073d5000001", key) is None
+        assert cache.get("d073d5000002", key) is not None
+
+        await cache.flush()
+        other = PersistentCache(cache.path)
+        try:
+            await other.load("d073d5000001")
+            await other.load("d073d5000002")
+            assert other.firmware("d073d5000001") == (3, 90, 2)
+            assert other.get("d073d5000001", key) is None
+            assert other.get("d073d5000002", key) is not None
+        finally:
+            other.close()
+
+    async def test_it_uses_the_database_from_a_worker_thread(self, cache):
+        threads = []
+        original = cache._write
+
+        def _write(pending):
+            threads.append(threading.current_thread())
+            return original(pending)
+
+        cache._write = _write
+
+        cache.set_firmware("d073d5000001", (3, 70, 1))
+        assert cache.pending
+        await cache.flush()
+        assert cache.pending == []
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
+
+        # Nothing to write means we don't use the thread
+        await cache.flush()
+        assert len(threads) == 1
+
+    async def test_it_keeps_data_between_instances(self, cache):
+        key = DeviceMessages.GetVersion().Key
+
+        cache.set_firmware("d073d5000001", (3, 70, 1))
+        cache.set("d073d5000001", key, [(5, version("d073d5000001"))])
+        cache.close()
+
+        other = PersistentCache(cache.path)
+        try:
+            assert other.firmware("d073d5000001") is None
+            await other.load("d073d5000001")
+            assert other.firmware("d073d5000001") == (3, 70, 1)
+            ((ts, got),) = other.get("d073d5000001", key)
+            assert (ts, got.product) == (5, 29)
+        finally:
+            other.close()
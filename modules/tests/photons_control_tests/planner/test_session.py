@@ -3,7 +3,7 @@ from unittest import mock
 
 import pytest
 from photons_app import helpers as hp
-from photons_control.planner.gatherer import Planner, Session
+from photons_control.planner.gatherer import CacheStats, Planner, Session
 
 
 @pytest.fixture()
@@ -21,20 +21,18 @@ def Information(key):
 
 class TestSession:
     def test_it_has_received_and_filled(self, session):
-        assert hasattr(session, "received")
-        assert hasattr(session, "filled")
-
-        key = str(uuid.uuid4())
-        d = session.received[key]
-        assert isinstance(d, dict)
-
-        key2 = str(uuid.uuid4())
-        item = d[key2]
-        assert isinstance(item, list)
+        assert session.received == {}
+        assert session.filled == {}
+        assert session.max_age is None
+        assert session.max_entries == 256
+        assert session.stats.info == {"hits": 0, "misses": 0, "shared": 0, "expired": 0, "restored": 0, "evictions": 0}
 
-        key3 = str(uuid.uuid4())
-        d = session.filled[key3]
-        assert isinstance(d, dict)
+    def test_it_can_be_given_options(self):
+        stats = CacheStats()
+        session = Session(max_age=20, max_entries=3, stats=stats)
+        assert session.max_age == 20
+        assert session.max_entries == 3
+        assert session.stats is stats
 
     def test_it_can_make_a_planner(self, session):
         plans = mock.Mock(name="plans")
@@ -119,15 +117,15 @@ class TestSession:
 
         with mock.patch("time.time", t):
             session.fill(plankey, serial, result)
-            assert session.filled == {plankey: {serial: (t1, result)}}
+            assert session.filled == {serial: {plankey: (t1, result)}}
 
             session.fill(plankey, serial, result2)
-            assert session.filled == {plankey: {serial: (t2, result2)}}
+            assert session.filled == {serial: {plankey: (t2, result2)}}
 
         serial2 = "d073d5000002"
         with mock.patch("time.time", t):
             session.fill(plankey, serial2, result)
-            assert session.filled == {plankey: {serial: (t2, result2), serial2: (t3, result)}}
+            assert session.filled == {serial: {plankey: (t2, result2)}, serial2: {plankey: (t3, result)}}
 
         plankey2 = str(uuid.uuid4())
         serial3 = "d073d5000003"
@@ -136,8 +134,9 @@ class TestSession:
         with mock.patch("time.time", t):
             session.fill(plankey2, serial3, result3)
             assert session.filled == {
-                plankey: {serial: (t2, result2), serial2: (t3, result)},
-                plankey2: {serial3: (t4, result3)},
+                serial: {plankey: (t2, result2)},
+                serial2: {plankey: (t3, result)},
+                serial3: {plankey2: (t4, result3)},
             }
 
     class TestCompleted:
@@ -364,8 +363,8 @@ class TestSession:
                 @hp.memoized_property
                 def starting_filled(s):
                     return {
-                        s.plankeya: {s.serial1: (1, s.result1a), s.serial2: (2, s.result2a)},
-                        s.plankeyb: {s.serial1: (5, s.result1b), s.serial2: (10, s.result2b)},
+                        s.serial1: {s.plankeya: (1, s.result1a), s.plankeyb: (5, s.result1b)},
+                        s.serial2: {s.plankeya: (2, s.result2a), s.plankeyb: (10, s.result2b)},
                     }
 
                 def __init__(s):
@@ -400,12 +399,12 @@ class TestSession:
         def test_it_removes_result_if_refresh_is_True_or_0(self, session, V):
             session.refresh_filled(V.plankeya, V.serial1, True)
             assert session.filled == {
-                V.plankeya: {V.serial2: session.filled[V.plankeya][V.serial2]},
-                V.plankeyb: session.filled[V.plankeyb],
+                V.serial1: {V.plankeyb: (5, V.result1b)},
+                V.serial2: V.starting_filled[V.serial2],
             }
 
-            session.refresh_filled(V.plankeya, V.serial2, 0)
-            assert session.filled == {V.plankeyb: session.filled[V.plankeyb]}
+            session.refresh_filled(V.plankeyb, V.serial1, 0)
+            assert session.filled == {V.serial2: V.starting_filled[V.serial2]}
 
         def test_it_removes_result_if_been_refresh_seconds(self, session, fake_time, V):
             fake_time.set(6)
@@ -415,11 +414,79 @@ class TestSession:
             session.refresh_filled(V.plankeyb, V.serial1, 1)
 
             assert session.filled == {
-                V.plankeya: session.filled[V.plankeya],
-                V.plankeyb: {V.serial2: session.filled[V.plankeyb][V.serial2]},
+                V.serial1: {V.plankeya: (1, V.result1a)},
+                V.serial2: V.starting_filled[V.serial2],
             }
 
             fake_time.set(20)
             session.refresh_filled(V.plankeyb, V.serial2, 5)
 
-            assert session.filled == {V.plankeya: session.filled[V.plankeya]}
+            assert session.filled == {
+                V.serial1: {V.plankeya: (1, V.result1a)},
+                V.serial2: {V.plankeya: (2, V.result2a)},
+            }
+
+    class TestLimits:
+        def test_it_evicts_the_least_recently_used_received_keys(self, session, fake_time):
+            session.max_entries = 2
+            serial = "d073d5000001"
+            key1, key2, key3 = "key1", "key2", "key3"
+
+            pkt1 = mock.Mock(name="pkt1", serial=serial, Information=Information(key1))
+            pkt2 = mock.Mock(name="pkt2", serial=serial, Information=Information(key2))
+            pkt3 = mock.Mock(name="pkt3", serial=serial, Information=Information(key3))
+            other = mock.Mock(name="other", serial="d073d5000002", Information=Information(key1))
+
+            session.receive(pkt1)
+            session.receive(pkt2)
+            session.receive(other)
+
+            # Using key1 makes key2 the least recently used
+            assert session.has_received(key1, serial)
+            session.receive(pkt3)
+
+            assert list(session.known_packets(serial)) == [pkt1, pkt3]
+            assert list(session.known_packets("d073d5000002")) == [other]
+            assert not session.has_received(key2, serial)
+            assert session.stats.info == {"hits": 1, "misses": 1, "shared": 0, "expired": 0, "restored": 0, "evictions": 1}
+
+        def test_it_evicts_the_least_recently_used_plan_results(self, session, fake_time):
+            session.max_entries = 2
+            serial = "d073d5000001"
+
+            session.fill("a", serial, 1)
+            session.fill("b", serial, 2)
+            assert session.completed("a", serial) == 1
+            session.fill("c", serial, 3)
+
+            assert session.filled == {serial: {"a": (0, 1), "c": (0, 3)}}
+            assert session.completed("b", serial) is None
+            assert session.stats.info == {"hits": 1, "misses": 1, "shared": 0, "expired": 0, "restored": 0, "evictions": 1}
+
+        def test_it_forgets_things_older_than_max_age(self, session, fake_time):
+            session.max_age = 5
+            serial = "d073d5000001"
+            pkt1 = mock.Mock(name="pkt1", serial=serial, Information=Information("key1"))
+            pkt2 = mock.Mock(name="pkt2", serial=serial, Information=Information("key1"))
+
+            fake_time.set(1)
+            session.receive(pkt1)
+            session.fill("a", serial, 1)
+
+            fake_time.set(4)
+            session.receive(pkt2)
+
+            fake_time.set(6)
+            assert session.completed("a", serial) == 1
+            assert list(session.known_packets(serial)) == [pkt1, pkt2]
+
+            fake_time.set(7)
+            assert session.completed("a", serial) is None
+            assert list(session.known_packets(serial)) == [pkt2]
+            assert session.has_received("key1", serial)
+
+            fake_time.set(10)
+            assert not session.has_received("key1", serial)
+            assert session.received == {}
+            assert session.filled == {}
+            assert session.stats.info == {"hits": 2, "misses": 2, "shared": 0, "expired": 3, "restored": 0, "evictions": 0}
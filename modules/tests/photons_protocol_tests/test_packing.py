@@ -15,7 +15,10 @@ from photons_protocol.packets import dictobj
 from photons_protocol.packing import (
     BitarraySlice,
     FieldInfo,
+    FieldSegment,
+    PacketCodec,
     PacketPacking,
+    StructSegment,
     val_to_bitarray,
 )
 from photons_protocol.types import Optional
@@ -648,3 +651,93 @@ class TestPacketPacking:
             f = PacketPacking.unpack(P, val)
             assert f.__getitem__("payload", allow_bitarray=True) == expected
             assert f.one == -128
+
+
+class TestPacketCodec:
+    @pytest.fixture()
+    def P(self):
+        class P(dictobj.PacketSpec):
+            fields = [
+                ("one", T.Bool),
+                ("two", T.Reserved(7)),
+                ("three", T.Uint16),
+                ("four", T.Bytes(16)),
+                ("five", T.Uint8.multiple(3)),
+                ("six", T.Reserved(8)),
+                ("seven", T.Int8.S(4)),
+                ("eight", T.Reserved(4)),
+                ("nine", T.Float),
+            ]
+
+        return P
+
+    def without_codec(self):
+        return mock.patch.object(PacketCodec, "for_kls", lambda pkt_kls: None)
+
+    def test_it_returns_None_if_nothing_can_be_compiled(self):
+        class P(dictobj.PacketSpec):
+            fields = [("one", T.Bool), ("two", T.Uint8)]
+
+        assert PacketCodec.for_kls(P) is None
+
+        pkt_kls = mock.Mock(name="pkt_kls", spec=[])
+        assert PacketCodec.for_kls(pkt_kls) is None
+
+    def test_it_compiles_runs_of_byte_aligned_fields(self, P):
+        codec = PacketCodec.for_kls(P)
+        assert PacketCodec.for_kls(P) is codec
+
+        assert [type(s) for s in codec.segments] == [
+            FieldSegment,
+            FieldSegment,
+            StructSegment,
+            FieldSegment,
+            FieldSegment,
+            StructSegment,
+        ]
+        assert [f.name for f in codec.segments[2].fields] == ["three", "four", "five", "six"]
+        assert codec.segments[2].struct.format == "<H2sBBB1s"
+        assert [f.name for f in codec.segments[5].fields] == ["nine"]
+
+    def test_it_stops_compiling_after_a_dynamically_sized_field(self):
+        class P(dictobj.PacketSpec):
+            fields = [
+                ("one", T.Uint8),
+                ("two", T.Bytes(lambda pkt: 8)),
+                ("three", T.Uint8),
+            ]
+
+        codec = PacketCodec.for_kls(P)
+        assert [type(s) for s in codec.segments] == [StructSegment, FieldSegment, FieldSegment]
+
+    def test_it_packs_and_unpacks_the_same_as_without_a_codec(self, P):
+        pkt = P(one=True, three=300, four=b"\x01\x02", five=[1, 2, 3], seven=3, nine=1.5)
+
+        packd = pkt.pack()
+        with self.without_codec():
+            assert pkt.pack() == packd
+
+        made = PacketPacking.unpack(P, packd)
+        with self.without_codec():
+            expected = PacketPacking.unpack(P, packd)
+
+        assert sorted(made.actual_items()) == sorted(expected.actual_items())
+        assert made.three == 300
+        assert made.four == b"\x01\x02"
+        assert made.five == [1, 2, 3]
+        assert made.nine == 1.5
+
+    def test_it_unpacks_field_by_field_if_there_isnt_enough_data(self):
+        class P(dictobj.PacketSpec):
+            fields = [("one", T.Uint8), ("two", T.Uint16)]
+
+        made = PacketPacking.unpack(P, b"\x01\x02")
+        assert made.one == 1
+        assert made.two == 2
+
+    def test_it_complains_about_bad_values_like_without_a_codec(self, P):
+        pkt = P(one=True, three=300, four=b"\x01\x02", five=[1, 2, 3], seven=3, nine=1.5)
+        dictobj.__setitem__(pkt, "three", 70000)
+
+        with assertRaises(BadConversion, "Failed trying to convert a value", val=70000, name="three"):
+            pkt.pack()
@@ -1,3 +1,4 @@
+import asyncio
 import binascii
 from contextlib import contextmanager
 from unittest import mock
@@ -8,9 +9,10 @@ from delfick_project.norms import Meta, dictobj, sb
 from photons_app import helpers as hp
 from photons_app.errors import FoundNoDevices
 from photons_app.formatter import MergedOptionStringFormatter
+from photons_control.planner.persistent import PersistentCache
 from photons_messages import CoreMessages, DeviceMessages, LIFXPacket, protocol_register
-from photons_transport.comms.base import Communication, FakeAck, Found
-from photons_transport.comms.receiver import Receiver
+from photons_transport.comms.base import Communication, FakeAck, Found, SourcePool
+from photons_transport.comms.receiver import LazyPacket, Receiver
 from photons_transport.errors import FailedToFindDevice
 
 
@@ -67,6 +69,54 @@ class TestFakeAck:
         assert repr(ack) == "<ACK source: 2, sequence: 20, serial: d073d5000001>"
 
 
+class TestSourcePool:
+    def test_it_starts_with_the_source_it_is_given(self):
+        pool = SourcePool(20)
+        assert pool.sources == [20]
+        assert len(pool) == 1
+        assert 20 in pool
+        assert pool.for_stream() == 20
+        assert pool.for_stream("stream") == 20
+
+    def test_it_makes_unique_sources_to_fill_the_pool(self):
+        pool = SourcePool(20, size=10)
+        assert len(pool) == 10
+        assert len(set(pool.sources)) == 10
+        assert pool.sources[0] == 20
+        assert all(s > 0 and s < 1 << 32 for s in pool.sources)
+
+    def test_it_gives_out_sources_round_robin(self):
+        pool = SourcePool(20, size=3)
+        assert [pool.next() for _ in range(7)] == [*pool.sources, *pool.sources, pool.sources[0]]
+
+    def test_it_gives_the_same_source_to_a_stream(self):
+        pool = SourcePool(20, size=2)
+        one = pool.for_stream("one")
+        two = pool.for_stream("two")
+        three = pool.for_stream("three")
+
+        assert one == 20
+        assert two == pool.sources[1]
+        assert three == 20
+
+        assert pool.for_stream("two") == two
+        assert pool.streams_for(20) == ["one", "three"]
+        assert pool.streams_for(two) == ["two"]
+
+    def test_it_only_remembers_recently_used_streams(self):
+        pool = SourcePool(20, size=2, max_streams=2)
+        one = pool.for_stream("one")
+        pool.for_stream("two")
+        assert pool.for_stream("one") == one
+
+        pool.for_stream("three")
+        assert list(pool.streams) == ["one", "three"]
+
+        pool.release("one")
+        pool.release("unknown")
+        assert list(pool.streams) == ["three"]
+
+
 class TestCommunication:
     async def test_it_is_formattable(self, V):
         class Other:
@@ -179,34 +229,177 @@ class TestCommunication:
                 s = V.communication.source
                 assert s > 0 and s < 1 << 32, s
 
+    class TestGatherer:
+        async def test_it_uses_cache_options_from_the_target(self, V):
+            gatherer = V.communication.gatherer
+            assert gatherer.max_age is None
+            assert gatherer.max_entries == 256
+
+            V.transport_target.gatherer_max_age = 30
+            V.transport_target.gatherer_max_entries = 10
+            del V.communication.gatherer
+
+            gatherer = V.communication.gatherer
+            assert gatherer.sender is V.communication
+            assert gatherer.session.max_age == 30
+            assert gatherer.session.max_entries == 10
+            assert gatherer.persistent is None
+
+        async def test_it_keeps_replies_on_disk_if_the_target_asks_and_closes_them_when_done(self, V, tmp_path):
+            path = str(tmp_path / "gatherer.db")
+            V.transport_target.gatherer_cache_path = path
+
+            persistent = V.communication.gatherer.persistent
+            assert isinstance(persistent, PersistentCache)
+            assert persistent.path == path
+
+            persistent.set_firmware("d073d5000001", (3, 70, 1))
+            await V.communication.finish()
+            assert persistent.pending == []
+            assert getattr(persistent, "_executor", None) is None
+            assert persistent._conn is None
+
+            other = PersistentCache(path)
+            try:
+                await other.load("d073d5000001")
+                assert other.firmware("d073d5000001") == (3, 70, 1)
+            finally:
+                other.close()
+
+    class TestSourceFor:
+        async def test_it_uses_the_main_source_by_default(self, V):
+            assert len(V.communication.sources) == 1
+            assert V.communication.source_for() == V.communication.source
+            assert V.communication.source_for("animation") == V.communication.source
+
+        async def test_it_uses_a_pool_of_sources_if_the_target_asks_for_one(self, V):
+            V.transport_target.source_pool_size = 3
+            sources = V.communication.sources
+            assert len(sources) == 3
+            assert sources.sources[0] == V.communication.source
+
+            assert [V.communication.source_for() for _ in range(4)] == [*sources.sources, sources.sources[0]]
+
+            one = V.communication.source_for("one")
+            two = V.communication.source_for("two")
+            assert one != two
+            assert V.communication.source_for("one") == one
+            assert V.communication.source_for("two") == two
+            assert sources.streams_for(one) == ["one"]
+
+            V.communication.release_stream("one")
+            assert sources.streams_for(one) == []
+
     class TestSeq:
+        async def test_it_has_a_window_per_source(self, V):
+            target = mock.Mock(name="target")
+            assert V.communication.seq(target) == 1
+            assert V.communication.seq(target, source=1) == 1
+            assert V.communication.seq(target, source=1) == 2
+            assert V.communication.seq(target) == 2
+            assert V.communication.receiver.windows[(1, target)].last == 2
+
         async def test_it_records_where_were_at_with_the_target(self, V):
             target = mock.Mock(name="target")
-            assert not hasattr(V.communication, "_seq")
+            assert V.communication.receiver.windows == {}
             assert V.communication.seq(target) == 1
-            assert V.communication._seq == {target: 1}
+            assert V.communication.receiver.windows[(V.communication.source, target)].last == 1
 
             assert V.communication.seq(target) == 2
-            assert V.communication._seq == {target: 2}
+            assert V.communication.receiver.windows[(V.communication.source, target)].last == 2
 
             target2 = mock.Mock(name="target2")
             assert V.communication.seq(target2) == 1
-            assert V.communication._seq == {target: 2, target2: 1}
+            assert V.communication.receiver.windows[(V.communication.source, target2)].last == 1
 
             assert V.communication.seq(target) == 3
-            assert V.communication._seq == {target: 3, target2: 1}
+            assert V.communication.receiver.windows[(V.communication.source, target)].last == 3
 
         async def test_it_wraps_around_at_255(self, V):
             target = mock.Mock(name="target2")
             assert V.communication.seq(target) == 1
-            assert V.communication._seq == {target: 1}
 
-            V.communication._seq[target] = 254
+            V.communication.receiver.windows[(V.communication.source, target)].last = 254
             assert V.communication.seq(target) == 255
-            assert V.communication._seq == {target: 255}
-
             assert V.communication.seq(target) == 0
-            assert V.communication._seq == {target: 0}
+            assert V.communication.receiver.windows[(V.communication.source, target)].last == 0
+
+        async def test_it_skips_sequences_that_are_in_flight(self, V):
+            target = mock.Mock(name="target")
+            window = V.communication.receiver.window(V.communication.source, target)
+            window.add(1)
+            window.add(2)
+
+            assert V.communication.seq(target) == 3
+            assert window.collisions_avoided == 2
+
+    class TestFreeSeq:
+        async def test_it_returns_the_sequence_if_it_isnt_in_flight(self, V):
+            assert await V.communication.free_seq("d073d5000001", 20) == 20
+            assert V.communication.receiver.windows[(V.communication.source, "d073d5000001")].collisions_avoided == 0
+
+        async def test_it_returns_a_different_sequence_if_it_is_in_flight(self, V):
+            window = V.communication.receiver.window(V.communication.source, "d073d5000001")
+            window.add(20)
+            window.last = 19
+
+            assert await V.communication.free_seq("d073d5000001", 20) == 21
+            assert window.collisions_avoided == 2
+
+        async def test_it_waits_for_a_free_sequence_if_every_sequence_is_in_flight(self, V):
+            window = V.communication.receiver.window(V.communication.source, "d073d5000001")
+            for i in range(256):
+                window.add(i)
+
+            task = hp.async_as_background(V.communication.free_seq("d073d5000001", 20))
+            await asyncio.sleep(0.01)
+            assert not task.done()
+            assert window.waited == 1
+
+            window.remove(100)
+            assert await task == 100
+
+        async def test_it_uses_the_window_for_the_source(self, V):
+            window = V.communication.receiver.window(V.communication.source, "d073d5000001")
+            window.add(20)
+            assert await V.communication.free_seq("d073d5000001", 20, source=1) == 20
+
+    class TestRTT:
+        async def test_it_keeps_an_rtt_for_each_serial(self, V):
+            rtt = V.communication.rtt("d073d5000001")
+            assert V.communication.rtt("d073d5000001") is rtt
+            assert V.communication.rtt("d073d5000002") is not rtt
+            assert V.communication.rtt_info == {
+                "d073d5000001": {"srtt": None, "rttvar": None, "rto": None, "samples": 0},
+                "d073d5000002": {"srtt": None, "rttvar": None, "rto": None, "samples": 0},
+            }
+
+        async def test_it_measures_results_that_get_a_reply(self, V):
+            result = hp.create_future()
+            result.first_received = 10.5
+            V.communication.measure_rtt("d073d5000001", result, 10)
+
+            result.set_result([])
+            await asyncio.sleep(0)
+            assert V.communication.rtt("d073d5000001").srtt == 0.5
+
+            no_reply = hp.create_future()
+            no_reply.first_received = None
+            V.communication.measure_rtt("d073d5000002", no_reply, 10)
+            no_reply.set_result([])
+
+            cancelled = hp.create_future()
+            cancelled.first_received = 11
+            V.communication.measure_rtt("d073d5000002", cancelled, 10)
+            cancelled.cancel()
+
+            errored = hp.create_future()
+            errored.first_received = 11
+            V.communication.measure_rtt("d073d5000002", errored, 10)
+            errored.set_exception(ValueError("NOPE"))
+
+            await asyncio.sleep(0)
+            assert V.communication.rtt("d073d5000002").samples == 0
 
     class TestForget:
         async def test_it_does_nothing_if_serial_not_in_found(self, V):
@@ -748,8 +941,9 @@ class TestCommunication:
             addr = mock.Mock(name="addr")
 
             def recv(pkt, addr, *, allow_zero):
-                assert isinstance(pkt, LIFXPacket)
+                assert isinstance(pkt, LazyPacket)
                 assert pkt.pkt_type == 9001
+                assert isinstance(pkt.packet, LIFXPacket)
                 assert pkt.payload == b"things"
 
             recv = pytest.helpers.AsyncMock(name="recv", side_effect=recv)
@@ -761,6 +955,32 @@ class TestCommunication:
 
             recv.assert_called_once_with(mock.ANY, addr, allow_zero=allow_zero)
 
+        async def test_it_only_unpacks_the_headers_until_the_packet_is_needed(self, V):
+            addr = mock.Mock(name="addr")
+
+            def recv(pkt, addr, *, allow_zero):
+                assert isinstance(pkt, LazyPacket)
+                assert pkt.source == 2
+                assert pkt.sequence == 3
+                assert pkt.target == binascii.unhexlify("d073d50000010000")
+                assert pkt.serial == "d073d5000001"
+                assert pkt | DeviceMessages.StatePower
+                assert not pkt | DeviceMessages.StateLabel
+                assert "_packet" not in pkt.__dict__
+
+            recv = pytest.helpers.AsyncMock(name="recv", side_effect=recv)
+
+            create = mock.Mock(name="create", side_effect=DeviceMessages.StatePower.create)
+
+            with mock.patch.object(V.communication.receiver, "recv", recv):
+                with mock.patch.object(DeviceMessages.StatePower, "create", create):
+                    pkt = DeviceMessages.StatePower(level=100, source=2, sequence=3, target="d073d5000001")
+                    data = pkt.pack().tobytes()
+                    await V.communication.received_data(data, addr)
+
+            recv.assert_called_once_with(mock.ANY, addr, allow_zero=False)
+            assert len(create.mock_calls) == 0
+
         async def test_it_ignores_invalid_data(self, V):
             allow_zero = mock.Mock(name="allow_zero")
             addr = mock.Mock(name="addr")
@@ -772,3 +992,92 @@ class TestCommunication:
                 await V.communication.received_data(data, addr, allow_zero=allow_zero)
 
             assert len(recv.mock_calls) == 0
+
+    class TestSyncReceivedData:
+        async def test_it_makes_a_task_for_each_datagram_by_default(self, V):
+            called = []
+
+            async def received_data(data, addr):
+                called.append((data, addr))
+
+            with mock.patch.object(V.communication, "received_data", received_data):
+                t1 = V.communication.sync_received_data(b"one", ("127.0.0.1", 1))
+                t2 = V.communication.sync_received_data(b"two", ("127.0.0.1", 2))
+                assert t1 is not t2
+                await asyncio.wait([t1, t2])
+
+            assert called == [(b"one", ("127.0.0.1", 1)), (b"two", ("127.0.0.1", 2))]
+
+        async def test_it_drains_datagrams_in_one_task_when_batched(self, V):
+            V.transport_target.batched_io = True
+            called = []
+
+            async def received_data(data, addr):
+                called.append((data, addr))
+                if data == b"one":
+                    V.communication.sync_received_data(b"three", ("127.0.0.1", 3))
+                elif data == b"two":
+                    raise ValueError("NOPE")
+
+            with mock.patch.object(V.communication, "received_data", received_data):
+                t1 = V.communication.sync_received_data(b"one", ("127.0.0.1", 1))
+                t2 = V.communication.sync_received_data(b"two", ("127.0.0.1", 2))
+                assert t1 is t2
+                await t1
+
+                assert V.communication.received_batch == []
+                assert called == [
+                    (b"one", ("127.0.0.1", 1)),
+                    (b"two", ("127.0.0.1", 2)),
+                    (b"three", ("127.0.0.1", 3)),
+                ]
+
+                t3 = V.communication.sync_received_data(b"four", ("127.0.0.1", 4))
+                assert t3 is not t1
+                await t3
+
+            assert called[-1] == (b"four", ("127.0.0.1", 4))
+
+    class TestBatchWrite:
+        async def test_it_flushes_writes_for_every_device_together(self, V):
+            t1 = mock.Mock(name="t1", spec=["sendto", "is_closing"])
+            t1.is_closing.return_value = False
+            t2 = mock.Mock(name="t2", spec=["sendto", "is_closing"])
+            t2.is_closing.return_value = False
+
+            f1 = V.communication.batch_write(t1, b"one", ("127.0.0.1", 1))
+            f2 = V.communication.batch_write(t2, b"two", ("127.0.0.2", 2))
+            f3 = V.communication.batch_write(t1, b"three", ("127.0.0.1", 1))
+            assert len(V.communication.write_batch) == 3
+            t1.sendto.assert_not_called()
+
+            assert await f1 is True
+            assert await f2 is True
+            assert await f3 is True
+            assert V.communication.write_batch == []
+
+            assert t1.sendto.mock_calls == [
+                mock.call(b"one", ("127.0.0.1", 1)),
+                mock.call(b"three", ("127.0.0.1", 1)),
+            ]
+            t2.sendto.assert_called_once_with(b"two", ("127.0.0.2", 2))
+
+        async def test_it_gives_errors_to_the_writer(self, V):
+            error = OSError("Host unreachable")
+            transport = mock.Mock(name="transport", spec=["sendto", "is_closing"])
+            transport.is_closing.return_value = False
+            transport.sendto.side_effect = [error, None]
+
+            f1 = V.communication.batch_write(transport, b"one", ("127.0.0.1", 1))
+            f2 = V.communication.batch_write(transport, b"two", ("127.0.0.1", 1))
+
+            with assertRaises(OSError, "Host unreachable"):
+                await f1
+            assert await f2 is True
+
+        async def test_it_does_not_write_to_closed_transports(self, V):
+            transport = mock.Mock(name="transport", spec=["sendto", "is_closing"])
+            transport.is_closing.return_value = True
+
+            assert await V.communication.batch_write(transport, b"one", ("127.0.0.1", 1)) is False
+            transport.sendto.assert_not_called()
@@ -5,8 +5,8 @@ from unittest import mock
 
 import pytest
 from photons_app import helpers as hp
-from photons_messages import LIFXPacket
-from photons_transport.comms.receiver import Receiver
+from photons_messages import DeviceMessages, LIFXPacket
+from photons_transport.comms.receiver import LazyPacket, Receiver
 
 
 class TestReceiver:
@@ -61,6 +61,40 @@ class TestReceiver:
                 await asyncio.sleep(0)
                 assert V.receiver.results == {}
 
+            async def test_it_tracks_registered_sequences_in_the_window_for_the_source_and_serial(self, V):
+                key = V.register(V.source, V.sequence, V.target)
+                window = V.receiver.windows[(V.source, "d073d5000000")]
+                assert window.inflight == {V.sequence: 1}
+                assert V.receiver.inflight_info == {V.source: {"d073d5000000": {"inflight": 1, "waited": 0, "collisions_avoided": 0}}}
+
+                other = hp.create_future()
+                V.receiver.register(LIFXPacket(source=V.source + 1, sequence=V.sequence, target=V.target), other, V.original)
+                assert window.inflight == {V.sequence: 1}
+                assert V.receiver.windows[(V.source + 1, "d073d5000000")].inflight == {V.sequence: 1}
+                other.cancel()
+
+                V.result.set_result([])
+                await asyncio.sleep(0)
+                assert window.inflight == {}
+                assert key not in V.receiver.results
+
+            async def test_it_doesnt_unregister_a_newer_result_with_the_same_key(self, V):
+                key = V.register(V.source, V.sequence, V.target)
+                old = V.result
+
+                new = hp.create_future()
+                V.receiver.register(LIFXPacket(source=V.source, sequence=V.sequence, target=V.target), new, V.original)
+
+                old.set_result([])
+                await asyncio.sleep(0)
+                assert V.receiver.results[key] == (V.original, new)
+                assert V.receiver.windows[(V.source, "d073d5000000")].inflight == {V.sequence: 1}
+
+                new.cancel()
+                await asyncio.sleep(0)
+                assert key not in V.receiver.results
+                assert V.receiver.windows[(V.source, "d073d5000000")].inflight == {}
+
         class TestRecv:
             async def test_it_finds_result_based_on_source_sequence_target(self, V):
                 V.register(V.source, V.sequence, V.target)
@@ -117,3 +151,34 @@ class TestReceiver:
 
                 assert V.packet.Information.remote_addr is V.addr
                 assert V.packet.Information.sender_message is V.original
+
+            async def test_it_doesnt_unpack_a_lazy_packet_nothing_is_waiting_for(self, V):
+                pkt = DeviceMessages.StatePower(level=0, source=1, sequence=2, target="d073d5000001")
+                lazy = LazyPacket(pkt.pack().tobytes(), 1024, 22, DeviceMessages.StatePower)
+
+                V.register(V.source, V.sequence, V.target)
+                await V.receiver.recv(lazy, V.addr)
+
+                assert len(V.result.add_packet.mock_calls) == 0
+                assert "_packet" not in lazy.__dict__
+
+            async def test_it_gives_the_unpacked_packet_to_results_and_the_message_catcher(self, V):
+                pkt = DeviceMessages.StatePower(level=65535, source=V.source, sequence=V.sequence, target=V.target)
+                lazy = LazyPacket(pkt.pack().tobytes(), 1024, 22, DeviceMessages.StatePower)
+
+                V.register(V.source, V.sequence, V.target)
+                await V.receiver.recv(lazy, V.addr)
+
+                V.result.add_packet.assert_called_once_with(lazy.packet)
+                assert lazy.packet | DeviceMessages.StatePower
+                assert lazy.packet.level == 65535
+                assert lazy.packet.Information.remote_addr is V.addr
+                assert lazy.packet.Information.sender_message is V.original
+
+                message_catcher = pytest.helpers.AsyncMock(name="message_catcher")
+                V.receiver.message_catcher = message_catcher
+
+                pkt = pkt.clone(overrides={"sequence": V.sequence + 1})
+                lazy = LazyPacket(pkt.pack().tobytes(), 1024, 22, DeviceMessages.StatePower)
+                await V.receiver.recv(lazy, V.addr)
+                message_catcher.assert_called_once_with(lazy.packet)
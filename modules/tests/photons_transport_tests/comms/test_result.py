@@ -121,6 +121,24 @@ class TestResult:
             add_result.assert_called_once_with(pkt)
             assert len(add_ack.mock_calls) == 0
 
+        async def test_it_remembers_when_the_first_packet_was_received(self, V, FakeTime):
+            add_ack = mock.Mock(name="add_ack")
+            add_result = mock.Mock(name="add_result")
+
+            assert V.result.first_received is None
+
+            with FakeTime() as t:
+                with mock.patch.multiple(V.result, add_ack=add_ack, add_result=add_result):
+                    t.set(2)
+                    V.pkt.represents_ack = True
+                    V.result.add_packet(V.pkt)
+                    assert V.result.first_received == 2
+
+                    t.set(3)
+                    V.pkt.represents_ack = False
+                    V.result.add_packet(V.pkt)
+                    assert V.result.first_received == 2
+
     class TestAddAck:
         @pytest.fixture()
         def add_ack(self, V):
@@ -170,6 +170,10 @@ class TestSendingASingleMessages:
                 *[(round(at * 0.2, 3), device.serial, original.Payload.__name__, original.payload) for at in range(int(2 / 0.2))],
             )
 
+            await hp.wait_for_all_futures(*[result for _, result in sender.receiver.results.values()])
+            assert sender.receiver.results == {}
+            assert sender.receiver.windows[(2, device.serial)].inflight == {}
+
         async def test_it_can_retry_until_it_gets_a_result(self, send_single, sender, device, FakeTime, MockedCallLater):
             original = DeviceMessages.EchoRequest(echoing=b"hi")
             io = device.io["MEMORY"]
@@ -57,17 +57,27 @@ class TestWriter:
             return call
 
         modify_sequence = mock.Mock(name="modify_sequence", side_effect=caller("modify_sequence"))
+        ensure_free_sequence = pytest.helpers.AsyncMock(name="ensure_free_sequence", side_effect=caller("ensure_free_sequence"))
         register = mock.Mock(name="register", side_effect=caller("register", result))
         write = pytest.helpers.AsyncMock(name="write", side_effect=caller("write", b"asdf"))
+        measure = mock.Mock(name="measure", side_effect=caller("measure"))
 
-        mods = {"modify_sequence": modify_sequence, "register": register, "write": write}
+        mods = {
+            "modify_sequence": modify_sequence,
+            "ensure_free_sequence": ensure_free_sequence,
+            "register": register,
+            "write": write,
+            "measure": measure,
+        }
 
         with mock.patch.multiple(V.writer, **mods):
             assert await V.writer() is result
 
-        assert called == ["modify_sequence", "register", "write"]
+        assert called == ["modify_sequence", "ensure_free_sequence", "register", "write", "measure"]
+        measure.assert_called_once_with(result)
 
         modify_sequence.assert_called_once_with()
+        ensure_free_sequence.assert_called_once_with()
         register.assert_called_once_with()
         write.assert_called_once_with()
 
@@ -86,14 +96,49 @@ class TestWriter:
 
             V.writer.modify_sequence()
             assert V.writer.clone.sequence is sequence
-            seq.assert_called_once_with(V.original.serial)
+            seq.assert_called_once_with(V.writer.clone.serial, source=V.writer.clone.source)
 
             seq.reset_mock()
             other_sequence = mock.Mock(name="other_sequence")
             seq.return_value = other_sequence
             V.writer.modify_sequence()
             assert V.writer.clone.sequence is other_sequence
-            seq.assert_called_once_with(V.original.serial)
+            seq.assert_called_once_with(V.writer.clone.serial, source=V.writer.clone.source)
+
+    class TestEnsureFreeSequence:
+        async def test_it_uses_a_free_sequence_from_the_session(self, V):
+            sequence = mock.Mock(name="sequence")
+            free_seq = pytest.helpers.AsyncMock(name="free_seq", return_value=sequence)
+            V.session.free_seq = free_seq
+
+            original_sequence = mock.Mock(name="original_sequence")
+            V.writer.clone.sequence = original_sequence
+
+            await V.writer.ensure_free_sequence()
+            assert V.writer.clone.sequence is sequence
+            free_seq.assert_called_once_with(V.writer.clone.serial, original_sequence, source=V.writer.clone.source)
+
+    class TestMeasure:
+        async def test_it_measures_the_rtt_of_results_that_arent_done(self, V, FakeTime):
+            V.writer.did_broadcast = False
+            result = hp.create_future()
+
+            with FakeTime() as t:
+                t.set(20)
+                V.writer.measure(result)
+
+            V.session.measure_rtt.assert_called_once_with(V.writer.clone.serial, result, 20)
+
+        async def test_it_doesnt_measure_broadcasts_or_results_that_are_done(self, V):
+            V.writer.did_broadcast = True
+            V.writer.measure(hp.create_future())
+
+            V.writer.did_broadcast = False
+            result = hp.create_future()
+            result.set_result([])
+            V.writer.measure(result)
+
+            assert len(V.session.measure_rtt.mock_calls) == 0
 
     class TestRegister:
         async def test_it_does_not_register_if_the_Result_is_already_done(self, V):
@@ -14,7 +14,7 @@ from photons_transport.session.discovery_options import (
     NoEnvDiscoveryOptions,
 )
 from photons_transport.session.network import NetworkSession
-from photons_transport.transports.udp import UDP
+from photons_transport.transports.udp import UDP, SharedUDP
 
 
 class TestNetworkSession:
@@ -62,7 +62,15 @@ class TestNetworkSession:
 
     async def test_it_has_properties(self, V):
         assert V.session.UDPTransport is UDP
+        assert V.session.SharedUDPTransport is SharedUDP
         assert V.session.broadcast_transports == {}
+        assert V.session.shared_udp is None
+        assert not V.session.shared_socket
+
+    async def test_it_only_makes_a_shared_socket_if_the_target_wants_one(self, V):
+        V.transport_target.shared_socket = True
+        assert V.session.shared_socket
+        assert V.session.shared_udp == UDP(V.session, "0.0.0.0", 0)
 
     class TestFinish:
         async def test_it_closes_all_the_broadcast_transports(self, V):
@@ -498,6 +506,22 @@ class TestNetworkSession:
                 assert await V.session.make_transport(serial, service, kwargs) is transport
             FakeUDPTransport.assert_called_once_with(V.session, host, port, serial=serial)
 
+        async def test_it_creates_a_shared_UDP_transport_if_the_target_wants_a_shared_socket(self, V):
+            V.transport_target.shared_socket = True
+            assert V.session.shared_socket
+
+            transport = mock.Mock(name="transport")
+            FakeSharedUDPTransport = mock.Mock(name="SharedUDPTransport", return_value=transport)
+
+            serial = "d073d5001337"
+            host = mock.Mock(name="host")
+            port = mock.Mock(name="port")
+            kwargs = {"host": host, "port": port}
+
+            with mock.patch.object(V.session, "SharedUDPTransport", FakeSharedUDPTransport):
+                assert await V.session.make_transport(serial, Services.UDP, kwargs) is transport
+            FakeSharedUDPTransport.assert_called_once_with(V.session, host, port, serial=serial)
+
     class TestMakeBroadcastTransport:
         async def test_it_uses_default_broadcast_if_broadcast_is_True(self, V):
             transport = await V.session.make_broadcast_transport(True)
@@ -137,13 +137,13 @@ class TestItem:
 
                 sender = mock.Mock(name="sender")
                 source = mock.Mock(name="source")
-                sender.source = source
+                sender.source_for.return_value = source
 
-                seqs = {s1: 0, s2: 0, serial: 0}
+                seqs = {(source, s1): 0, (source, s2): 0, (c5source, serial): 0}
 
-                def seq_maker(t):
-                    seqs[t] += 1
-                    return seqs[t]
+                def seq_maker(t, *, source):
+                    seqs[(source, t)] += 1
+                    return seqs[(source, t)]
 
                 sender.seq.side_effect = seq_maker
 
@@ -156,6 +156,8 @@ class TestItem:
                 with mock.patch.object(item, "simplify_parts", simplify_parts):
                     packets = item.make_packets(sender, serials)
 
+                sender.source_for.assert_called_once_with(None)
+
                 assert packets == [
                     (original1, c1),
                     (original1, c2),
@@ -601,8 +603,9 @@ class TestItem:
                             source=s.source,
                             found=s.found,
                             stop_fut=final_future,
-                            spec=["source", "seq", "found", "stop_fut"],
+                            spec=["source_for", "seq", "found", "stop_fut"],
                         )
+                        sender.source_for.return_value = s.source
                         sender.seq.return_value = 1
                         return sender
 
@@ -648,7 +651,7 @@ class TestItem:
                 assert res == [res1, res2]
 
                 _find.assert_called_once_with(None, reference, V.sender, False, 20)
-                make_packets.assert_called_once_with(V.sender, serials)
+                make_packets.assert_called_once_with(V.sender, serials, stream=None)
                 search.assert_called_once_with(V.sender, found, False, packets, False, 20, {"a": a, "error_catcher": mock.ANY})
                 write_messages.assert_called_once_with(V.sender, packets, {"a": a, "error_catcher": mock.ANY})
 
@@ -681,7 +684,7 @@ class TestItem:
                 assert res == []
 
                 _find.assert_called_once_with(None, reference, V.sender, False, 20)
-                make_packets.assert_called_once_with(V.sender, serials)
+                make_packets.assert_called_once_with(V.sender, serials, stream=None)
                 assert len(search.mock_calls) == 0
                 assert len(write_messages.mock_calls) == 0
 
@@ -1,4 +1,4 @@
-from photons_transport.retry_options import Gaps
+from photons_transport.retry_options import RTT, Gaps
 
 
 class TestGaps:
@@ -29,3 +29,51 @@ class TestGaps:
         ticker = obj.retry_ticker(name="there")
         assert ticker.name == "there"
         assert ticker.timeouts == [(0.1, 0.6), (0.5, 3)]
+
+    def test_it_can_make_a_retry_ticker_from_an_rtt(self):
+        gaps = Gaps(gap_between_ack_and_res=0.5, gap_between_results=0.9, timeouts=[(0.1, 0.5), (1, 5)])
+        obj = gaps.empty_normalise()
+
+        rtt = RTT()
+        ticker = obj.retry_ticker(name="hello", rtt=rtt)
+        assert ticker.timeouts == [(0.1, 0.5), (1, 5)]
+
+        rtt.add(0.1)
+        ticker = obj.retry_ticker(name="hello", rtt=rtt)
+        assert ticker.timeouts == [(0.3, 0.3), (0.6, 0.9), (1, None)]
+
+
+class TestRTT:
+    def test_it_starts_with_no_estimate(self):
+        rtt = RTT()
+        assert rtt.srtt is None
+        assert rtt.rttvar is None
+        assert rtt.rto is None
+        assert rtt.info == {"srtt": None, "rttvar": None, "rto": None, "samples": 0}
+
+        timeouts = [(0.2, 0.2), (1, 5)]
+        assert rtt.timeouts(timeouts) is timeouts
+
+    def test_it_smooths_samples(self):
+        rtt = RTT()
+        rtt.add(0.2)
+        assert rtt.srtt == 0.2
+        assert rtt.rttvar == 0.1
+        assert rtt.rto == 0.2 + 4 * 0.1
+
+        rtt.add(0.4)
+        assert rtt.rttvar == 0.75 * 0.1 + 0.25 * 0.2
+        assert rtt.srtt == 0.875 * 0.2 + 0.125 * 0.4
+        assert rtt.samples == 2
+
+    def test_it_uses_the_timeouts_as_a_floor_and_ceiling(self):
+        timeouts = [(0.2, 0.2), (0.1, 0.5), (0.2, 1), (1, 5)]
+
+        fast = RTT()
+        for _ in range(10):
+            fast.add(0.005)
+        assert fast.timeouts(timeouts) == [(0.2, 0.2), (0.4, 0.6), (0.8, 1.4), (1, None)]
+
+        slow = RTT()
+        slow.add(2)
+        assert slow.timeouts(timeouts) == [(1, None)]
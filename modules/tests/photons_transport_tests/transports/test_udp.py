@@ -2,8 +2,9 @@ import asyncio
 from unittest import mock
 
 import pytest
+from delfick_project.errors_pytest import assertRaises
 from photons_app import helpers as hp
-from photons_transport.transports.udp import UDP
+from photons_transport.transports.udp import UDP, SharedUDP
 
 
 class FakeIO:
@@ -33,7 +34,7 @@ class TestUDP:
             host = "127.0.0.1"
             port = pytest.helpers.free_port()
 
-            session = mock.Mock(name="session")
+            session = mock.Mock(name="session", batched_io=False)
             original_message = mock.Mock(name="original_message")
 
             serial = "d073d5000001"
@@ -129,6 +130,23 @@ class TestUDP:
         finally:
             await device.finish()
 
+    async def test_it_writes_in_batches_with_the_session(self, V):
+        V.session.batched_io = True
+        written = hp.create_future()
+        V.session.batch_write.return_value = written
+
+        transport = mock.Mock(name="transport")
+        task = hp.async_as_background(V.transport.write(transport, b"one", V.original_message))
+        await asyncio.sleep(0)
+
+        V.session.batch_write.assert_called_once_with(transport, b"one", V.transport.address)
+        transport.sendto.assert_not_called()
+        assert not task.done()
+
+        written.set_exception(OSError("Host unreachable"))
+        with assertRaises(OSError, "Host unreachable"):
+            await task
+
     async def test_it_can_close_the_transport(self, V):
         device = FakeIO(V.port, lambda b, a: [])
         await device.start()
@@ -141,3 +159,49 @@ class TestUDP:
             assert not await V.transport.is_transport_active(V.original_message, transport)
         finally:
             await device.finish()
+
+
+class TestSharedUDP:
+    async def test_it_uses_one_socket_for_every_device(self):
+        session = mock.Mock(name="session", batched_io=False)
+        session.shared_udp = UDP(session, "0.0.0.0", 0)
+
+        port1 = pytest.helpers.free_port()
+        port2 = pytest.helpers.free_port()
+
+        received = []
+        got_both = hp.create_future()
+
+        def receive(message, addr):
+            received.append((message, addr[1]))
+            if len(received) == 2:
+                got_both.set_result(True)
+
+        session.sync_received_data.side_effect = receive
+
+        device1 = FakeIO(port1, lambda bts, addr: [b"one:" + bts])
+        device2 = FakeIO(port2, lambda bts, addr: [b"two:" + bts])
+        await device1.start()
+        await device2.start()
+
+        shared1 = SharedUDP(session, "127.0.0.1", port1, serial="d073d5000001")
+        shared2 = SharedUDP(session, "127.0.0.1", port2, serial="d073d5000002")
+
+        try:
+            original_message = mock.Mock(name="original_message")
+            transport1 = await shared1.spawn(original_message, timeout=1)
+            transport2 = await shared2.spawn(original_message, timeout=1)
+            assert transport1 is transport2
+            assert transport1 is session.shared_udp.transport.result()
+
+            await shared1.write(transport1, b"hello", original_message)
+            await shared2.write(transport2, b"there", original_message)
+            await got_both
+            assert sorted(received) == [(b"one:hello", port1), (b"two:there", port2)]
+
+            await shared1.close()
+            assert await shared2.is_transport_active(original_message, transport2)
+        finally:
+            await session.shared_udp.close()
+            await device1.finish()
+            await device2.finish()
@@ -0,0 +1,360 @@
+"""
+Benchmarks for photons run against fake devices.
+
+Run with ``./dev benchmark`` or ``python tools/benchmark.py``. Results are
+shown as a table, and ``--output`` writes them as json so that a later run
+can be checked against them with ``--compare``, which exits with a non zero
+code if any result got worse by more than ``--tolerance``.
+"""
+
+import asyncio
+import dataclasses
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+import typing as tp
+
+import click
+from photons_app import helpers as hp
+from photons_app.mimic import DeviceCollection
+from photons_canvas.animations import AnimationRunner
+from photons_control.planner import Gatherer, make_plans
+from photons_messages import DeviceMessages, LightMessages, TileMessages, protocol_register
+from photons_protocol.messages import Messages
+
+
+@dataclasses.dataclass
+class Options:
+    devices: int = 100
+    tiles: int = 10
+    duration: float = 2.0
+    network: str | None = None
+
+
+@dataclasses.dataclass
+class Result:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+    samples: int
+    extra: dict[str, tp.Any] = dataclasses.field(default_factory=dict)
+
+    def worse_than(self, other: "Result", tolerance: float) -> bool:
+        if self.higher_is_better:
+            return self.value < other.value * (1 - tolerance)
+        return self.value > other.value * (1 + tolerance)
+
+
+Benchmark = tp.Callable[[Options], tp.Awaitable[Result]]
+
+benchmarks: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> tp.Callable[[Benchmark], Benchmark]:
+    def register(func: Benchmark) -> Benchmark:
+        benchmarks[name] = func
+        return func
+
+    return register
+
+
+def per_second(name: str, func: tp.Callable[[], int], duration: float, unit: str) -> Result:
+    """
+    Call func as many times as we can in duration seconds. The function returns
+    how many things it did.
+    """
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(20):
+            count += func()
+
+        took = time.perf_counter() - start
+        if took >= duration:
+            break
+
+    return Result(name=name, value=round(count / took, 2), unit=unit, higher_is_better=True, samples=count)
+
+
+def timings(name: str, took: list[float], unit: str = "ms") -> Result:
+    multiplier = 1000 if unit == "ms" else 1
+    ordered = sorted(took)
+    return Result(
+        name=name,
+        value=round(statistics.mean(took) * multiplier, 3),
+        unit=unit,
+        higher_is_better=False,
+        samples=len(took),
+        extra={
+            "p50": round(ordered[len(ordered) // 2] * multiplier, 3),
+            "p95": round(ordered[int(len(ordered) * 0.95)] * multiplier, 3),
+            "max": round(ordered[-1] * multiplier, 3),
+        },
+    )
+
+
+def make_messages() -> list[tp.Any]:
+    target = "d073d5000001"
+    color = {"hue": 200, "saturation": 1, "brightness": 1, "kelvin": 3500}
+    return [
+        DeviceMessages.SetPower(source=1, sequence=1, target=target, level=65535),
+        LightMessages.SetColor(source=1, sequence=1, target=target, duration=1, **color),
+        TileMessages.Set64(
+            source=1,
+            sequence=1,
+            target=target,
+            tile_index=0,
+            length=1,
+            x=0,
+            y=0,
+            width=8,
+            duration=0,
+            colors=[color] * 64,
+        ),
+    ]
+
+
+@hp.asynccontextmanager
+async def fleet(final_future: asyncio.Future, description: str, options: Options) -> tp.AsyncGenerator:
+    devices = DeviceCollection(record_limit=0, shared_incoming=True)
+    value_store = {}
+    if options.network:
+        value_store["network"] = options.network
+    devices.add_fleet(description, **value_store)
+
+    async with devices.for_test(final_future) as sender:
+        yield devices, sender
+
+
+@benchmark("pack")
+async def pack(options: Options) -> Result:
+    messages = make_messages()
+
+    def run() -> int:
+        for msg in messages:
+            msg.clone().pack()
+        return len(messages)
+
+    return per_second("pack", run, options.duration, "messages/s")
+
+
+@benchmark("decode")
+async def decode(options: Options) -> Result:
+    packed = [msg.pack().tobytes() for msg in make_messages()]
+
+    def run() -> int:
+        for bts in packed:
+            Messages.create(bts, protocol_register)
+        return len(packed)
+
+    return per_second("decode", run, options.duration, "messages/s")
+
+
+@benchmark("unpack")
+async def unpack(options: Options) -> Result:
+    packed = [msg.pack().tobytes() for msg in make_messages()]
+
+    def run() -> int:
+        for bts in packed:
+            Messages.create(bts, protocol_register).payload.as_dict()
+        return len(packed)
+
+    return per_second("unpack", run, options.duration, "messages/s")
+
+
+@benchmark("send_single")
+async def send_single(options: Options) -> Result:
+    final_future = hp.create_future(name="benchmark::send_single[final_future]")
+    try:
+        async with fleet(final_future, "1 bulb", options) as (devices, sender):
+            serial = devices.serials[0]
+            await sender(DeviceMessages.GetPower(), serial)
+
+            took = []
+            end = time.perf_counter() + options.duration
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                await sender(DeviceMessages.GetPower(), serial)
+                took.append(time.perf_counter() - start)
+    finally:
+        final_future.cancel()
+
+    return timings("send_single", took)
+
+
+@benchmark("gatherer")
+async def gatherer(options: Options) -> Result:
+    final_future = hp.create_future(name="benchmark::gatherer[final_future]")
+    try:
+        async with fleet(final_future, f"{options.devices} bulbs", options) as (devices, sender):
+            plans = make_plans("label", "power")
+            await sender.find_specific_serials(devices.serials, broadcast=True)
+
+            count = 0
+            start = time.perf_counter()
+            while True:
+                got = await Gatherer(sender).gather_all(plans, devices.serials)
+                count += len(got)
+
+                took = time.perf_counter() - start
+                if took >= options.duration:
+                    break
+    finally:
+        final_future.cancel()
+
+    return Result(
+        name="gatherer",
+        value=round(count / took, 2),
+        unit="devices/s",
+        higher_is_better=True,
+        samples=count,
+        extra={"devices": options.devices},
+    )
+
+
+@benchmark("discovery")
+async def discovery(options: Options) -> Result:
+    final_future = hp.create_future(name="benchmark::discovery[final_future]")
+    try:
+        async with fleet(final_future, f"{options.devices} bulbs", options) as (devices, sender):
+            took = []
+            end = time.perf_counter() + options.duration
+            while not took or time.perf_counter() < end:
+                async with sender.transport_target.session() as fresh:
+                    start = time.perf_counter()
+                    _, missing = await fresh.find_specific_serials(devices.serials, broadcast=True)
+                    took.append(time.perf_counter() - start)
+
+                if missing:
+                    raise click.ClickException(f"Discovery didn't find {len(missing)} devices")
+    finally:
+        final_future.cancel()
+
+    result = timings("discovery", took)
+    result.extra["devices"] = options.devices
+    return result
+
+
+@benchmark("animation")
+async def animation(options: Options) -> Result:
+    final_future = hp.create_future(name="benchmark::animation[final_future]")
+    try:
+        async with fleet(final_future, f"{options.tiles} tile chains", options) as (devices, sender):
+            run_options = {
+                "animations": [["balls", {"num_seconds": options.duration, "every": 0.01}]],
+                "animation_limit": 1,
+                "rediscover_every": 3600,
+            }
+            runner = AnimationRunner(
+                sender,
+                devices.serials,
+                run_options,
+                final_future=hp.ChildOfFuture(final_future, name="benchmark::animation[runner]"),
+            )
+            async with runner:
+                await runner.run()
+
+            if runner.current_animation is None:
+                raise click.ClickException("The animation never started")
+
+            # Time from the first frame so starting up and finding devices isn't counted
+            stats = runner.current_animation.frame_stats
+            fps = stats.average_fps
+            frames = stats.info
+    finally:
+        final_future.cancel()
+
+    if fps == 0:
+        raise click.ClickException(f"The animation only rendered {frames['frames']} frames, try a longer --duration")
+
+    return Result(
+        name="animation",
+        value=fps,
+        unit="fps",
+        higher_is_better=True,
+        samples=frames["frames"],
+        extra={
+            "tiles": options.tiles,
+            "target_fps": frames["target_fps"],
+            "render_ms": round(frames["render"]["mean"] * 1000, 3),
+            "late": frames["late"],
+            "skipped": frames["skipped"],
+        },
+    )
+
+
+def compare(results: list[Result], baseline: dict[str, tp.Any], tolerance: float) -> list[str]:
+    """Return a description of each result that is worse than the baseline"""
+    before = {r["name"]: Result(**r) for r in baseline["results"]}
+
+    worse = []
+    for result in results:
+        other = before.get(result.name)
+        if other is not None and other.unit == result.unit and result.worse_than(other, tolerance):
+            worse.append(f"{result.name}: {result.value} {result.unit} (was {other.value} {other.unit})")
+    return worse
+
+
+@click.command()
+@click.option("--only", multiple=True, type=click.Choice(list(benchmarks)), help="Only run these benchmarks")
+@click.option("--devices", default=100, help="The number of devices for gatherer and discovery")
+@click.option("--tiles", default=10, help="The number of tile chains for animation")
+@click.option("--duration", default=2.0, help="Roughly how many seconds each benchmark runs for")
+@click.option("--network", default=None, help="A network preset for the fake devices, like wifi or noisy_wifi")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the results as json to this file")
+@click.option("--compare", "baseline", type=click.File(), help="Results from a previous run to compare against")
+@click.option("--tolerance", default=0.2, help="How much worse than the baseline a result may be")
+def main(
+    only: tuple[str, ...],
+    devices: int,
+    tiles: int,
+    duration: float,
+    network: str | None,
+    output: str | None,
+    baseline: tp.TextIO | None,
+    tolerance: float,
+) -> None:
+    """Run benchmarks against fake devices"""
+    options = Options(devices=devices, tiles=tiles, duration=duration, network=network)
+
+    async def run() -> list[Result]:
+        results = []
+        for name, func in benchmarks.items():
+            if only and name not in only:
+                continue
+            result = await func(options)
+            click.echo(f"{result.name:<12} {result.value:>12} {result.unit:<12} samples={result.samples} {result.extra}")
+            results.append(result)
+        return results
+
+    results = asyncio.run(run())
+
+    if output:
+        with open(output, "w") as fle:
+            json.dump(
+                {
+                    "created": datetime.datetime.now(datetime.UTC).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "options": dataclasses.asdict(options),
+                    "results": [dataclasses.asdict(result) for result in results],
+                },
+                fle,
+                indent=2,
+            )
+
+    if baseline:
+        worse = compare(results, json.load(baseline), tolerance)
+        if worse:
+            click.echo("Worse than the baseline:", err=True)
+            for line in worse:
+                click.echo(f"  {line}", err=True)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -161,6 +161,17 @@ def interactor_tests(args: list[str]) -> None:
     run("run_photons_core_tests", *ags, env=env, cwd=cwd)
 
 
+@cli.command(context_settings=dict(ignore_unknown_options=True), add_help_option=False)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def benchmark(args: list[str]) -> None:
+    """
+    Run benchmarks against fake devices
+    """
+    from benchmark import main
+
+    main(args)
+
+
 @cli.command(context_settings=dict(ignore_unknown_options=True))
 @click.argument("args", nargs=-1, type=click.UNPROCESSED)
 def interactor_docker(args: list[str]) -> None: